@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import QueryBudgetTestMixin
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedAPITests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='test_author', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'Пост {number}',
+                group=cls.group if number % 2 else None)
+            for number in range(5)
+        ]
+        cls.feed_urls = (
+            reverse('api:index'),
+            reverse('api:group_list', args=(cls.group.slug,)),
+            reverse('api:profile', args=(cls.author.username,)),
+            reverse('api:post_detail', args=(cls.posts[0].pk,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_post_detail(self):
+        '''Пост отдаётся с автором и группой.'''
+        post = FeedAPITests.posts[1]
+
+        response = self.guest_client.get(
+            reverse('api:post_detail', args=(post.pk,)))
+
+        data = response.json()
+        self.assertEqual(data['id'], post.pk)
+        self.assertEqual(data['text'], post.text)
+        self.assertEqual(data['author'], {'username': 'test_author',
+                                          'full_name': 'Лев Толстой'})
+        self.assertEqual(data['group'], {'slug': 'test_slug',
+                                         'title': 'Тестовая группа'})
+
+    def test_cursor_pagination(self):
+        '''Лента листается по курсору next/previous.'''
+        url = reverse('api:index')
+
+        first = self.guest_client.get(url, {'limit': 2}).json()
+        second = self.guest_client.get(first['next']).json()
+        back = self.guest_client.get(second['previous']).json()
+
+        newest = [post.pk for post in reversed(FeedAPITests.posts)]
+        self.assertEqual([row['id'] for row in first['results']],
+                         newest[:2])
+        self.assertEqual([row['id'] for row in second['results']],
+                         newest[2:4])
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_group_and_profile_feeds(self):
+        '''Ленты группы и автора содержат только свои посты.'''
+        group_rows = self.guest_client.get(
+            reverse('api:group_list', args=(FeedAPITests.group.slug,)),
+        ).json()['results']
+        profile_rows = self.guest_client.get(
+            reverse('api:profile', args=(FeedAPITests.author.username,)),
+        ).json()['results']
+
+        self.assertEqual(len(group_rows), 2)
+        self.assertEqual(len(profile_rows), 5)
+
+    def test_unknown_objects(self):
+        '''Несуществующие группа, автор и пост дают 404.'''
+        for url in (reverse('api:group_list', args=('missing',)),
+                    reverse('api:profile', args=('missing',)),
+                    reverse('api:post_detail', args=(0,))):
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code,
+                                 HTTPStatus.NOT_FOUND)
+
+    @override_settings(POSTS_API_MAX_AGE=30)
+    def test_cache_headers(self):
+        '''Ответы кэшируются и поддерживают условные запросы.'''
+        for url in FeedAPITests.feed_urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertIn('max-age=30', response['Cache-Control'])
+                self.assertIn('public', response['Cache-Control'])
+                repeated = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(repeated.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+
+    def test_within_query_budget(self):
+        '''API укладывается в бюджет запросов.'''
+        for url in FeedAPITests.feed_urls:
+            with self.subTest(url=url):
+                cache.clear()
+                self.assertWithinQueryBudget(self.guest_client.get(url))
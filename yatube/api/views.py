@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode
+from django.views.decorators.http import condition, require_GET
+
+from core.query_budget import query_budget
+from posts.feeds import (FEED_ALL, author_feed, cache_anonymous_page,
+                         conditional_feed_page, group_feed)
+from posts.models import Group, Post
+from posts.utils import CursorPaginator
+from posts.views import post_detail_etag, post_detail_last_modified
+
+User = get_user_model()
+
+# Поля поста в ответе API: join автора и группы без создания моделей.
+POST_FIELDS = (
+    'id', 'text', 'pub_date',
+    'author__username', 'author__first_name', 'author__last_name',
+    'group__slug', 'group__title',
+)
+
+
+def serialize_post(row) -> dict:
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': {
+            'username': row['author__username'],
+            'full_name': ' '.join(filter(None, (row['author__first_name'],
+                                                row['author__last_name']))),
+        },
+        'group': row['group__slug'] and {
+            'slug': row['group__slug'],
+            'title': row['group__title'],
+        },
+    }
+
+
+def _limit(request) -> int:
+    try:
+        limit = int(request.GET.get('limit', settings.POSTS_PER_PAGE))
+    except ValueError:
+        limit = settings.POSTS_PER_PAGE
+    return min(max(limit, 1), settings.POSTS_API_MAX_LIMIT)
+
+
+def api_response(data):
+    """JSON-ответ, который можно хранить в общих кэшах."""
+    response = JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+    patch_cache_control(response, public=True,
+                        max_age=settings.POSTS_API_MAX_AGE)
+    return response
+
+
+def feed_response(request, queryset):
+    """Страница ленты по курсору ?after=/?before=."""
+    limit = _limit(request)
+    page = CursorPaginator(
+        queryset.values(*POST_FIELDS), limit).get_cursor_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'))
+
+    def link(name, cursor):
+        query = {name: cursor}
+        if 'limit' in request.GET:
+            query['limit'] = limit
+        return request.build_absolute_uri(
+            f'{request.path}?{urlencode(query)}')
+
+    return api_response({
+        'results': [serialize_post(row) for row in page],
+        'next': (link('after', page.next_cursor())
+                 if page.has_next() else None),
+        'previous': (link('before', page.previous_cursor())
+                     if page.has_previous() else None),
+    })
+
+
+@query_budget(3)
+@require_GET
+@conditional_feed_page(lambda: FEED_ALL, lambda: Post.objects.all())
+@cache_anonymous_page(lambda: FEED_ALL)
+def index(request):
+    """Лента всех постов."""
+    return feed_response(request, Post.objects.all())
+
+
+@query_budget(4)
+@require_GET
+@conditional_feed_page(group_feed,
+                       lambda slug: Post.objects.filter(group__slug=slug))
+@cache_anonymous_page(group_feed)
+def group_posts(request, slug):
+    """Лента группы."""
+    if not Group.objects.filter(slug=slug).exists():
+        raise Http404
+    return feed_response(request, Post.objects.filter(group__slug=slug))
+
+
+@query_budget(4)
+@require_GET
+@conditional_feed_page(
+    author_feed,
+    lambda username: Post.objects.filter(author__username=username))
+@cache_anonymous_page(author_feed)
+def profile(request, username):
+    """Лента автора."""
+    if not User.objects.filter(username=username).exists():
+        raise Http404
+    return feed_response(
+        request, Post.objects.filter(author__username=username))
+
+
+@query_budget(4)
+@require_GET
+@condition(etag_func=post_detail_etag,
+           last_modified_func=post_detail_last_modified)
+def post_detail(request, post_id):
+    """Один пост."""
+    row = Post.objects.filter(pk=post_id).values(*POST_FIELDS).first()
+    if row is None:
+        raise Http404
+    return api_response(serialize_post(row))
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Task
+from .tasks import describe_payload
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at',
+                    'created_at')
+    list_filter = ('status', 'name')
+    # Аргументы задачи задаёт только код, который её поставил;
+    # показываются они через describe_payload, без секретов.
+    exclude = ('payload',)
+    readonly_fields = ('arguments', 'last_error')
+    empty_value_display = '-пусто-'
+
+    def arguments(self, obj):
+        if obj.pk is None:
+            return None
+        return describe_payload(obj)
+    arguments.short_description = 'Аргументы'
@@ -1,5 +1,16 @@
+import atexit
+
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import tasks
+        from .sqlite import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas)
+        # Дожидаемся начатых задач, остальные выполнит run_worker.
+        atexit.register(tasks.shutdown)
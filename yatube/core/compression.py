@@ -0,0 +1,113 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .encoding import choose_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STRONG_ETAG_RE = re.compile(r'^"')
+
+
+class GzipCompressor:
+    '''Потоковое сжатие gzip: каждая порция сразу готова к отправке.'''
+
+    def __init__(self):
+        self.compressor = zlib.compressobj(
+            settings.COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return (self.compressor.compress(data)
+                + self.compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self.compressor = brotli.Compressor(
+            quality=settings.COMPRESS_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+def compressors() -> dict:
+    '''Доступные сжатия, от предпочтительного к худшему.'''
+    result = {}
+    if brotli is not None:
+        result['br'] = BrotliCompressor
+    result['gzip'] = GzipCompressor
+    return result
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    '''Сжимает data целиком в кодировке encoding.'''
+    if encoding == 'gzip':
+        return gzip.compress(data, settings.COMPRESS_GZIP_LEVEL, mtime=0)
+    return brotli.compress(data, quality=settings.COMPRESS_BROTLI_QUALITY)
+
+
+def compress_stream(encoding: str, chunks):
+    '''Сжимает порции chunks по мере их поступления.'''
+    compressor = compressors()[encoding]()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    '''Сжимает ответы кодировкой, которую принимает клиент.
+
+    Кодировка выбирается по весам из Accept-Encoding: brotli, если
+    установлен пакет brotli, иначе gzip. Потоковые ответы сжимаются
+    порциями: клиент получает каждую порцию, не дожидаясь конца.
+    Короткие ответы (меньше COMPRESS_MIN_LENGTH байт) и уже сжатые
+    не трогаются.
+
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.has_header('Content-Encoding')
+                or not response.streaming
+                and len(response.content) < settings.COMPRESS_MIN_LENGTH):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), compressors())
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                encoding, response.streaming_content)
+            # Длина сжатого потока заранее неизвестна.
+            del response['Content-Length']
+        else:
+            compressed = compress(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Сжатое тело отличается побайтно, сильный ETag стал бы неверным.
+        if response.has_header('ETag'):
+            response['ETag'] = STRONG_ETAG_RE.sub('W/"', response['ETag'])
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,133 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Приложения, которые всегда читают с основной базы: вход, сессии,
+# админка и очередь задач должны видеть только что записанные данные.
+PRIMARY_APPS = {'auth', 'sessions', 'admin', 'core'}
+STICKY_COOKIE = 'use_primary_db'
+
+_state = threading.local()
+
+
+def replicas() -> list:
+    return list(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def replica_routing(primary: bool = False):
+    '''Задаёт, откуда читать в текущем потоке.
+
+    Внутри блока чтения идут с одной случайно выбранной реплики,
+    пока не выставлен primary или пока в блоке не случилась запись:
+    после неё поток читает свои же данные с основной базы. Вне блока
+    (команды, фоновые задачи, потоковая отдача ответа) всё читается
+    с основной базы.
+
+    '''
+    previous = (getattr(_state, 'routing', False),
+                getattr(_state, 'primary', False),
+                getattr(_state, 'wrote', False),
+                getattr(_state, 'replica', None))
+    # Реплики отстают по-разному: запрос, читающий с нескольких,
+    # мог бы собрать страницу из разных моментов времени.
+    replica = random.choice(replicas()) if replicas() else None
+    (_state.routing, _state.primary, _state.wrote,
+     _state.replica) = True, primary, False, replica
+    try:
+        yield _state
+    finally:
+        (_state.routing, _state.primary, _state.wrote,
+         _state.replica) = previous
+
+
+def reading_replica():
+    '''Реплика, с которой сейчас читает поток, или None.
+
+    Прочитанное с реплики нельзя класть в общий кэш: сбросы кэша
+    и версии лент меняются вместе с основной базой, а реплика может
+    ещё не догнать её, и устаревшие данные вернулись бы в кэш.
+
+    '''
+    if (not settings.DATABASE_REPLICAS
+            or not getattr(_state, 'routing', False)
+            or getattr(_state, 'primary', False)
+            or getattr(_state, 'wrote', False)):
+        return None
+    return getattr(_state, 'replica', None)
+
+
+@contextmanager
+def use_primary():
+    '''Читать только с основной базы внутри блока.'''
+    previous = getattr(_state, 'primary', False)
+    _state.primary = True
+    try:
+        yield
+    finally:
+        _state.primary = previous
+
+
+def primary_db(view_func):
+    '''Декоратор view, которое читает и пишет только основную базу.'''
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    '''Пишет в default, читает с реплик из DATABASE_REPLICAS.
+
+    С реплик читают только блоки replica_routing(), каждый - с одной.
+
+    '''
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return reading_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    '''Направляет чтения запроса на реплики или основную базу.
+
+    Небезопасные запросы (POST и т.п.) работают только с основной
+    базой. После запроса, который что-то записал, клиент получает
+    куку, и следующие REPLICA_STICKY_SECONDS секунд его запросы тоже
+    читают с основной базы: реплика могла ещё не догнать запись.
+
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        primary = (request.method not in ('GET', 'HEAD', 'OPTIONS')
+                   or STICKY_COOKIE in request.COOKIES)
+        with replica_routing(primary) as state:
+            response = self.get_response(request)
+            wrote = state.wrote
+        if wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS, httponly=True)
+        return response
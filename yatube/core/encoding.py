@@ -0,0 +1,34 @@
+def accepted_encodings(header: str) -> dict:
+    '''Кодировки из заголовка Accept-Encoding с их весами q.'''
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def choose_encoding(header: str, available) -> str:
+    '''Лучшая из кодировок available, которую принимает клиент.
+
+    available перечислены от предпочтительной к худшей; при равных
+    весах выбирается первая. None - отдавать без сжатия.
+
+    '''
+    encodings = accepted_encodings(header)
+    default = encodings.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = encodings.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
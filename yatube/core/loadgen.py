@@ -0,0 +1,198 @@
+import io
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.db import connections
+
+# Вес сценария - доля запросов, которые он получает в смеси.
+DEFAULT_WEIGHTS = {
+    'feed': 60,
+    'post_detail': 25,
+    'login': 10,
+    'post_create': 5,
+}
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    '''Перцентиль по методу ближайшего ранга.'''
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+
+class WSGIClient:
+    '''Браузер одного виртуального пользователя поверх WSGI-приложения.
+
+    Запросы передаются приложению напрямую, без сети и сервера;
+    куки (сессия и CSRF) хранятся между запросами.
+
+    '''
+
+    def __init__(self, application, host='localhost'):
+        self.application = application
+        self.host = host
+        self.cookies = SimpleCookie()
+
+    def request(self, method: str, url: str, data=None):
+        path, _, query = url.partition('?')
+        body = urlencode(data or {}).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': self.host,
+            'HTTP_COOKIE': '; '.join(
+                f'{key}={morsel.value}'
+                for key, morsel in self.cookies.items()),
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if 'csrftoken' in self.cookies:
+            environ['HTTP_X_CSRFTOKEN'] = self.cookies['csrftoken'].value
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split()[0])
+            started['headers'] = headers
+
+        response = self.application(environ, start_response)
+        try:
+            content = b''.join(response)
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        for name, value in started['headers']:
+            if name.lower() == 'set-cookie':
+                self.cookies.load(value)
+        return started['status'], dict(started['headers']), content, response
+
+
+class LoadGenerator:
+    '''Гоняет взвешенную смесь сценариев из пула потоков.
+
+    Для каждого ответа запоминаются имя view (из отчёта
+    QueryBudgetMiddleware), статус и время ответа.
+
+    '''
+
+    def __init__(self, application, urls, credentials, weights=None,
+                 seed=0):
+        self.application = application
+        self.urls = urls
+        self.credentials = credentials
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.seed = seed
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _start_thread(self, number: int):
+        # Номер потока, а не его идентификатор: с тем же seed прогон
+        # повторяет ту же смесь сценариев.
+        self.local.random = random.Random(self.seed + number)
+        self.local.anonymous = WSGIClient(self.application)
+        self.local.user = WSGIClient(self.application)
+        self.local.logged_in = False
+
+    def _request(self, client, method, url, data=None):
+        started = time.perf_counter()
+        status, headers, _, response = client.request(method, url, data)
+        elapsed = time.perf_counter() - started
+        report = getattr(response, 'query_report', None)
+        name = report.view_name if report else urlsplit(url).path
+        with self.lock:
+            self.samples[name].append(elapsed)
+            if status >= 500:
+                self.errors[name] += 1
+        return status, headers
+
+    def feed(self):
+        '''Аноним читает главную, ленту группы или автора.'''
+        rng = self.local.random
+        feeds = self.urls['feeds']
+        url = feeds[0] if rng.random() < 0.5 else rng.choice(feeds)
+        page = rng.choice((1, 1, 1, 2, 3))
+        self._request(self.local.anonymous, 'GET', f'{url}?page={page}')
+
+    def post_detail(self):
+        '''Аноним открывает страницу поста.'''
+        self._request(self.local.anonymous, 'GET',
+                      self.local.random.choice(self.urls['posts']))
+
+    def login(self):
+        '''Пользователь открывает форму входа и входит.'''
+        username, password = self.local.random.choice(self.credentials)
+        self.local.user.cookies = SimpleCookie()
+        self._request(self.local.user, 'GET', self.urls['login'])
+        status, _ = self._request(
+            self.local.user, 'POST', self.urls['login'],
+            {'username': username, 'password': password})
+        self.local.logged_in = status == 302
+
+    def post_create(self):
+        '''Пользователь публикует пост, при необходимости войдя.'''
+        if not self.local.logged_in:
+            self.login()
+        self._request(self.local.user, 'POST', self.urls['post_create'],
+                      {'text': 'Пост из нагрузочного теста'})
+
+    def _worker(self, number: int, requests: int):
+        self._start_thread(number)
+        names = list(self.weights)
+        weights = [self.weights[name] for name in names]
+        try:
+            for _ in range(requests):
+                scenario = self.local.random.choices(names, weights)[0]
+                getattr(self, scenario)()
+        finally:
+            connections.close_all()
+
+    def run(self, requests: int, threads: int) -> dict:
+        '''Выполняет requests сценариев в threads потоках.'''
+        per_thread = [requests // threads] * threads
+        for number in range(requests % threads):
+            per_thread[number] += 1
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            for future in [executor.submit(self._worker, number, count)
+                           for number, count in enumerate(per_thread)]:
+                future.result()
+        return self.report(time.perf_counter() - started, threads)
+
+    def report(self, elapsed: float, threads: int) -> dict:
+        views = {}
+        for name, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            views[name] = {
+                'requests': len(samples),
+                'errors': self.errors[name],
+                'rps': round(len(samples) / elapsed, 1),
+                'p50_ms': round(percentile(samples, 50) * 1000, 2),
+                'p95_ms': round(percentile(samples, 95) * 1000, 2),
+                'p99_ms': round(percentile(samples, 99) * 1000, 2),
+            }
+        total = sum(view['requests'] for view in views.values())
+        return {
+            'threads': threads,
+            'seconds': round(elapsed, 2),
+            'requests': total,
+            'rps': round(total / elapsed, 1),
+            'views': views,
+        }
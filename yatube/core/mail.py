@@ -0,0 +1,98 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .tasks import task
+
+
+def message_to_json(message) -> dict:
+    '''Письмо в виде, который можно сохранить в аргументах задачи.
+
+    Вложения принимаются только в виде (имя, содержимое, тип):
+    готовые MIME-части в JSON не переводятся.
+
+    '''
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            raise ValueError(
+                'Вложение письма должно быть кортежем '
+                '(имя, содержимое, тип), а не MIME-частью')
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append(
+            [filename, base64.b64encode(content).decode('ascii'), mimetype])
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'content_subtype': message.content_subtype,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+    }
+
+
+def message_from_json(data: dict) -> EmailMultiAlternatives:
+    '''Письмо, сохранённое message_to_json.'''
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(alternative)
+                      for alternative in data['alternatives']],
+        attachments=[(filename, base64.b64decode(content), mimetype)
+                     for filename, content, mimetype
+                     in data['attachments']],
+    )
+    message.content_subtype = data['content_subtype']
+    return message
+
+
+def describe_messages(messages: list) -> str:
+    '''Письма задачи без текста и адресов: в тексте бывают ссылки
+    сброса пароля.'''
+    recipients = sum(len(message['to'] + message['cc'] + message['bcc'])
+                     for message in messages)
+    subjects = ', '.join(sorted({message['subject']
+                                 for message in messages}))
+    return (f'Писем: {len(messages)}, получателей: {recipients}, '
+            f'темы: {subjects}')
+
+
+@task(summary=describe_messages)
+def send_messages(messages: list) -> None:
+    '''Отправляет письма через TASKS_EMAIL_BACKEND.'''
+    messages = [message_from_json(message) for message in messages]
+    with get_connection(settings.TASKS_EMAIL_BACKEND) as connection:
+        connection.send_messages(messages)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    '''Почтовый бэкенд, который отправляет письма фоновой задачей.
+
+    Запрос не ждёт SMTP: письма сохраняются в задачу, а отправляет
+    их бэкенд из TASKS_EMAIL_BACKEND. Неотправленные письма
+    повторяются по правилам очереди.
+
+    '''
+
+    def send_messages(self, email_messages):
+        email_messages = list(email_messages)
+        if not email_messages:
+            return 0
+        send_messages.delay(
+            [message_to_json(message) for message in email_messages])
+        return len(email_messages)
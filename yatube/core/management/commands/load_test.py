@@ -0,0 +1,106 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core.loadgen import DEFAULT_WEIGHTS, LoadGenerator
+from posts.models import Group, Post
+
+User = get_user_model()
+
+LOADTEST_USERNAME = 'loadtest_{}'
+LOADTEST_PASSWORD = 'loadtest-password'
+
+
+def weight(value):
+    name, _, number = value.partition('=')
+    if name not in DEFAULT_WEIGHTS or not number.isdigit():
+        raise ValueError(value)
+    return name, int(number)
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест: гоняет смесь запросов через '
+            'yatube.wsgi.application в пуле потоков без сервера и '
+            'выводит пропускную способность и перцентили времени ответа '
+            'по view. Пишет в текущую базу.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Сколько сценариев выполнить')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Сколько потоков шлют запросы')
+        parser.add_argument('--accounts', type=int, default=20,
+                            help='Сколько пользователей логинятся')
+        parser.add_argument('--weight', type=weight, action='append',
+                            default=[], metavar='СЦЕНАРИЙ=ВЕС',
+                            help='Вес сценария: '
+                                 + ', '.join(DEFAULT_WEIGHTS))
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Куда записать отчёт в JSON')
+
+    def prepare_urls(self) -> dict:
+        post_ids = list(Post.objects.values_list('pk', flat=True)[:500])
+        if not post_ids:
+            raise CommandError(
+                'В базе нет постов, заполните её командой seed_posts.')
+        slugs = Group.objects.exclude(posts_count=0).values_list(
+            'slug', flat=True)[:20]
+        usernames = Post.objects.values_list(
+            'author__username', flat=True).distinct()[:20]
+        return {
+            'feeds': [reverse('posts:index')]
+            + [reverse('posts:group_list', args=(slug,)) for slug in slugs]
+            + [reverse('posts:profile', args=(username,))
+               for username in usernames],
+            'posts': [reverse('posts:post_detail', args=(post_id,))
+                      for post_id in post_ids],
+            'login': reverse('users:login'),
+            'post_create': reverse('posts:post_create'),
+        }
+
+    def prepare_accounts(self, number: int) -> list:
+        password = make_password(LOADTEST_PASSWORD)
+        usernames = [LOADTEST_USERNAME.format(index)
+                     for index in range(number)]
+        existing = set(User.objects.filter(username__in=usernames)
+                       .values_list('username', flat=True))
+        User.objects.bulk_create(
+            User(username=username, password=password)
+            for username in usernames if username not in existing)
+        User.objects.filter(username__in=usernames).update(password=password)
+        return [(username, LOADTEST_PASSWORD) for username in usernames]
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        if options['threads'] < 1 or options['requests'] < 1:
+            raise CommandError('--threads и --requests должны быть '
+                               'больше нуля.')
+        weights = dict(DEFAULT_WEIGHTS, **dict(options['weight']))
+        generator = LoadGenerator(
+            application,
+            self.prepare_urls(),
+            self.prepare_accounts(max(options['accounts'], 1)),
+            weights=weights,
+            seed=options['seed'],
+        )
+        report = generator.run(options['requests'], options['threads'])
+
+        self.stdout.write(
+            f'{report["requests"]} запросов за {report["seconds"]} с, '
+            f'{report["rps"]} запросов/с, потоков: {report["threads"]}')
+        self.stdout.write(
+            f'{"view":<28}{"запросов":>9}{"ошибок":>8}{"rps":>8}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}')
+        for name, view in report['views'].items():
+            self.stdout.write(
+                f'{name:<28}{view["requests"]:>9}{view["errors"]:>8}'
+                f'{view["rps"]:>8}{view["p50_ms"]:>10}'
+                f'{view["p95_ms"]:>10}{view["p99_ms"]:>10}')
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(dict(report, weights=weights), output,
+                          ensure_ascii=False, indent=2)
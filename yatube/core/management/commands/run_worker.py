@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import due_task_ids, execute_task, run_task
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из таблицы: отложенные повторы, '
+            'задачи упавших процессов и поставленные без пула.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить задачи, которые пора выполнить, и выйти.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди в секундах.')
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Сколько задач выполнять одновременно; при 1 задачи '
+                 'выполняются в основном потоке.')
+
+    def handle(self, *args, **options):
+        threads = max(options['threads'], 1)
+        executor = None
+        if threads > 1:
+            executor = ThreadPoolExecutor(threads,
+                                          thread_name_prefix='worker')
+        try:
+            while True:
+                task_ids = due_task_ids()
+                if executor is None:
+                    results = [run_task(task_id) for task_id in task_ids]
+                else:
+                    results = list(executor.map(execute_task, task_ids))
+                if task_ids:
+                    self.stdout.write(
+                        f'Выполнено: {results.count(True)}, '
+                        f'с ошибкой: {results.count(False)}')
+                if options['once']:
+                    break
+                if not task_ids:
+                    connections.close_all()
+                    time.sleep(options['interval'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную SQLite-базу во все реплики из '
+            'DATABASE_REPLICAS. Нужна для локальной проверки чтения '
+            'с реплик; у других СУБД копированием занимается репликация.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('В DATABASE_REPLICAS нет реплик.')
+        aliases = [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]
+        if any(connections[alias].vendor != 'sqlite' for alias in aliases):
+            raise CommandError('Копировать можно только SQLite-базы.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.ensure_connection()
+            # backup() даёт согласованную копию даже во время записи
+            # в основную базу.
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f'{alias}: скопировано')
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    '''Фоновая задача из очереди core.tasks.
+
+    Выполненные задачи удаляются; в таблице остаются ждущие,
+    выполняющиеся и упавшие после всех попыток.
+
+    '''
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=200, verbose_name='Задача')
+    payload = models.TextField(verbose_name='Аргументы')
+    status = models.CharField(max_length=10, choices=STATUSES,
+                              default=PENDING, verbose_name='Состояние')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток')
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Наибольшее число попыток')
+    run_at = models.DateTimeField(default=timezone.now,
+                                  verbose_name='Выполнить после')
+    locked_until = models.DateTimeField(blank=True, null=True,
+                                        verbose_name='Занята до')
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Дата создания')
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='task_status_run_at_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}: {self.status}'
@@ -0,0 +1,167 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('yatube.queries')
+
+# Списки параметров IN (%s, %s, ...) разной длины - один и тот же запрос.
+IN_LIST_RE = re.compile(r'\(%s(?:, %s)*\)')
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def query_budget(max_queries: int):
+    '''Объявляет, сколько SQL-запросов может сделать view.
+
+    Бюджет читается QueryBudgetMiddleware и тестами,
+    декоратор ставится поверх остальных.
+
+    '''
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    return getattr(view_func, 'query_budget', None)
+
+
+def query_shape(sql: str) -> str:
+    '''Запрос без значений параметров: одинаковая форма - один запрос.'''
+    return IN_LIST_RE.sub('(...)', sql)
+
+
+class QueryReport:
+    '''SQL-запросы, выполненные за время одного запроса к сайту.'''
+
+    def __init__(self, view_name=None, budget=None):
+        self.view_name = view_name
+        self.budget = budget
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def repeated_shapes(self, threshold: int = None) -> dict:
+        '''Формы запросов, повторившиеся не меньше threshold раз.
+
+        Один и тот же запрос с разными параметрами в цикле -
+        признак N+1: связанные объекты не загружены заранее.
+
+        '''
+        if threshold is None:
+            threshold = settings.QUERY_REPEAT_THRESHOLD
+        shapes = Counter(query_shape(sql) for sql, _ in self.queries)
+        return {shape: number for shape, number in shapes.items()
+                if number >= threshold}
+
+    def record(self):
+        '''Контекстный менеджер, записывающий запросы во все базы.'''
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def _update_stats(report: QueryReport, repeated: dict) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(report.view_name, {
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'sql_time': 0.0,
+            'over_budget': 0,
+            'n_plus_one': 0,
+        })
+        stats['budget'] = report.budget
+        stats['requests'] += 1
+        stats['queries'] += report.count
+        stats['max_queries'] = max(stats['max_queries'], report.count)
+        stats['sql_time'] += report.duration
+        stats['over_budget'] += report.over_budget
+        stats['n_plus_one'] += bool(repeated)
+
+
+def view_query_stats() -> dict:
+    '''Накопленные с запуска процесса счётчики запросов по view.'''
+    with _stats_lock:
+        return {view_name: dict(stats) for view_name, stats in _stats.items()}
+
+
+class QueryBudgetMiddleware:
+    '''Считает SQL-запросы и их время для каждого view.
+
+    Отчёт доступен в response.query_report; у потоковых ответов
+    он дополняется, пока читается содержимое. Превышение бюджета
+    и повторяющиеся запросы пишутся в лог yatube.queries.
+
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        report = QueryReport()
+        with report.record():
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        report.view_name = match.view_name
+        report.budget = get_query_budget(match.func)
+        response.query_report = report
+        if response.streaming:
+            # Выгрузки читают базу, пока ответ отдаётся клиенту:
+            # отчёт закрывается, когда содержимое прочитано.
+            response.streaming_content = self.record_streaming(
+                report, response.streaming_content)
+            return response
+        self.finish(report)
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'db;dur={report.duration * 1000:.1f};'
+                f'desc="{report.count} queries"')
+        return response
+
+    def record_streaming(self, report, content):
+        try:
+            with report.record():
+                yield from content
+        finally:
+            self.finish(report)
+
+    def finish(self, report):
+        repeated = report.repeated_shapes()
+        _update_stats(report, repeated)
+        if report.over_budget:
+            logger.warning(
+                '%s: %d SQL-запросов при бюджете %d',
+                report.view_name, report.count, report.budget)
+        for shape, number in repeated.items():
+            logger.warning(
+                '%s: возможен N+1, запрос выполнен %d раз: %s',
+                report.view_name, number, shape)
@@ -0,0 +1,16 @@
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    '''Выполняет PRAGMA из SQLITE_PRAGMAS на новом соединении с SQLite.
+
+    Подключается к сигналу connection_created: PRAGMA вроде
+    synchronous, busy_timeout и mmap_size действуют только в пределах
+    соединения, поэтому их нужно задавать каждому новому.
+
+    '''
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
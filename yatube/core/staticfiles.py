@@ -0,0 +1,159 @@
+import gzip
+import mimetypes
+import os
+import posixpath
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .encoding import choose_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Файлы, которые имеет смысл сжимать: картинки PNG и JPEG уже сжаты.
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.ico', '.txt',
+                           '.json', '.xml', '.html', '.ttf', '.eot')
+# Расширения сжатых копий и кодировки, от предпочтительной к худшей.
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def compressors() -> dict:
+    '''Доступные сжатия: brotli - если установлен пакет brotli.'''
+    result = {}
+    if brotli is not None:
+        result['br'] = lambda data: brotli.compress(data, quality=11)
+    # mtime=0: сжатая копия одного и того же файла всегда одинакова.
+    result['gzip'] = lambda data: gzip.compress(data, 9, mtime=0)
+    return result
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    '''Хранилище с хэшем содержимого в именах и сжатыми копиями.
+
+    collectstatic пишет рядом с каждым сжимаемым файлом копии .gz
+    и .br (если установлен brotli), но только когда они меньше
+    оригинала. Отдаёт их StaticFilesMiddleware.
+
+    '''
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    def compress(self, name: str):
+        '''Пишет сжатые копии файла name и выдаёт их имена.'''
+        with self.open(name) as original:
+            data = original.read()
+        for encoding, compress in compressors().items():
+            compressed_name = name + ENCODING_SUFFIXES[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                self._save(compressed_name, ContentFile(compressed))
+                yield compressed_name
+
+
+class StaticFile:
+    '''Файл из STATIC_ROOT и его сжатые копии.'''
+
+    def __init__(self, path: str, immutable: bool):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.immutable = immutable
+        self.content_type = (mimetypes.guess_type(path)[0]
+                             or 'application/octet-stream')
+        self.variants = {
+            encoding: path + suffix
+            for encoding, suffix in ENCODING_SUFFIXES.items()
+            if os.path.isfile(path + suffix)}
+
+
+class StaticFilesMiddleware:
+    '''Отдаёт собранную статику из STATIC_ROOT без веб-сервера.
+
+    Список файлов читается один раз при старте, после collectstatic
+    процесс нужно перезапустить. Файл
+    отдаётся в сжатой копии, которую принимает клиент. Имена
+    с хэшем из манифеста кэшируются браузером навсегда (immutable),
+    остальные - на STATIC_MAX_AGE секунд.
+
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not settings.STATIC_ROOT or '://' in settings.STATIC_URL:
+            raise MiddlewareNotUsed
+        self.prefix = settings.STATIC_URL
+        self.files = self.collect_files(settings.STATIC_ROOT)
+        if not self.files:
+            raise MiddlewareNotUsed
+
+    @staticmethod
+    def collect_files(root: str) -> dict:
+        hashed_names = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values())
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(tuple(ENCODING_SUFFIXES.values())):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                files[name] = StaticFile(path, name in hashed_names)
+        return files
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix)):
+            name = posixpath.normpath(
+                unquote(request.path_info[len(self.prefix):]))
+            static_file = self.files.get(name)
+            if static_file is not None:
+                return self.serve(request, static_file)
+        return self.get_response(request)
+
+    def serve(self, request, static_file):
+        if static_file.immutable:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = f'public, max-age={settings.STATIC_MAX_AGE}'
+        if not was_modified_since(
+                request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                static_file.mtime, static_file.size):
+            response = HttpResponseNotModified()
+        else:
+            encoding = choose_encoding(
+                request.META.get('HTTP_ACCEPT_ENCODING', ''),
+                static_file.variants)
+            path = static_file.variants.get(encoding, static_file.path)
+            response = FileResponse(open(path, 'rb'))
+            # FileResponse угадал бы тип по имени .gz-копии.
+            response['Content-Type'] = static_file.content_type
+            if encoding is not None:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(static_file.mtime)
+        response['Cache-Control'] = cache_control
+        if static_file.variants:
+            response['Vary'] = 'Accept-Encoding'
+        return response
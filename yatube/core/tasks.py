@@ -0,0 +1,202 @@
+import datetime
+import json
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger('yatube.tasks')
+
+_registry = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def task(func=None, *, max_attempts: int = None, summary=None):
+    '''Регистрирует функцию как фоновую задачу.
+
+    У функции появляется метод delay(*args, **kwargs), который ставит
+    вызов в очередь. Аргументы должны сериализоваться в JSON.
+
+    summary - функция с теми же аргументами, что у задачи, которая
+    описывает их строкой. Она нужна задачам с секретами в аргументах
+    (например, письмам со ссылками сброса пароля): админка показывает
+    только описание, а у окончательно упавшей задачи аргументы
+    заменяются им.
+
+    '''
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = max_attempts
+        func.summary = summary
+        func.delay = lambda *args, **kwargs: enqueue(func, *args, **kwargs)
+        _registry[func.task_name] = func
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_task(name: str):
+    if name not in _registry:
+        # Модуль задачи ещё не импортирован в этом процессе,
+        # например в run_worker: импорт зарегистрирует её.
+        import_string(name)
+    return _registry[name]
+
+
+def describe_payload(task) -> str:
+    '''Аргументы задачи task для показа людям.'''
+    payload = json.loads(task.payload)
+    if 'summary' in payload:
+        return payload['summary']
+    try:
+        summary = get_task(task.name).summary
+    except ImportError:
+        summary = None
+    if summary is None:
+        return task.payload
+    return summary(*payload['args'], **payload['kwargs'])
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.TASKS_THREADS, thread_name_prefix='task')
+        return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    '''Останавливает пул потоков, дождавшись начатых задач.
+
+    Задачи, которые не успели начаться, остаются в таблице,
+    их выполнит run_worker.
+
+    '''
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def enqueue(func, *args, **kwargs):
+    '''Ставит вызов func в очередь.
+
+    Задача сохраняется в таблицу в текущей транзакции и передаётся
+    пулу потоков процесса после её фиксации: откат транзакции
+    отменяет и задачу. С TASKS_EAGER задача выполняется сразу.
+
+    '''
+    if settings.TASKS_EAGER:
+        return func(*args, **kwargs)
+    queued = Task.objects.create(
+        name=func.task_name,
+        payload=json.dumps({'args': args, 'kwargs': kwargs},
+                           cls=DjangoJSONEncoder),
+        max_attempts=func.max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    )
+    transaction.on_commit(lambda: _submit(queued.pk))
+    return queued
+
+
+def _submit(task_id: int) -> None:
+    connection = connections[Task.objects.db]
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        # В общей памяти SQLite блокирует таблицы без ожидания:
+        # запись из второго потока упала бы, выполняем здесь же.
+        run_task(task_id)
+        return
+    _get_executor().submit(execute_task, task_id)
+
+
+def execute_task(task_id: int):
+    '''Выполняет задачу в потоке пула и закрывает его соединения.'''
+    try:
+        return run_task(task_id)
+    finally:
+        connections.close_all()
+
+
+def claim_task(task_id: int):
+    '''Забирает задачу на выполнение или возвращает None.
+
+    Подходит ждущая задача, срок которой наступил, или выполняющаяся,
+    чей исполнитель не продлил аренду (процесс упал).
+
+    '''
+    now = timezone.now()
+    claimed = Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now),
+        pk=task_id,
+    ).update(
+        status=Task.RUNNING,
+        attempts=F('attempts') + 1,
+        locked_until=now + datetime.timedelta(
+            seconds=settings.TASKS_LEASE_SECONDS),
+    )
+    if not claimed:
+        return None
+    return Task.objects.get(pk=task_id)
+
+
+def run_task(task_id: int):
+    '''Выполняет задачу task_id.
+
+    Возвращает True при успехе, False при ошибке и None, если задачу
+    уже забрал другой исполнитель. Упавшая задача повторяется через
+    TASKS_RETRY_DELAY секунд, удваивая паузу с каждой попыткой, пока
+    не исчерпает max_attempts.
+
+    '''
+    task = claim_task(task_id)
+    if task is None:
+        return None
+    try:
+        payload = json.loads(task.payload)
+        # Без общей транзакции: в SQLite чтение, ставшее записью,
+        # сразу падает, если базу успел изменить другой поток.
+        # Задача открывает транзакции сама и должна быть повторяемой.
+        get_task(task.name)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        logger.exception('Задача %s упала (попытка %s из %s)',
+                         task, task.attempts, task.max_attempts)
+        task.last_error = traceback.format_exc()
+        task.locked_until = None
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+            # Повторять задачу больше не будут: секреты из аргументов
+            # в таблице не нужны.
+            task.payload = json.dumps({'summary': describe_payload(task)})
+        else:
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + datetime.timedelta(
+                seconds=settings.TASKS_RETRY_DELAY
+                * 2 ** (task.attempts - 1))
+        task.save(update_fields=('status', 'run_at', 'locked_until',
+                                 'last_error', 'payload'))
+        return False
+    task.delete()
+    return True
+
+
+def due_task_ids(limit: int = 100) -> list:
+    '''Задачи, которые пора выполнить: новые, повторы и брошенные.'''
+    now = timezone.now()
+    return list(Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now),
+    ).order_by('run_at').values_list('pk', flat=True)[:limit])
@@ -0,0 +1,87 @@
+import os
+import re
+
+from django.conf import settings
+from django.template.loaders import base, cached
+
+# Содержимое этих тегов выводится как есть, пробелы в нём значимы.
+PRESERVED_RE = re.compile(r'(<(?:pre|textarea)\b.*?</(?:pre|textarea)>)',
+                          re.DOTALL | re.IGNORECASE)
+TOKEN_RE = re.compile(r'\{%\s*(\w+).*?%\}|\{#.*?#\}')
+# Теги, которые сами ничего не выводят: строка только из них
+# не оставляет в странице пустую строку.
+SILENT_TAGS = frozenset((
+    'autoescape', 'endautoescape', 'block', 'endblock', 'comment',
+    'endcomment', 'empty', 'extends', 'for', 'endfor', 'if', 'elif',
+    'else', 'endif', 'ifchanged', 'endifchanged', 'load', 'spaceless',
+    'endspaceless', 'with', 'endwith',
+))
+
+
+def _is_silent(line: str) -> bool:
+    tokens = list(TOKEN_RE.finditer(line))
+    return (bool(tokens)
+            and all(token.group(1) is None or token.group(1) in SILENT_TAGS
+                    for token in tokens)
+            and not TOKEN_RE.sub('', line).strip())
+
+
+def _strip_text(text: str, first: bool) -> str:
+    lines = text.split('\n')
+    result = []
+    for number, line in enumerate(lines):
+        if number or first:
+            line = line.lstrip()
+        if number == len(lines) - 1:
+            result.append(line)
+            break
+        line = line.rstrip()
+        # Начало части после </pre> - продолжение строки с тегом,
+        # её перевод строки сохраняем.
+        if not line and (number or first):
+            continue
+        result.append(line if _is_silent(line) else line + '\n')
+    return ''.join(result)
+
+
+def strip_whitespace(source: str) -> str:
+    '''Убирает из исходника шаблона отступы и пустые строки.
+
+    Переводы строк между строками с текстом остаются: между строчными
+    элементами сохраняется пробел. Строки только из тегов вроде
+    {% if %} и {% endfor %} склеиваются со следующей. Содержимое
+    <pre> и <textarea> не меняется.
+
+    '''
+    parts = PRESERVED_RE.split(source)
+    for number in range(0, len(parts), 2):
+        parts[number] = _strip_text(parts[number], first=number == 0)
+    return ''.join(parts)
+
+
+class Loader(cached.Loader):
+    '''Кэширующий загрузчик, который сжимает пробелы при компиляции.
+
+    Пробелы убираются один раз, до компиляции шаблона, и рендер
+    их не касается. Сжимаются только шаблоны из DIRS проекта:
+    шаблоны приложений Django (например, текстовое письмо сброса
+    пароля) остаются как есть. С DEBUG шаблоны не кэшируются, чтобы
+    правки были видны без перезапуска.
+
+    '''
+
+    def __init__(self, engine, loaders):
+        super().__init__(engine, loaders)
+        self.strip_dirs = tuple(os.path.join(os.path.abspath(directory), '')
+                                for directory in engine.dirs)
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.name.startswith(self.strip_dirs):
+            contents = strip_whitespace(contents)
+        return contents
+
+    def get_template(self, template_name, skip=None):
+        if settings.DEBUG:
+            return base.Loader.get_template(self, template_name, skip)
+        return super().get_template(template_name, skip)
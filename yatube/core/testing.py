@@ -0,0 +1,35 @@
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    '''Запуск тестов manage.py test.
+
+    Перед удалением тестовой базы отбрасывает просмотры постов,
+    накопленные тестами: записывать их уже некуда.
+
+    '''
+
+    def teardown_databases(self, old_config, **kwargs):
+        from posts.viewcounts import view_counter
+
+        view_counter.reset()
+        super().teardown_databases(old_config, **kwargs)
+
+
+class QueryBudgetTestMixin:
+    '''Проверки для тестов на основе отчёта QueryBudgetMiddleware.'''
+
+    def assertWithinQueryBudget(self, response):
+        if response.streaming:
+            # Запросы потокового ответа выполняются при его чтении.
+            b''.join(response.streaming_content)
+        report = response.query_report
+        queries = '\n'.join(sql for sql, _ in report.queries)
+        self.assertIsNotNone(
+            report.budget, f'У {report.view_name} не объявлен бюджет')
+        self.assertLessEqual(
+            report.count, report.budget,
+            f'{report.view_name} превысил бюджет запросов:\n{queries}')
+        self.assertEqual(
+            report.repeated_shapes(), {},
+            f'{report.view_name} повторяет одинаковые запросы (N+1)')
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from yatube.wsgi import application
+
+from .loadgen import LoadGenerator, WSGIClient, percentile
+
+User = get_user_model()
+
+
+class LoadGeneratorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='test_author', password='test-password')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_percentile(self):
+        '''Перцентили считаются по ближайшему рангу.'''
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertEqual(percentile([], 50), 0)
+
+    def test_thread_random_reproducible(self):
+        '''Случайность потока задают seed и номер потока.'''
+        def sequence(number, seed=1):
+            generator = LoadGenerator(application, {}, [], seed=seed)
+            generator._start_thread(number)
+            return [generator.local.random.random() for _ in range(3)]
+
+        self.assertEqual(sequence(0), sequence(0))
+        self.assertNotEqual(sequence(0), sequence(1))
+        self.assertNotEqual(sequence(0), sequence(0, seed=2))
+
+    def test_client_logs_in_and_posts(self):
+        '''Клиент проходит вход с CSRF и публикует пост через WSGI.'''
+        client = WSGIClient(application)
+        login_url = reverse('users:login')
+
+        client.request('GET', login_url)
+        status, _, _, _ = client.request('POST', login_url, {
+            'username': 'test_author',
+            'password': 'test-password',
+        })
+        self.assertEqual(status, 302)
+
+        status, _, _, response = client.request(
+            'POST', reverse('posts:post_create'), {'text': 'Пост из WSGI'})
+
+        self.assertEqual(status, 302)
+        self.assertEqual(response.query_report.view_name,
+                         'posts:post_create')
+        self.assertTrue(Post.objects.filter(
+            author=LoadGeneratorTests.user, text='Пост из WSGI').exists())
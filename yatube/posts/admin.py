@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Post, Group
+from .models import Follow, Group, Post
+from .search import build_match_query, fts_available, matching_post_ids
 
 
 @admin.register(Post)
@@ -9,7 +10,28 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    list_select_related = ('author', 'group')
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if db_field.name == 'group' and request is not None:
+            # Поле group редактируется в каждой строке списка:
+            # без этого список групп запрашивается для каждой строки.
+            if not hasattr(request, 'post_group_choices'):
+                request.post_group_choices = list(formfield.choices)
+            formfield.choices = request.post_group_choices
+        return formfield
+
+    def get_search_results(self, request, queryset, search_term):
+        # Из ввода без слов (одни знаки препинания) запрос FTS5
+        # не собрать: MATCH '' - ошибка SQLite.
+        if not build_match_query(search_term) or not fts_available():
+            return super().get_search_results(
+                request, queryset, search_term)
+        return queryset.filter(pk__in=matching_post_ids(search_term)), False
+
 
 admin.site.register(Group)
+admin.site.register(Follow)
@@ -1,6 +1,24 @@
+import atexit
+import sys
+
 from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name = 'Записи'
+
+    def ready(self):
+        from . import signals
+        from .viewcounts import view_counter
+
+        post_migrate.connect(signals.search_index_installed, sender=self)
+        request_finished.connect(view_counter.flush_if_due)
+        # Просмотры из буфера не теряются при остановке процесса.
+        # У тестов (manage.py test, pytest) база к выходу уже удалена,
+        # их просмотры сбрасывает core.testing.TestRunner.
+        testing = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+        if not testing:
+            atexit.register(view_counter.flush)
@@ -0,0 +1,30 @@
+import datetime
+
+from django.utils import timezone
+
+from .models import MonthlyPostCount
+
+
+def post_month(pub_date) -> datetime.date:
+    '''Первый день месяца публикации по местному времени.'''
+    return timezone.localtime(pub_date).date().replace(day=1)
+
+
+def month_bounds(year: int, month: int) -> tuple:
+    '''Начало месяца и начало следующего по местному времени.
+
+    Посты месяца выбираются условием pub_date >= start
+    и pub_date < end: такой диапазон идёт по индексу, а __year
+    и __month оборачивают столбец в функцию и индекс не используют.
+    Для несуществующего месяца выбрасывается ValueError.
+
+    '''
+    start = datetime.datetime(year, month, 1)
+    end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def archive_months(group=None):
+    '''Месяцы с постами, от последнего к первому, с количествами.'''
+    return (MonthlyPostCount.objects.filter(group=group)
+            .exclude(posts_count=0))
@@ -0,0 +1,135 @@
+import os
+import random
+import shutil
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.test import override_settings
+
+from core.loadgen import percentile
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class ConcurrencyBenchmark:
+    '''Читатели и писатели в потоках на файловой SQLite-базе.
+
+    Каждый профиль (PRAGMA и CONN_MAX_AGE) работает со свежей копией
+    базы template. Операция обёрнута в сигналы начала и конца запроса,
+    поэтому соединения открываются и закрываются так же, как при
+    обработке запросов. Читатель загружает страницу ленты, писатель
+    сохраняет сессию и публикует пост, как post_create.
+
+    '''
+
+    def __init__(self, template: str, readers=8, writers=2, seconds=5.0,
+                 seed=0):
+        self.template = template
+        self.path = f'{template}.run'
+        self.readers = readers
+        self.writers = writers
+        self.seconds = seconds
+        self.seed = seed
+        self.posts = Post.objects.count()
+        self.author_ids = list(User.objects.values_list('pk', flat=True))
+
+    def read(self, rng) -> None:
+        offset = rng.randrange(max(self.posts - settings.POSTS_PER_PAGE, 1))
+        list(Post.objects.select_related('author', 'group')
+             [offset:offset + settings.POSTS_PER_PAGE])
+
+    def write(self, rng, session) -> None:
+        session['posts'] = session.get('posts', 0) + 1
+        session.save()
+        Post.objects.create(author_id=rng.choice(self.author_ids),
+                            text='Пост из замера конкурентной записи')
+
+    def _thread(self, number, operation, deadline, samples, errors):
+        rng = random.Random(self.seed + number)
+        args = (rng, SessionStore()) if operation == self.write else (rng,)
+        try:
+            while time.perf_counter() < deadline:
+                request_started.send(sender=self.__class__)
+                started = time.perf_counter()
+                try:
+                    operation(*args)
+                except OperationalError:
+                    errors.append(number)
+                else:
+                    samples.append(time.perf_counter() - started)
+                finally:
+                    request_finished.send(sender=self.__class__)
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def _summary(samples, errors, elapsed) -> dict:
+        samples = sorted(samples)
+        return {
+            'operations': len(samples),
+            'errors': len(errors),
+            'ops_per_second': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(samples, 50) * 1000, 2),
+            'p95_ms': round(percentile(samples, 95) * 1000, 2),
+            'p99_ms': round(percentile(samples, 99) * 1000, 2),
+        }
+
+    def run_profile(self, pragmas: dict, conn_max_age: int) -> dict:
+        '''Замер одного профиля на свежей копии базы.'''
+        connections.close_all()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        shutil.copyfile(self.template, self.path)
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        original = {key: database[key] for key in ('NAME', 'CONN_MAX_AGE')}
+        database.update(NAME=self.path, CONN_MAX_AGE=conn_max_age)
+        reads, writes = [], []
+        read_errors, write_errors = [], []
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                deadline = time.perf_counter() + self.seconds
+                threads = [
+                    threading.Thread(target=self._thread, args=(
+                        number, self.read, deadline, reads, read_errors))
+                    for number in range(self.readers)
+                ] + [
+                    threading.Thread(target=self._thread, args=(
+                        number, self.write, deadline, writes, write_errors))
+                    for number in range(self.readers,
+                                        self.readers + self.writers)
+                ]
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - started
+        finally:
+            connections.close_all()
+            database.update(original)
+        return {
+            'pragmas': pragmas,
+            'conn_max_age': conn_max_age,
+            'readers': self._summary(reads, read_errors, elapsed),
+            'writers': self._summary(writes, write_errors, elapsed),
+        }
+
+    def run(self, profiles: dict) -> dict:
+        return {
+            'posts': self.posts,
+            'readers': self.readers,
+            'writers': self.writers,
+            'seconds': self.seconds,
+            'profiles': {
+                name: self.run_profile(pragmas, conn_max_age)
+                for name, (pragmas, conn_max_age) in profiles.items()
+            },
+        }
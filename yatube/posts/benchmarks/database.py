@@ -0,0 +1,51 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+
+from yatube import settings_production
+
+from ..viewcounts import view_counter
+
+# Значения SQLite и модуля sqlite3 по умолчанию: с ними работает база
+# без профиля из settings_production.
+SQLITE_DEFAULTS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+    'mmap_size': 0,
+}
+
+
+@contextmanager
+def benchmark_database(path=None, pragmas=None, verbosity=1):
+    '''Файловая база для замеров с PRAGMA продакшена.
+
+    Тестовая база SQLite по умолчанию живёт в памяти и на замерах
+    выглядит быстрее настоящей. Здесь она создаётся файлом: без path -
+    во временном каталоге и удаляется после замеров, с path - остаётся
+    и переиспользуется следующим запуском. На каждом соединении
+    core.sqlite выполняет pragmas, по умолчанию - SQLITE_PRAGMAS
+    из settings_production.
+
+    '''
+    if pragmas is None:
+        pragmas = settings_production.SQLITE_PRAGMAS
+    connection = connections[DEFAULT_DB_ALIAS]
+    keepdb = path is not None
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = (
+                path or os.path.join(directory, 'benchmark.sqlite3'))
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            old_config = setup_databases(
+                verbosity, interactive=False, keepdb=keepdb)
+            try:
+                yield connection.settings_dict['NAME']
+            finally:
+                # Просмотры страниц из замеров относятся к этой базе.
+                view_counter.reset()
+                teardown_databases(old_config, verbosity, keepdb=keepdb)
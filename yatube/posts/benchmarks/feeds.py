@@ -0,0 +1,213 @@
+import platform
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from ..cards import card_posts
+from ..feeds import FEED_ALL
+from ..models import Group, Post
+from ..timeline import follow_author
+from ..utils import paginate_posts
+from .timing import measure
+from .transfer import TransferBenchmark
+
+User = get_user_model()
+
+# Сколько постов приходится на одного пользователя и одну группу.
+POSTS_PER_USER = 50
+POSTS_PER_GROUP = 2000
+# Сколько постов загружать при сравнении выборок для лент.
+LISTING_POSTS = 1000
+
+
+class FeedBenchmark:
+    '''Замеры страниц posts.urls и paginate_posts на текущей базе.'''
+
+    def __init__(self, repeat=5):
+        self.repeat = repeat
+        author_id = (Post.objects.order_by().values('author')
+                     .annotate(total=Count('pk')).order_by('-total')
+                     .values_list('author', flat=True).first())
+        if author_id is None:
+            raise ValueError('В базе нет постов.')
+        self.author = User.objects.get(pk=author_id)
+        self.group = (Group.objects.exclude(posts_count=0)
+                      .order_by('-posts_count').first())
+        self.post = Post.objects.filter(author=self.author).first()
+        self.reader, _ = User.objects.get_or_create(
+            username='benchmark_reader')
+        self.staff, _ = User.objects.get_or_create(
+            username='benchmark_staff', defaults={'is_staff': True})
+        follow_author(self.reader, self.author)
+        word = self.post.text.split()[0].strip('.,')
+
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+        username = self.author.username
+        self.scenarios = [
+            (self.guest_client, 'get', reverse('posts:index'), None),
+            (self.guest_client, 'get',
+             reverse('posts:profile', args=(username,)), None),
+            (self.guest_client, 'get', reverse('posts:search'),
+             {'q': word}),
+            (self.guest_client, 'get',
+             reverse('posts:post_detail', args=(self.post.pk,)), None),
+            (self.author_client, 'get', reverse('posts:post_create'), None),
+            (self.author_client, 'post', reverse('posts:post_create'),
+             {'text': 'Пост из замера производительности'}),
+            (self.author_client, 'get',
+             reverse('posts:post_edit', args=(self.post.pk,)), None),
+            (self.reader_client, 'get', reverse('posts:follow_index'), None),
+            (self.reader_client, 'get',
+             reverse('posts:profile_unfollow', args=(username,)), None),
+            (self.reader_client, 'get',
+             reverse('posts:profile_follow', args=(username,)), None),
+            (self.staff_client, 'get', reverse('posts:cache_stats'), None),
+            (self.staff_client, 'get', reverse('posts:query_stats'), None),
+        ]
+        if self.group is not None:
+            self.scenarios.append(
+                (self.guest_client, 'get',
+                 reverse('posts:group_list', args=(self.group.slug,)),
+                 None))
+
+    def views(self) -> dict:
+        results = {}
+        for client, method, url, data in self.scenarios:
+            request = getattr(client, method)
+            timings, response = measure(
+                lambda: request(url, data), self.repeat)
+            report = response.query_report
+            results[f'{report.view_name} {method.upper()}'] = dict(
+                timings,
+                url=url,
+                status=response.status_code,
+                bytes=len(response.content),
+                queries=report.count,
+                budget=report.budget,
+            )
+        return results
+
+    def paginate_posts(self) -> dict:
+        factory = RequestFactory()
+        queryset = Post.objects.select_related('author', 'group')
+        last_page = -(-Post.objects.count() // settings.POSTS_PER_PAGE)
+        pages = {
+            'first_page': {'page': 1},
+            'middle_page': {'page': max(last_page // 2, 1)},
+            'last_page': {'page': last_page},
+            'cursor_first_page': {'after': ''},
+        }
+        results = {}
+        for name, params in pages.items():
+            request = factory.get('/', params)
+            request.user = AnonymousUser()
+            timings, _ = measure(
+                lambda: list(paginate_posts(request, queryset,
+                                            feed=FEED_ALL)),
+                self.repeat)
+            results[name] = dict(timings, params=params)
+        return results
+
+    def listing(self) -> dict:
+        '''Объём строк и память выборки ленты с текстом и без него.
+
+        full - посты с полным текстом и всеми полями автора и группы,
+        как ленты загружали их раньше; cards - выборка card_posts.
+
+        '''
+        querysets = {
+            'full': Post.objects.select_related('author', 'group'),
+            'cards': card_posts(Post.objects.all()),
+        }
+        results = {}
+        for name, queryset in querysets.items():
+            queryset = queryset[:LISTING_POSTS]
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                payload = sum(len(str(value).encode())
+                              for row in cursor.fetchall()
+                              for value in row if value is not None)
+            timings, _ = measure(lambda: list(queryset.all()), self.repeat)
+            tracemalloc.start()
+            try:
+                list(queryset.all())
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            results[name] = dict(
+                timings,
+                posts=LISTING_POSTS,
+                payload_kib=round(payload / 1024, 1),
+                peak_memory_kib=round(peak / 1024, 1),
+            )
+        return results
+
+    def transfer(self) -> dict:
+        '''Байты ответа и CPU на запрос лент: см. TransferBenchmark.'''
+        username = self.author.username
+        pages = [
+            (self.guest_client, reverse('posts:index')),
+            (self.guest_client, reverse('posts:profile', args=(username,))),
+            (self.guest_client, reverse('posts:popular')),
+            (self.reader_client, reverse('posts:follow_index')),
+        ]
+        if self.group is not None:
+            pages.append((self.guest_client, reverse(
+                'posts:group_list', args=(self.group.slug,))))
+        return TransferBenchmark(pages, self.repeat).run()
+
+    def run(self) -> dict:
+        return {
+            'posts': Post.objects.count(),
+            'users': User.objects.count(),
+            'groups': Group.objects.count(),
+            'views': self.views(),
+            'paginate_posts': self.paginate_posts(),
+            'listing': self.listing(),
+            'transfer': self.transfer(),
+        }
+
+
+def run_benchmark(seeder, sizes, repeat=5, progress=None) -> dict:
+    '''Доводит базу до каждого из размеров sizes и делает замеры.
+
+    Возвращает отчёт, пригодный для сохранения в JSON и сравнения
+    между версиями.
+
+    '''
+    progress = progress or (lambda message: None)
+    report = {
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'posts_per_page': settings.POSTS_PER_PAGE,
+        'repeat': repeat,
+        'results': [],
+    }
+    for size in sorted(sizes):
+        missing = size - Post.objects.count()
+        if missing > 0:
+            progress(f'Создаём {missing} постов до {size}')
+            seeder.run(users=max(missing // POSTS_PER_USER, 1),
+                       groups=max(missing // POSTS_PER_GROUP, 1),
+                       posts=missing)
+        progress(f'Замеры на {size} постах')
+        report['results'].append(FeedBenchmark(repeat).run())
+    return report
@@ -0,0 +1,24 @@
+import statistics
+import time
+
+from django.core.cache import cache
+
+
+def measure(func, repeat: int) -> tuple:
+    '''Медиана, минимум и максимум времени вызова func в миллисекундах
+    и результат последнего вызова.
+
+    Перед каждым вызовом кэш очищается: замеряется холодный путь.
+
+    '''
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }, result
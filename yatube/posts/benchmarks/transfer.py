@@ -0,0 +1,65 @@
+import copy
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+
+from core.compression import compressors
+
+# Загрузчики шаблонов без сжатия пробелов - для сравнения с обычными.
+PLAIN_TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+class TransferBenchmark:
+    '''Байты ответа и CPU на запрос страниц для каждой кодировки.
+
+    stripped - шаблоны со сжатыми при компиляции пробелами,
+    plain - те же шаблоны с отступами. Замеряется тёплый путь:
+    шаблоны скомпилированы, страницы гостя уже в кэше.
+
+    '''
+
+    def __init__(self, pages, repeat=5):
+        # pages - пары (клиент, адрес страницы).
+        self.pages = pages
+        self.repeat = repeat
+
+    def sample(self, client, url, encoding):
+        client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        timings = []
+        for _ in range(self.repeat):
+            started = time.process_time()
+            response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            timings.append((time.process_time() - started) * 1000)
+        return response.query_report.view_name, {
+            'bytes': len(response.content),
+            'cpu_ms': round(statistics.median(timings), 3),
+        }
+
+    def run(self) -> dict:
+        plain_templates = copy.deepcopy(settings.TEMPLATES)
+        plain_templates[0]['OPTIONS']['loaders'] = PLAIN_TEMPLATE_LOADERS
+        templates = {
+            'stripped': settings.TEMPLATES,
+            'plain': plain_templates,
+        }
+        encodings = ['identity', *reversed(list(compressors()))]
+        results = {}
+        for name, config in templates.items():
+            results[name] = {}
+            with override_settings(TEMPLATES=config, DEBUG=False):
+                cache.clear()
+                for client, url in self.pages:
+                    for encoding in encodings:
+                        view_name, sample = self.sample(
+                            client, url, encoding)
+                        results[name].setdefault(
+                            view_name, {})[encoding] = sample
+        return results
@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+from .models import Post
+
+
+@contextmanager
+def preserve_post_dates():
+    '''Даёт bulk_create записать pub_date и updated_at как есть.
+
+    bulk_create вызывает pre_save полей, и auto_now_add/auto_now
+    перезаписали бы даты текущим временем.
+
+    '''
+    fields = [Post._meta.get_field(name) for name in ('pub_date',
+                                                      'updated_at')]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
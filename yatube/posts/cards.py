@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from core.db_router import reading_replica
+
+CARD_TEMPLATE = 'includes/post.html'
+CARD_DEFAULT = 'default'
+CARD_PROFILE = 'profile'
+CARD_VARIANTS = (CARD_DEFAULT, CARD_PROFILE)
+# Поля поста, которые читают карточка и шаблоны лент; полный текст
+# в лентах не загружается.
+CARD_FIELDS = ('pub_date', 'excerpt', 'excerpt_truncated', 'image_card',
+               'author', 'group')
+CARD_RELATED_FIELDS = {
+    'author': ('username', 'first_name', 'last_name'),
+    'group': ('slug',),
+}
+
+
+def make_excerpt(text: str) -> tuple:
+    '''Начало текста для карточки и признак, что текст обрезан.'''
+    excerpt = Truncator(text).chars(settings.POST_EXCERPT_LENGTH)
+    return excerpt, excerpt != text
+
+
+def card_posts(queryset, related=('author', 'group')):
+    '''Посты для лент: только поля карточки, без полного текста.
+
+    related - связанные модели, которые нужно загрузить вместе
+    с постом; в ленте автора и группы они уже известны.
+
+    '''
+    fields = list(CARD_FIELDS)
+    for name in related:
+        fields.extend(f'{name}__{field}'
+                      for field in CARD_RELATED_FIELDS[name])
+    return queryset.select_related(*related).only(*fields)
+
+
+def card_key(post_id: int, variant: str) -> str:
+    return f'posts:card:{variant}:{post_id}'
+
+
+def attach_post_cards(posts, variant: str = CARD_DEFAULT) -> None:
+    '''Добавляет каждому посту готовую HTML-карточку в атрибут card.
+
+    Карточки всей страницы достаются из кэша одним запросом; при
+    промахе карточка рендерится из шаблона и кладётся в кэш.
+    Версия кэша (POST_CARD_CACHE_VERSION) меняется вместе с шаблоном
+    карточки. Карточки постов, прочитанных с реплики, в кэш
+    не кладутся.
+
+    Параметры:
+    posts - посты страницы
+    variant - вид карточки: в профиле автор не показывается
+
+    '''
+    posts = list(posts)
+    version = settings.POST_CARD_CACHE_VERSION
+    keys = {card_key(post.pk, variant): post for post in posts}
+    cards = cache.get_many(keys, version=version)
+
+    rendered = {}
+    for key, post in keys.items():
+        if key not in cards:
+            rendered[key] = render_to_string(
+                CARD_TEMPLATE, {'post': post, 'variant': variant})
+    if rendered and reading_replica() is None:
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT,
+                       version=version)
+    cards.update(rendered)
+
+    for key, post in keys.items():
+        post.card = mark_safe(cards[key])
+
+
+def invalidate_post_cards(*post_ids: int) -> None:
+    '''Удаляет из кэша все варианты карточек постов.'''
+    cache.delete_many(
+        [card_key(post_id, variant)
+         for post_id in post_ids for variant in CARD_VARIANTS],
+        version=settings.POST_CARD_CACHE_VERSION)
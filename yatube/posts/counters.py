@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models import Count, DateField, F
+from django.db.models.functions import TruncMonth
+
+from .models import (AuthorStats, Follow, Group, MonthlyPostCount, Post,
+                     User)
+
+
+def _change_author_stats(author_id: int, field: str, delta: int) -> None:
+    updated = AuthorStats.objects.filter(user_id=author_id).update(
+        **{field: F(field) + delta})
+    if updated or delta < 0:
+        # Уменьшать несуществующий счётчик незачем: такое бывает,
+        # когда посты удаляются каскадом вместе с автором.
+        return
+    stats, created = AuthorStats.objects.get_or_create(
+        user_id=author_id, defaults={field: delta})
+    if not created:
+        AuthorStats.objects.filter(user_id=author_id).update(
+            **{field: F(field) + delta})
+
+
+def change_author_posts_count(author_id: int, delta: int) -> None:
+    '''Изменяет счётчик постов автора на delta.'''
+    _change_author_stats(author_id, 'posts_count', delta)
+
+
+def change_author_followers_count(author_id: int, delta: int) -> None:
+    '''Изменяет счётчик подписчиков автора на delta.'''
+    _change_author_stats(author_id, 'followers_count', delta)
+
+
+def change_group_posts_count(group_id: int, delta: int) -> None:
+    '''Изменяет счётчик постов группы на delta.'''
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + delta)
+
+
+def change_month_posts_count(month, group_id, delta: int) -> None:
+    '''Изменяет счётчик постов за месяц month на delta.
+
+    group_id - группа постов, None - счётчик всех постов.
+
+    '''
+    counts = MonthlyPostCount.objects.filter(group_id=group_id, month=month)
+    updated = counts.update(posts_count=F('posts_count') + delta)
+    if updated or delta < 0:
+        return
+    count, created = MonthlyPostCount.objects.get_or_create(
+        group_id=group_id, month=month, defaults={'posts_count': delta})
+    if not created:
+        counts.update(posts_count=F('posts_count') + delta)
+
+
+def subtract_author_posts(author_id: int) -> None:
+    '''Вычитает все посты автора из счётчиков групп и месяцев.
+
+    Вызывается перед каскадным удалением автора: так счётчики
+    обновляются запросом на группу и месяц, а не на каждый пост.
+
+    '''
+    posts = Post.objects.filter(author_id=author_id).order_by()
+    for group_id, total in (
+            posts.exclude(group=None).values_list('group')
+            .annotate(total=Count('pk'))):
+        change_group_posts_count(group_id, -total)
+
+    month_counts = {}
+    for group_id, month, total in (
+            posts.annotate(month=TruncMonth('pub_date',
+                                            output_field=DateField()))
+            .values_list('group', 'month').annotate(total=Count('pk'))):
+        month_counts[None, month] = month_counts.get((None, month), 0) + total
+        if group_id is not None:
+            month_counts[group_id, month] = total
+    for (group_id, month), total in month_counts.items():
+        change_month_posts_count(month, group_id, -total)
+
+
+def author_posts_count(author) -> int:
+    '''Количество постов автора по сохранённому счётчику.'''
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def rebuild_post_counters() -> None:
+    '''Пересчитывает счётчики постов авторов, групп и месяцев
+    и подписчиков авторов.'''
+    with transaction.atomic():
+        author_counts = dict(
+            Post.objects.order_by().values_list('author')
+            .annotate(total=Count('pk')))
+        follower_counts = dict(
+            Follow.objects.order_by().values_list('author')
+            .annotate(total=Count('pk')))
+        group_counts = dict(
+            Post.objects.exclude(group=None).order_by().values_list('group')
+            .annotate(total=Count('pk')))
+
+        AuthorStats.objects.all().delete()
+        AuthorStats.objects.bulk_create(
+            (AuthorStats(user_id=user_id,
+                         posts_count=author_counts.get(user_id, 0),
+                         followers_count=follower_counts.get(user_id, 0))
+             for user_id in User.objects.values_list('pk', flat=True)))
+        Group.objects.update(posts_count=0)
+        for group_id, total in group_counts.items():
+            Group.objects.filter(pk=group_id).update(posts_count=total)
+
+        month_counts = {}
+        for group_id, month, total in (
+                Post.objects.order_by()
+                .annotate(month=TruncMonth('pub_date',
+                                           output_field=DateField()))
+                .values_list('group', 'month').annotate(total=Count('pk'))):
+            month_counts[None, month] = (
+                month_counts.get((None, month), 0) + total)
+            if group_id is not None:
+                month_counts[group_id, month] = total
+        MonthlyPostCount.objects.all().delete()
+        MonthlyPostCount.objects.bulk_create(
+            MonthlyPostCount(group_id=group_id, month=month,
+                             posts_count=total)
+            for (group_id, month), total in month_counts.items())
@@ -0,0 +1,65 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Поля выгрузки совпадают с полями, которые понимает import_posts.
+EXPORT_FIELDS = {
+    'id': 'pk',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'text': 'text',
+    'pub_date': 'pub_date',
+}
+
+
+def export_rows(queryset, chunk_size: int = None):
+    '''Словари с полями постов, прочитанные порциями по chunk_size.
+
+    Модели не создаются: строки берутся из values() с join автора
+    и группы.
+
+    '''
+    chunk_size = chunk_size or settings.POSTS_EXPORT_CHUNK_SIZE
+    rows = (queryset.order_by('pub_date', 'pk')
+            .values(*EXPORT_FIELDS.values())
+            .iterator(chunk_size=chunk_size))
+    for row in rows:
+        yield {name: row[field] for name, field in EXPORT_FIELDS.items()}
+
+
+class _Echo:
+    '''Файл для csv.writer, который возвращает записанную строку.'''
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder,
+                         ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        pub_date = row['pub_date']
+        yield writer.writerow(
+            [row['id'], row['author'], row['group'] or '', row['text'],
+             pub_date.isoformat()])
+
+
+def export_lines(queryset, file_format: str, chunk_size: int = None):
+    '''Строки выгрузки в формате file_format (ndjson или csv).'''
+    rows = export_rows(queryset, chunk_size)
+    if file_format == 'csv':
+        return csv_lines(rows)
+    return ndjson_lines(rows)
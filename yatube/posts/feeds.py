@@ -0,0 +1,238 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from core.db_router import primary_db, reading_replica
+
+FEED_ALL = 'all'
+PAGE_CACHE_HITS_KEY = 'posts:page_cache:hits'
+PAGE_CACHE_MISSES_KEY = 'posts:page_cache:misses'
+
+
+def _key_part(name: str) -> str:
+    # Имя из slug или username может содержать пробелы и не-ASCII
+    # символы, недопустимые в ключах memcached.
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def group_feed(slug: str) -> str:
+    '''Имя ленты группы.'''
+    return f'group:{_key_part(slug)}'
+
+
+def author_feed(username: str) -> str:
+    '''Имя ленты автора.'''
+    return f'author:{_key_part(username)}'
+
+
+def post_feeds(post) -> list:
+    '''Имена всех лент, в которых показывается пост.
+
+    Если пост перенесли из другой группы, в список попадает и лента
+    прежней группы: из неё пост пропал.
+
+    '''
+    from .models import Group
+
+    feeds = [FEED_ALL, author_feed(post.author.username)]
+    if post.group_id is not None:
+        feeds.append(group_feed(post.group.slug))
+    initial_group_id = getattr(post, '_initial_group_id', None)
+    if initial_group_id not in (None, post.group_id):
+        feeds.extend(
+            group_feed(slug) for slug in Group.objects.filter(
+                pk=initial_group_id).values_list('slug', flat=True))
+    return feeds
+
+
+def feed_count_key(feed: str) -> str:
+    return f'posts:feed_count:{feed}'
+
+
+def get_feed_count(feed: str, count_func) -> int:
+    '''Количество постов в ленте из кэша.
+
+    При промахе считает его через count_func и кладёт в кэш.
+
+    '''
+    key = feed_count_key(feed)
+    count = cache.get(key)
+    if count is None:
+        count = count_func()
+        if reading_replica() is None:
+            cache.set(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_feed_counts(feeds) -> None:
+    cache.delete_many([feed_count_key(feed) for feed in feeds])
+
+
+def feed_version_key(feed: str) -> str:
+    return f'posts:feed_version:{feed}'
+
+
+def get_feed_version(feed: str) -> int:
+    '''Текущая версия ленты, которой помечаются закэшированные страницы.
+
+    Если версии в кэше нет (её ещё не было или её вытеснили),
+    заводится новая по текущему времени, чтобы не совпасть с версией,
+    под которой могли остаться старые страницы.
+
+    '''
+    key = feed_version_key(feed)
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_feed_versions(feeds) -> None:
+    '''Делает устаревшими все закэшированные страницы лент feeds.'''
+    now = timezone.now()
+    for feed in feeds:
+        key = feed_version_key(feed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+        cache.set(feed_modified_key(feed), now, None)
+
+
+def feed_modified_key(feed: str) -> str:
+    return f'posts:feed_modified:{feed}'
+
+
+def feed_last_modified(feed: str, queryset):
+    '''Время последнего изменения ленты.
+
+    Обычно берётся из кэша, куда его кладёт bump_feed_versions
+    (в том числе при удалении постов). Если там пусто, считается
+    как max(updated_at) по постам ленты.
+
+    '''
+    key = feed_modified_key(feed)
+    last_modified = cache.get(key)
+    if last_modified is None:
+        last_modified = queryset.aggregate(
+            last_modified=Max('updated_at'))['last_modified']
+        if last_modified is not None:
+            cache.add(key, last_modified, None)
+    return last_modified
+
+
+def feed_etag(request, feeds, extra='') -> str:
+    '''ETag страницы, собранной из лент feeds.
+
+    Зависит от версий лент и от пользователя: шапка страницы у
+    каждого своя. В extra передаётся то, что меняется на странице
+    без версий лент.
+
+    '''
+    versions = ':'.join(
+        f'{feed}={get_feed_version(feed)}' for feed in feeds)
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    return hashlib.md5(
+        f'{versions}:{user_id}:{extra}'.encode()).hexdigest()
+
+
+def conditional_feed_page(feed_func, queryset_func):
+    '''Отвечает 304 Not Modified на условные запросы к ленте.
+
+    ETag и Last-Modified вычисляются до вызова view, поэтому для
+    неизменившейся ленты запрос постов и рендеринг не выполняются.
+    Last-Modified отдаётся только анонимам: для остальных страница
+    зависит ещё и от пользователя. Страница читается с основной базы:
+    версия ленты в ETag меняется вместе с ней, и ответ с отставшей
+    реплики получил бы уже новый ETag.
+
+    Параметры:
+    feed_func - функция, получающая аргументы view из URL
+    и возвращающая имя ленты
+    queryset_func - функция, возвращающая посты ленты
+
+    '''
+    def etag(request, *args, **kwargs):
+        return feed_etag(request, [feed_func(*args, **kwargs)])
+
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return feed_last_modified(feed_func(*args, **kwargs),
+                                  queryset_func(*args, **kwargs))
+
+    def decorator(view_func):
+        return primary_db(condition(
+            etag_func=etag, last_modified_func=last_modified)(view_func))
+    return decorator
+
+
+def _count_page_cache(key: str) -> None:
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def page_cache_stats() -> dict:
+    '''Количество попаданий и промахов страничного кэша.'''
+    stats = cache.get_many([PAGE_CACHE_HITS_KEY, PAGE_CACHE_MISSES_KEY])
+    return {
+        'hits': stats.get(PAGE_CACHE_HITS_KEY, 0),
+        'misses': stats.get(PAGE_CACHE_MISSES_KEY, 0),
+    }
+
+
+def cache_anonymous_page(feed_func, key_prefix='page', timeout=None):
+    '''Кэширует страницу ленты целиком для анонимных пользователей.
+
+    Ключ страницы включает версию ленты, поэтому после сохранения
+    поста старые страницы перестают находиться сразу, без ожидания
+    таймаута. Заголовок X-Page-Cache показывает, попал ли запрос в кэш.
+    Как и в conditional_feed_page, страница читается с основной базы.
+
+    Параметры:
+    feed_func - функция, получающая аргументы view из URL
+    и возвращающая имя ленты
+    key_prefix - начало ключа страниц в кэше
+    timeout - сколько секунд хранить страницу, по умолчанию
+    POSTS_PAGE_CACHE_TIMEOUT
+
+    '''
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            feed = feed_func(*args, **kwargs)
+            path_hash = hashlib.md5(
+                request.get_full_path().encode()).hexdigest()
+            key = (f'posts:{key_prefix}:{feed}:{get_feed_version(feed)}:'
+                   f'{path_hash}')
+
+            response = cache.get(key)
+            if response is not None:
+                _count_page_cache(PAGE_CACHE_HITS_KEY)
+                response['X-Page-Cache'] = 'HIT'
+                return response
+
+            _count_page_cache(PAGE_CACHE_MISSES_KEY)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response,
+                          settings.POSTS_PAGE_CACHE_TIMEOUT
+                          if timeout is None else timeout)
+            response['X-Page-Cache'] = 'MISS'
+            return response
+        return primary_db(wrapper)
+    return decorator
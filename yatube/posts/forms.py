@@ -16,4 +16,23 @@ class PostForm(forms.ModelForm):
 
     class Meta:
         model = Post
-        fields = ('text', 'group',)
+        fields = ('text', 'group')
+
+
+class PostImageForm(forms.ModelForm):
+    '''Картинка поста: отдельная форма на той же странице.
+
+    Заполняет тот же объект, что и PostForm (instance=form.instance),
+    так что пост сохраняется одним form.save().
+
+    '''
+    # Поле модели проверяет только расширение, форма открывает
+    # загруженный файл через Pillow.
+    image = forms.ImageField(
+        required=False,
+        label='Картинка',
+        help_text='Картинка к посту')
+
+    class Meta:
+        model = Post
+        fields = ('image',)
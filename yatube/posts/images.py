@@ -0,0 +1,69 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Форматы, которые можно загрузить картинкой поста.
+IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif', 'webp')
+VARIANT_CARD = 'card'
+VARIANT_DETAIL = 'detail'
+VARIANTS_DIR = 'posts/variants'
+
+
+def variant_name(image_name: str, variant: str) -> str:
+    '''Имя файла варианта картинки: зависит только от исходного имени
+    и размера, поэтому повторная генерация перезаписывает тот же файл.
+
+    Расширение исходника остаётся в имени: у cat.jpg и cat.png
+    варианты разные.
+
+    '''
+    source = os.path.basename(image_name).replace('.', '_')
+    width, height = settings.POST_IMAGE_VARIANTS[variant]
+    return f'{VARIANTS_DIR}/{source}_{variant}_{width}x{height or 0}.jpg'
+
+
+def render_variant(image, width: int, height: int = None) -> bytes:
+    '''JPEG варианта картинки Pillow image шириной width.
+
+    С height картинка обрезается по центру до точного размера,
+    без него - уменьшается до ширины width с сохранением пропорций.
+    Маленькие картинки не увеличиваются.
+
+    '''
+    from PIL import Image, ImageOps
+
+    if height:
+        image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+    elif image.width > width:
+        image = image.resize(
+            (width, round(image.height * width / image.width)),
+            Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=settings.POST_IMAGE_QUALITY,
+               optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def make_variants(image) -> dict:
+    '''Пишет в хранилище все варианты картинки поста image.
+
+    Картинка читается один раз. Возвращает имена файлов по вариантам.
+
+    '''
+    # Импорт здесь, а не в начале модуля: posts.models берёт
+    # отсюда IMAGE_EXTENSIONS, и загрузка моделей не открывает Pillow.
+    from PIL import Image, ImageOps
+
+    with image.open('rb'), Image.open(image) as source:
+        source = ImageOps.exif_transpose(source).convert('RGB')
+    names = {}
+    for variant, (width, height) in settings.POST_IMAGE_VARIANTS.items():
+        name = variant_name(image.name, variant)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        names[variant] = default_storage.save(
+            name, ContentFile(render_variant(source, width, height)))
+    return names
@@ -0,0 +1,231 @@
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bulk import preserve_post_dates
+from .counters import rebuild_post_counters
+from .feeds import (FEED_ALL, author_feed, bump_feed_versions, group_feed,
+                    invalidate_feed_counts)
+from .models import Group, ImportCheckpoint, Post
+from .search import search_index_paused
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+# Сколько значений передавать в один запрос с __in: SQLite старше 3.32
+# не принимает больше 999 параметров.
+LOOKUP_BATCH_SIZE = 500
+
+
+def read_rows(path: str, file_format: str = None, offset: int = 0):
+    '''Построчно читает посты из файла JSONL или CSV.
+
+    Поля строки: author (username), group (slug, можно пустой),
+    text, pub_date (ISO 8601, можно пустой). Непрочитанная строка
+    JSONL выдаётся как None.
+
+    Выдаёт пары (строка, смещение в байтах за ней): с этого смещения
+    чтение продолжается без разбора уже прочитанных строк. Заголовок
+    CSV перечитывается с начала файла.
+
+    '''
+    file_format = file_format or (
+        'csv' if path.lower().endswith('.csv') else 'jsonl')
+    position = 0
+
+    def lines(source):
+        # Смещение считается по байтам: у текстового файла tell()
+        # во время итерации недоступен. csv.reader берёт строки
+        # по одной, поэтому смещение после записи CSV тоже точное.
+        nonlocal position
+        for line in source:
+            position += len(line)
+            yield line.decode('utf-8')
+
+    with open(path, 'rb') as source:
+        if file_format == 'csv':
+            csv.field_size_limit(sys.maxsize)
+            fieldnames = next(csv.reader(lines(source)), None)
+            if offset:
+                source.seek(offset)
+                position = offset
+            for row in csv.DictReader(lines(source), fieldnames=fieldnames):
+                yield row, position
+            return
+        source.seek(offset)
+        position = offset
+        for line in lines(source):
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row, position
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _parse_pub_date(value):
+    if not value:
+        return timezone.now()
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise ValueError(value)
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+class PostImporter:
+    '''Потоковая загрузка постов из файла.
+
+    Авторы и группы ищутся по словарям в памяти, посты пишутся
+    bulk_create порциями по chunk_size строк, каждая порция - в своей
+    транзакции вместе с контрольной точкой. Прерванный импорт того же
+    файла продолжается с байта за последней загруженной порцией.
+    Счётчики и
+    полнотекстовый индекс пересчитываются один раз в конце.
+
+    '''
+
+    def __init__(self, path: str, file_format: str = None,
+                 chunk_size: int = 10000, create_missing: bool = False,
+                 progress=None):
+        self.path = path
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.create_missing = create_missing
+        self.progress = progress or (lambda message: None)
+        self.authors = {}
+        self.groups = {}
+        self.touched_authors = set()
+        self.touched_groups = set()
+        self.skipped = 0
+
+    @property
+    def source(self) -> str:
+        return os.path.abspath(self.path)
+
+    def _create_missing(self, chunk) -> None:
+        rows = [row for row in chunk if isinstance(row, dict)]
+        usernames = {row.get('author') for row in rows} - {None, ''}
+        slugs = {row.get('group') for row in rows} - {None, ''}
+        usernames = sorted(usernames - self.authors.keys())
+        slugs = sorted(slugs - self.groups.keys())
+        User.objects.bulk_create(
+            (User(username=username, password='!')
+             for username in usernames), ignore_conflicts=True)
+        Group.objects.bulk_create(
+            (Group(title=slug, slug=slug, description='')
+             for slug in slugs), ignore_conflicts=True)
+        for start in range(0, len(usernames), LOOKUP_BATCH_SIZE):
+            self.authors.update(User.objects.filter(
+                username__in=usernames[start:start + LOOKUP_BATCH_SIZE],
+            ).values_list('username', 'pk'))
+        for start in range(0, len(slugs), LOOKUP_BATCH_SIZE):
+            self.groups.update(Group.objects.filter(
+                slug__in=slugs[start:start + LOOKUP_BATCH_SIZE],
+            ).values_list('slug', 'pk'))
+
+    def build_post(self, row):
+        '''Пост из строки файла или None, если строку нельзя загрузить.'''
+        if not isinstance(row, dict) or not row.get('text'):
+            return None
+        author_id = self.authors.get(row.get('author'))
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                return None
+        if author_id is None:
+            return None
+        try:
+            pub_date = _parse_pub_date(row.get('pub_date'))
+        except ValueError:
+            return None
+        self.touched_authors.add(author_id)
+        if group_id is not None:
+            self.touched_groups.add(group_id)
+        post = Post(text=row['text'], pub_date=pub_date,
+                    updated_at=pub_date, author_id=author_id,
+                    group_id=group_id)
+        post.update_excerpt()
+        return post
+
+    def import_chunk(self, chunk, checkpoint) -> int:
+        # chunk - пары (строка, смещение) из read_rows.
+        rows = [row for row, _ in chunk]
+        if self.create_missing:
+            self._create_missing(rows)
+        posts = [post for post in map(self.build_post, rows)
+                 if post is not None]
+        self.skipped += len(rows) - len(posts)
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            checkpoint.rows += len(rows)
+            checkpoint.imported += len(posts)
+            checkpoint.offset = chunk[-1][1]
+            checkpoint.save()
+        return len(posts)
+
+    def run(self, restart: bool = False) -> dict:
+        '''Загружает файл, продолжая с контрольной точки.'''
+        started = time.perf_counter()
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            source=self.source)
+        if restart:
+            checkpoint.rows = checkpoint.imported = checkpoint.offset = 0
+            checkpoint.save()
+        elif checkpoint.rows:
+            self.progress(f'Продолжаем со строки {checkpoint.rows + 1}')
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        rows = read_rows(self.path, self.file_format, checkpoint.offset)
+        if checkpoint.rows and not checkpoint.offset:
+            # Контрольная точка без смещения сохранена до того, как
+            # оно появилось: загруженные строки пропускаются чтением.
+            rows = islice(rows, checkpoint.rows, None)
+        imported = 0
+        try:
+            with search_index_paused(), preserve_post_dates():
+                for chunk in _chunks(rows, self.chunk_size):
+                    imported += self.import_chunk(chunk, checkpoint)
+                    elapsed = time.perf_counter() - started
+                    self.progress(
+                        f'Строк: {checkpoint.rows}, загружено: {imported}, '
+                        f'пропущено: {self.skipped}, '
+                        f'{imported / elapsed:.0f} постов/с')
+        finally:
+            self.finish()
+        return {
+            'rows': checkpoint.rows,
+            'imported': imported,
+            'skipped': self.skipped,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def finish(self) -> None:
+        '''Пересчитывает счётчики и сбрасывает кэш затронутых лент.'''
+        rebuild_post_counters()
+        feeds = [FEED_ALL]
+        feeds.extend(author_feed(username)
+                     for username, pk in self.authors.items()
+                     if pk in self.touched_authors)
+        feeds.extend(group_feed(slug)
+                     for slug, pk in self.groups.items()
+                     if pk in self.touched_groups)
+        invalidate_feed_counts(feeds)
+        bump_feed_versions(feeds)
@@ -0,0 +1,42 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from posts.benchmarks.database import benchmark_database
+from posts.benchmarks.feeds import run_benchmark
+from posts.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Замеряет страницы posts.urls и paginate_posts на 10 тыс., '
+            '100 тыс. и 1 млн постов и пишет отчёт в JSON. '
+            'Данные создаются во временной файловой базе с PRAGMA '
+            'из yatube/settings_production.py.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[10000, 100000, 1000000],
+                            help='Количества постов для замеров')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Сколько раз повторить каждый замер')
+        parser.add_argument('--output', default='benchmark.json',
+                            help='Куда записать отчёт')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Сколько процессов генерируют данные')
+        parser.add_argument('--database', default=None,
+                            help='Файл базы, который сохранится и '
+                                 'пригодится следующему запуску')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        with benchmark_database(options['database'], verbosity=verbosity):
+            report = run_benchmark(
+                Seeder(processes=options['processes']),
+                options['sizes'],
+                repeat=options['repeat'],
+                progress=self.stdout.write if verbosity else None,
+            )
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Отчёт записан в {options["output"]}'))
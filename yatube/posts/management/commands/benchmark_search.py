@@ -0,0 +1,45 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Post
+from posts.search import fts_available, search_posts
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время поиска по индексу FTS5 и через '
+            'LIKE \'%q%\' на текущей базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+',
+                            help='Поисковые запросы')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Сколько раз повторить каждый запрос')
+        parser.add_argument('--limit', type=int, default=10,
+                            help='Сколько результатов читать (одна страница)')
+
+    def measure(self, queryset, repeat, limit):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.values_list('pk', flat=True)[:limit])
+            queryset.count()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.')
+        repeat, limit = options['repeat'], options['limit']
+        self.stdout.write(f'Постов в базе: {Post.objects.count()}')
+
+        for query in options['queries']:
+            like = self.measure(
+                Post.objects.filter(text__icontains=query), repeat, limit)
+            fts = self.measure(search_posts(query), repeat, limit)
+            self.stdout.write(
+                f'{query!r}: LIKE {like * 1000:.2f} мс, '
+                f'FTS5 {fts * 1000:.2f} мс, '
+                f'ускорение x{like / fts if fts else float("inf"):.1f}')
@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from posts.benchmarks.concurrency import ConcurrencyBenchmark
+from posts.benchmarks.database import SQLITE_DEFAULTS, benchmark_database
+from posts.benchmarks.feeds import POSTS_PER_GROUP, POSTS_PER_USER
+from posts.seeding import Seeder
+from yatube import settings_production
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность читателей и писателей '
+            'в потоках на SQLite без настроек и с профилем из '
+            'yatube/settings_production.py. Данные создаются во '
+            'временной файловой базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000,
+                            help='Сколько постов создать перед замером')
+        parser.add_argument('--readers', type=int, default=8,
+                            help='Сколько потоков читают ленту')
+        parser.add_argument('--writers', type=int, default=2,
+                            help='Сколько потоков публикуют посты')
+        parser.add_argument('--seconds', type=float, default=5.0,
+                            help='Сколько секунд длится замер профиля')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Сколько процессов генерируют данные')
+        parser.add_argument('--output', default='benchmark_sqlite.json',
+                            help='Куда записать отчёт')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        profiles = {
+            'default': (SQLITE_DEFAULTS, 0),
+            'production': (
+                settings_production.SQLITE_PRAGMAS,
+                settings_production.DATABASES[DEFAULT_DB_ALIAS][
+                    'CONN_MAX_AGE'],
+            ),
+        }
+        with benchmark_database(verbosity=verbosity) as template:
+            posts = options['posts']
+            Seeder(processes=options['processes']).run(
+                users=max(posts // POSTS_PER_USER, 1),
+                groups=max(posts // POSTS_PER_GROUP, 1),
+                posts=posts)
+            report = ConcurrencyBenchmark(
+                template,
+                readers=options['readers'],
+                writers=options['writers'],
+                seconds=options['seconds'],
+            ).run(profiles)
+        for name, result in report['profiles'].items():
+            self.stdout.write(
+                f'{name}: чтение {result["readers"]["ops_per_second"]}/с '
+                f'(p95 {result["readers"]["p95_ms"]} мс), '
+                f'запись {result["writers"]["ops_per_second"]}/с '
+                f'(p95 {result["writers"]["p95_ms"]} мс, '
+                f'ошибок {result["writers"]["errors"]})')
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Отчёт записан в {options["output"]}'))
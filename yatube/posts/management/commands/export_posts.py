@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exporting import FORMATS, export_lines
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Выгружает все посты автора или группы в NDJSON или CSV, '
+            'читая базу порциями.')
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--author', help='Username автора')
+        source.add_argument('--group', help='Slug группы')
+        parser.add_argument('--format', choices=FORMATS,
+                            default=FORMATS[0], help='Формат выгрузки')
+        parser.add_argument('--output',
+                            help='Файл для выгрузки (по умолчанию - stdout)')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help='Сколько постов читать из базы за раз')
+
+    def handle(self, *args, **options):
+        if options['author']:
+            author = User.objects.filter(username=options['author']).first()
+            if author is None:
+                raise CommandError(f'Нет автора {options["author"]}.')
+            queryset = Post.objects.filter(author=author)
+        else:
+            group = Group.objects.filter(slug=options['group']).first()
+            if group is None:
+                raise CommandError(f'Нет группы {options["group"]}.')
+            queryset = Post.objects.filter(group=group)
+
+        lines = export_lines(
+            queryset, options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
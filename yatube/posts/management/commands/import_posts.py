@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import FORMATS, PostImporter
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты из файла JSONL или CSV порциями. '
+            'Прерванная загрузка того же файла продолжается '
+            'с последней сохранённой порции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Формат файла (по умолчанию - '
+                                 'по расширению)')
+        parser.add_argument('--chunk-size', type=int, default=10000,
+                            help='Сколько строк загружать в одной '
+                                 'транзакции')
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Создавать отсутствующих авторов и группы')
+        parser.add_argument('--restart', action='store_true',
+                            help='Начать файл заново, забыв '
+                                 'контрольную точку')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        importer = PostImporter(
+            options['path'],
+            file_format=options['format'],
+            chunk_size=options['chunk_size'],
+            create_missing=options['create_missing'],
+            progress=self.stdout.write if options['verbosity'] else None,
+        )
+        try:
+            result = importer.run(restart=options['restart'])
+        except OSError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено постов: {result["imported"]}, '
+            f'пропущено строк: {result["skipped"]}, '
+            f'за {result["seconds"]:.1f} с.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_post_counters
+from posts.models import AuthorStats, Group
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые счётчики постов авторов и групп.'
+
+    def handle(self, *args, **options):
+        rebuild_post_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны: авторов - '
+            f'{AuthorStats.objects.count()}, '
+            f'групп - {Group.objects.count()}.'))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.seeding import SEED_PASSWORD, Seeder
+
+
+class Command(BaseCommand):
+    help = ('Массово создаёт пользователей, группы и посты со '
+            'случайными данными для проверки на больших объёмах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Сколько создать пользователей')
+        parser.add_argument('--groups', type=int, default=50,
+                            help='Сколько создать групп')
+        parser.add_argument('--posts', type=int, default=100000,
+                            help='Сколько создать постов')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Сколько процессов генерируют данные '
+                                 '(по умолчанию - по числу ядер)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Сколько объектов вставлять за раз')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Начальное значение генератора')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        started = time.perf_counter()
+        seeder = Seeder(
+            processes=options['processes'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=(self.stdout.write if options['verbosity'] > 1
+                      else None),
+        )
+        try:
+            seeder.run(users=options['users'], groups=options['groups'],
+                       posts=options['posts'])
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с. '
+            f'Пароль созданных пользователей: {SEED_PASSWORD}'))
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:42
+
+from django.db import migrations, models
+
+from posts.cards import make_excerpt
+
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).order_by('pk')
+                     .only('text')[:BATCH_SIZE])
+        if not batch:
+            return
+        for post in batch:
+            post.excerpt, post.excerpt_truncated = make_excerpt(post.text)
+        posts.bulk_update(batch, ['excerpt', 'excerpt_truncated'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False,
+                                   verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_truncated',
+            field=models.BooleanField(default=False, editable=False,
+                                      verbose_name='Текст обрезан'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:48
+
+from django.db import migrations, models
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def fill_monthly_counts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    MonthlyPostCount = apps.get_model('posts', 'MonthlyPostCount')
+    db_alias = schema_editor.connection.alias
+    month_counts = {}
+    for group_id, month, total in (
+            Post.objects.using(db_alias).order_by()
+            .annotate(month=TruncMonth('pub_date', output_field=DateField()))
+            .values_list('group', 'month').annotate(total=Count('pk'))):
+        month_counts[None, month] = month_counts.get((None, month), 0) + total
+        if group_id is not None:
+            month_counts[group_id, month] = total
+    MonthlyPostCount.objects.using(db_alias).bulk_create(
+        MonthlyPostCount(group_id=group_id, month=month, posts_count=total)
+        for (group_id, month), total in month_counts.items())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPostCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_counts', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Посты за месяц',
+                'verbose_name_plural': 'Посты по месяцам',
+                'ordering': ('-month',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypostcount',
+            constraint=models.UniqueConstraint(fields=('group', 'month'), name='unique_group_month_count'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypostcount',
+            constraint=models.UniqueConstraint(condition=models.Q(group=None), fields=('month',), name='unique_month_count'),
+        ),
+        migrations.RunPython(fill_monthly_counts, migrations.RunPython.noop),
+    ]
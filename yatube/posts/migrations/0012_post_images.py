@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.FileField(blank=True, help_text='Картинка к посту', upload_to='posts/', validators=[django.core.validators.FileExtensionValidator(('jpg', 'jpeg', 'png', 'gif', 'webp'))], verbose_name='Картинка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_card',
+            field=models.FileField(blank=True, editable=False, upload_to='', verbose_name='Картинка для ленты'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_detail',
+            field=models.FileField(blank=True, editable=False, upload_to='', verbose_name='Картинка для страницы'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_timeline_pub_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='offset',
+            field=models.BigIntegerField(default=0, verbose_name='Смещение в файле'),
+        ),
+    ]
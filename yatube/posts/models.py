@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.core.validators import FileExtensionValidator
+from django.db import models, transaction
+
+from .cards import invalidate_post_cards, make_excerpt
+from .images import IMAGE_EXTENSIONS
 
 User = get_user_model()
 
@@ -10,6 +14,9 @@ class Group(models.Model):
     slug = models.SlugField(unique=True,
                             verbose_name='Slug')
     description = models.TextField(verbose_name='Описание')
+    posts_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name='Количество постов')
 
     class Meta:
         verbose_name = 'Группа'
@@ -18,12 +25,23 @@ class Group(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Название и slug видны во всех лентах с постами группы:
+        # при их смене сбрасываются и эти ленты.
+        instance._initial_feed_fields = (
+            instance.__dict__.get('title'), instance.__dict__.get('slug'))
+        return instance
+
 
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст поста',
                             help_text='Введите текст поста')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True,
+                                      verbose_name='Дата изменения')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='posts',
                                verbose_name='Автор')
@@ -33,11 +51,208 @@ class Post(models.Model):
         related_name='posts',
         verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост')
+    # Начало текста для лент: считается при сохранении, чтобы ленты
+    # не загружали полный текст постов.
+    excerpt = models.TextField(blank=True, editable=False,
+                               verbose_name='Начало текста')
+    excerpt_truncated = models.BooleanField(default=False, editable=False,
+                                            verbose_name='Текст обрезан')
+    # Содержимое картинки проверяет через Pillow PostImageForm
+    # (forms.ImageField), варианты делает posts.tasks.make_post_images.
+    # Размеры исходника не хранятся, так что ImageField в модели
+    # ничего не добавил бы к проверке формы.
+    image = models.FileField(
+        upload_to='posts/', blank=True,
+        validators=[FileExtensionValidator(IMAGE_EXTENSIONS)],
+        verbose_name='Картинка',
+        help_text='Картинка к посту')
+    # Готовые варианты картинки для ленты и страницы поста: шаблоны
+    # берут их имена из строки поста, без ресайза при рендере.
+    image_card = models.FileField(blank=True, editable=False,
+                                  verbose_name='Картинка для ленты')
+    image_detail = models.FileField(blank=True, editable=False,
+                                    verbose_name='Картинка для страницы')
+    # Пишется только буфером posts.viewcounts.ViewCounter.
+    views = models.PositiveIntegerField(default=0, editable=False,
+                                        verbose_name='Просмотры')
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('pub_date',),
+                         name='post_pub_date_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('-views', '-pub_date'),
+                         name='post_views_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+    def update_excerpt(self) -> None:
+        self.excerpt, self.excerpt_truncated = make_excerpt(self.text)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding:
+            # Просмотры записывает ViewCounter, варианты картинки -
+            # задача make_post_images; сохранение поста не должно
+            # затирать записанное ими после загрузки.
+            deferred = self.get_deferred_fields()
+            update_fields = kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ('views', 'image_card', 'image_detail')
+                and field.attname not in deferred]
+        if ('text' not in self.get_deferred_fields()
+                and (update_fields is None or 'text' in update_fields)):
+            self.update_excerpt()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'excerpt_truncated'}
+        if ('image' not in self.get_deferred_fields()
+                and self.image.name != getattr(self, '_initial_image', '')):
+            # Варианты прежней картинки не подходят, новые сделает
+            # задача после сохранения.
+            self.image_card = self.image_detail = ''
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'image_card', 'image_detail'}
+        # Счётчики постов обновляются в обработчике post_save:
+        # они должны попасть в ту же транзакцию, что и сам пост.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        invalidate_post_cards(self.pk)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходную группу, чтобы при переносе поста
+        # обновить и ленту прежней группы.
+        instance._initial_group_id = instance.__dict__.get('group_id')
+        instance._initial_image = instance.__dict__.get('image', '')
+        return instance
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='stats',
+                                verbose_name='Автор')
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов')
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков')
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.user}: {self.posts_count}'
+
+
+class MonthlyPostCount(models.Model):
+    '''Количество постов за месяц: всех (group пустая) или группы.'''
+    group = models.ForeignKey(Group, blank=True, null=True,
+                              on_delete=models.CASCADE,
+                              related_name='monthly_counts',
+                              verbose_name='Группа')
+    month = models.DateField(verbose_name='Месяц')
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов')
+
+    class Meta:
+        verbose_name = 'Посты за месяц'
+        verbose_name_plural = 'Посты по месяцам'
+        ordering = ('-month',)
+        constraints = (
+            models.UniqueConstraint(fields=('group', 'month'),
+                                    name='unique_group_month_count'),
+            models.UniqueConstraint(fields=('month',),
+                                    condition=models.Q(group=None),
+                                    name='unique_month_count'),
+        )
+
+    def __str__(self):
+        return f'{self.group or "Все"} {self.month:%Y-%m}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='follower',
+                             verbose_name='Подписчик')
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='following',
+                               verbose_name='Автор')
+
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'author'),
+                                    name='unique_follow'),
+            models.CheckConstraint(check=~models.Q(user=models.F('author')),
+                                   name='no_self_follow'),
+        )
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='timeline',
+                             verbose_name='Читатель')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='timeline_entries',
+                             verbose_name='Пост')
+    # Копия даты публикации поста: лента листается по индексу
+    # (user, -pub_date) без join с постами.
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи ленты подписок'
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'post'),
+                                    name='unique_timeline_entry'),
+        )
+        indexes = (
+            models.Index(fields=('user', '-pub_date', '-post'),
+                         name='timeline_user_pub_date_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.user}: {self.post_id}'
+
+
+class ImportCheckpoint(models.Model):
+    source = models.CharField(max_length=500, unique=True,
+                              verbose_name='Файл импорта')
+    rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано строк')
+    imported = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Загружено постов')
+    # Байт файла, с которого продолжается импорт.
+    offset = models.BigIntegerField(default=0,
+                                    verbose_name='Смещение в файле')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Дата изменения')
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    def __str__(self):
+        return f'{self.source}: {self.rows}'
@@ -0,0 +1,118 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+
+# Внешнее содержимое: FTS5 хранит только индекс, а сам текст
+# читает из posts_post по rowid = id.
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai "
+    f"AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad "
+    f"AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    f"AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+)
+
+
+def fts_available(using=connection) -> bool:
+    return using.vendor == 'sqlite'
+
+
+def install_search_index(using=connection) -> None:
+    '''Создаёт таблицу FTS5 и триггеры, если их ещё нет.
+
+    Вызывается после каждого migrate: пересоздавая таблицу posts_post
+    при изменении схемы, SQLite теряет её триггеры.
+
+    '''
+    if not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+
+
+def rebuild_search_index(using=connection) -> None:
+    '''Заново строит полнотекстовый индекс по всем постам.'''
+    install_search_index(using)
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+@contextmanager
+def search_index_paused(using=connection):
+    '''Отключает триггеры индекса на время массовой загрузки постов.
+
+    Обновлять индекс на каждую вставленную строку дорого: после
+    загрузки триггеры возвращаются, а индекс строится заново целиком.
+
+    '''
+    if not fts_available(using):
+        yield
+        return
+    with using.cursor() as cursor:
+        for suffix in ('_ai', '_ad', '_au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}{suffix}')
+    try:
+        yield
+    finally:
+        rebuild_search_index(using)
+
+
+def build_match_query(query: str) -> str:
+    '''Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, чтобы символы синтаксиса FTS5
+    не приводили к ошибке; все слова должны встретиться в посте,
+    последнее может быть началом слова.
+
+    '''
+    words = re.findall(r'\w+', query)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(query: str):
+    '''Посты, подходящие под запрос, от более релевантных к менее.'''
+    match = build_match_query(query)
+    if not match:
+        return Post.objects.none()
+    if not fts_available():
+        return Post.objects.filter(text__icontains=query)
+    return Post.objects.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = posts_post.id',
+               f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'rank': f'{FTS_TABLE}.rank'},
+        order_by=['rank', '-pub_date'],
+    )
+
+
+def matching_post_ids(query: str):
+    '''Подзапрос с id постов, подходящих под запрос, для фильтра pk__in.'''
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (build_match_query(query),))
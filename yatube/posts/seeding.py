@@ -0,0 +1,166 @@
+import datetime
+import multiprocessing
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+
+from .bulk import preserve_post_dates
+from .counters import rebuild_post_counters
+from .feeds import (FEED_ALL, author_feed, bump_feed_versions, group_feed,
+                    invalidate_feed_counts)
+from .models import Group, Post
+from .search import search_index_paused
+
+User = get_user_model()
+
+SEED_PASSWORD = 'seed-password'
+# За сколько дней назад раскидываются даты публикации постов.
+SEED_DAYS = 365 * 3
+
+
+def _batches(total: int, batch_size: int):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def _user_rows(args):
+    prefix, start, size, seed = args
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed + start)
+    return [(f'{prefix}{start + number}_{fake.user_name()}'[:150],
+             fake.first_name(), fake.last_name())
+            for number in range(size)]
+
+
+_post_choices = {}
+
+
+def _init_post_worker(author_ids, group_ids):
+    _post_choices['authors'] = author_ids
+    _post_choices['groups'] = group_ids
+
+
+def _post_rows(args):
+    start, size, seed, now = args
+    author_ids = _post_choices['authors']
+    group_ids = _post_choices['groups']
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed + start)
+    rng = random.Random(seed + start)
+    rows = []
+    for _ in range(size):
+        pub_date = now - datetime.timedelta(
+            seconds=rng.randrange(SEED_DAYS * 24 * 60 * 60))
+        group_id = None
+        if group_ids and rng.random() < 0.7:
+            group_id = rng.choice(group_ids)
+        rows.append((fake.paragraph(nb_sentences=rng.randint(1, 8)),
+                     pub_date, rng.choice(author_ids), group_id))
+    return rows
+
+
+def _build_post(text, pub_date, author_id, group_id):
+    post = Post(text=text, pub_date=pub_date, updated_at=pub_date,
+                author_id=author_id, group_id=group_id)
+    # bulk_create не вызывает save(), начало текста считаем сами.
+    post.update_excerpt()
+    return post
+
+
+class Seeder:
+    '''Массово создаёт пользователей, группы и посты с данными Faker.
+
+    Данные генерируются пачками в processes процессах, а пишет их
+    в базу только основной процесс: SQLite не любит конкурентную
+    запись, а генерация текста дороже вставки.
+
+    '''
+
+    def __init__(self, processes=None, batch_size=5000, seed=0,
+                 progress=None):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        self.seed = seed
+        self.progress = progress or (lambda message: None)
+
+    def _generate(self, func, tasks, initializer=None, initargs=()):
+        '''Выдаёт результаты func по задачам по мере готовности.'''
+        if self.processes == 1:
+            if initializer is not None:
+                initializer(*initargs)
+            yield from map(func, tasks)
+            return
+        with multiprocessing.Pool(self.processes, initializer,
+                                  initargs) as pool:
+            yield from pool.imap_unordered(func, tasks)
+
+    def run(self, users=0, groups=0, posts=0):
+        '''Создаёт объекты и пересчитывает счётчики и кэш лент.'''
+        prefix = f's{timezone.now():%y%m%d%H%M%S}_'
+        authors = self.create_users(prefix, users)
+        groups = self.create_groups(prefix, groups)
+        if not authors.exists():
+            authors = User.objects.all()
+        if not groups.exists():
+            groups = Group.objects.all()
+        self.create_posts(posts, authors, groups)
+        rebuild_post_counters()
+        feeds = [FEED_ALL]
+        feeds.extend(author_feed(username) for username
+                     in authors.values_list('username', flat=True))
+        feeds.extend(group_feed(slug) for slug
+                     in groups.values_list('slug', flat=True))
+        invalidate_feed_counts(feeds)
+        bump_feed_versions(feeds)
+
+    def create_users(self, prefix: str, total: int):
+        password = make_password(SEED_PASSWORD)
+        tasks = ((prefix, start, size, self.seed)
+                 for start, size in _batches(total, self.batch_size))
+        created = 0
+        for rows in self._generate(_user_rows, tasks):
+            User.objects.bulk_create(
+                User(username=username, first_name=first_name,
+                     last_name=last_name, password=password)
+                for username, first_name, last_name in rows)
+            created += len(rows)
+            self.progress(f'Пользователи: {created}/{total}')
+        return User.objects.filter(username__startswith=prefix)
+
+    def create_groups(self, prefix: str, total: int):
+        fake = Faker('ru_RU')
+        fake.seed_instance(self.seed)
+        Group.objects.bulk_create(
+            Group(title=f'{fake.catch_phrase()} #{prefix}{number}'[:200],
+                  slug=slugify(f'{prefix}{number}'),
+                  description=fake.paragraph())
+            for number in range(total))
+        self.progress(f'Группы: {total}/{total}')
+        return Group.objects.filter(slug__startswith=slugify(prefix))
+
+    def create_posts(self, total: int, authors, groups) -> None:
+        '''Создаёт total постов авторов authors в группах groups.'''
+        if not total:
+            return
+        author_ids = list(authors.values_list('pk', flat=True))
+        if not author_ids:
+            raise ValueError('Посты некому писать: нет пользователей.')
+        group_ids = list(groups.values_list('pk', flat=True))
+        now = timezone.now()
+        tasks = ((start, size, self.seed, now)
+                 for start, size in _batches(total, self.batch_size))
+        rows_batches = self._generate(
+            _post_rows, tasks, _init_post_worker, (author_ids, group_ids))
+        created = 0
+        with search_index_paused(), preserve_post_dates():
+            for rows in rows_batches:
+                with transaction.atomic():
+                    Post.objects.bulk_create(
+                        _build_post(*row) for row in rows)
+                created += len(rows)
+                self.progress(f'Посты: {created}/{total}')
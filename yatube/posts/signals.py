@@ -0,0 +1,195 @@
+import threading
+
+from django.db import connections, transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .archive import post_month
+from .cards import invalidate_post_cards
+from .counters import (change_author_posts_count, change_group_posts_count,
+                       change_month_posts_count, subtract_author_posts)
+from .feeds import (FEED_ALL, author_feed, bump_feed_versions, group_feed,
+                    invalidate_feed_counts, post_feeds)
+from .models import Group, Post, User
+from .search import install_search_index
+from .tasks import fan_out, make_post_images
+
+# Поля автора, которые показываются в карточках его постов.
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+# Удаляемые сейчас авторы: их посты уходят каскадом, и счётчики
+# по ним уже обновлены в author_deleting.
+_deleting = threading.local()
+
+
+def _deleting_authors() -> dict:
+    if not hasattr(_deleting, 'authors'):
+        _deleting.authors = {}
+    return _deleting.authors
+
+
+def _start_author_deletion(author_id: int, feeds: list, using: str) -> None:
+    def finished():
+        _deleting_authors().pop(author_id, None)
+
+    # Запись действует, пока жива транзакция удаления: при откате
+    # Django выбрасывает её колбэки on_commit, и по пропавшему
+    # колбэку видно, что запись осталась от неудачного удаления.
+    transaction.on_commit(finished, using=using)
+    _deleting_authors()[author_id] = (feeds, finished)
+
+
+def _author_deletion_feeds(author_id: int, using: str):
+    '''Ленты автора, если он удаляется в текущей транзакции, иначе None.'''
+    entry = _deleting_authors().get(author_id)
+    if entry is None:
+        return None
+    feeds, finished = entry
+    if not any(func is finished
+               for _, func in connections[using].run_on_commit):
+        del _deleting_authors()[author_id]
+        return None
+    return feeds
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """Обновляет счётчики постов и кэши затронутых лент."""
+    if raw:
+        return
+    initial_group_id = getattr(instance, '_initial_group_id', None)
+    group_changed = initial_group_id != instance.group_id
+    month = post_month(instance.pub_date)
+
+    if created:
+        change_author_posts_count(instance.author_id, 1)
+        change_month_posts_count(month, None, 1)
+        # Подписчиков может быть много: раскладка идёт в фоне.
+        fan_out.delay(instance.pk)
+    elif group_changed and initial_group_id is not None:
+        change_group_posts_count(initial_group_id, -1)
+        change_month_posts_count(month, initial_group_id, -1)
+    if (created or group_changed) and instance.group_id is not None:
+        change_group_posts_count(instance.group_id, 1)
+        change_month_posts_count(month, instance.group_id, 1)
+
+    feeds = post_feeds(instance)
+    if created or group_changed:
+        invalidate_feed_counts(feeds)
+    bump_feed_versions(feeds)
+    instance._initial_group_id = instance.group_id
+
+    if 'image' not in instance.get_deferred_fields():
+        image_name = instance.image.name or ''
+        if image_name and image_name != getattr(
+                instance, '_initial_image', ''):
+            make_post_images.delay(instance.pk)
+        instance._initial_image = image_name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, using, **kwargs):
+    """Обновляет счётчики и кэши лент после удаления поста."""
+    if _author_deletion_feeds(instance.author_id, using) is not None:
+        return
+    month = post_month(instance.pub_date)
+    change_author_posts_count(instance.author_id, -1)
+    change_month_posts_count(month, None, -1)
+    if instance.group_id is not None:
+        change_group_posts_count(instance.group_id, -1)
+        change_month_posts_count(month, instance.group_id, -1)
+    feeds = post_feeds(instance)
+    invalidate_feed_counts(feeds)
+    bump_feed_versions(feeds)
+
+
+@receiver(pre_delete, sender=User)
+def author_deleting(sender, instance, using, **kwargs):
+    """Разом вычитает посты удаляемого автора из счётчиков.
+
+    Без этого каскадное удаление постов обновляло бы счётчики
+    и ленты несколькими запросами на каждый пост.
+
+    """
+    feeds = [FEED_ALL, author_feed(instance.username)]
+    feeds.extend(
+        group_feed(slug) for slug in Group.objects.filter(
+            posts__author=instance).distinct().values_list('slug', flat=True))
+    subtract_author_posts(instance.pk)
+    _start_author_deletion(instance.pk, feeds, using)
+
+
+@receiver(post_delete, sender=User)
+def author_deleted(sender, instance, using, **kwargs):
+    """Сбрасывает кэши лент, из которых пропали посты автора."""
+    feeds = _author_deletion_feeds(instance.pk, using)
+    _deleting_authors().pop(instance.pk, None)
+    if feeds is not None:
+        invalidate_feed_counts(feeds)
+        bump_feed_versions(feeds)
+
+
+@receiver(pre_save, sender=User)
+def author_saving(sender, instance, raw=False, update_fields=None,
+                  **kwargs):
+    """Запоминает имя автора до сохранения, чтобы заметить его смену.
+
+    Вход пользователя сохраняет только last_login: такие сохранения
+    карточки не затрагивают, и запрос прежних значений не нужен.
+
+    """
+    instance._initial_card_fields = None
+    if (raw or instance._state.adding
+            or (update_fields is not None
+                and not set(update_fields) & set(AUTHOR_CARD_FIELDS))):
+        return
+    instance._initial_card_fields = (
+        User.objects.filter(pk=instance.pk)
+        .values(*AUTHOR_CARD_FIELDS).first())
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, raw=False, **kwargs):
+    """Сбрасывает карточки и ленты автора, сменившего имя."""
+    initial = getattr(instance, '_initial_card_fields', None)
+    instance._initial_card_fields = None
+    if created or raw or initial is None or all(
+            initial[field] == getattr(instance, field)
+            for field in AUTHOR_CARD_FIELDS):
+        return
+    invalidate_post_cards(*Post.objects.filter(
+        author=instance).values_list('pk', flat=True))
+    feeds = {FEED_ALL, author_feed(instance.username),
+             author_feed(initial['username'])}
+    feeds.update(
+        group_feed(slug) for slug in Group.objects.filter(
+            posts__author=instance).distinct().values_list('slug', flat=True))
+    bump_feed_versions(feeds)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    """Сбрасывает закэшированные страницы изменённой группы.
+
+    После смены названия или slug сбрасываются и общие ленты,
+    и ленты авторов постов группы: в них есть ссылки на группу.
+
+    """
+    if raw:
+        return
+    feeds = {group_feed(instance.slug)}
+    initial = getattr(instance, '_initial_feed_fields', None)
+    if not created and initial not in (None, (instance.title, instance.slug)):
+        feeds.update((FEED_ALL, group_feed(initial[1])))
+        feeds.update(
+            author_feed(username) for username in User.objects.filter(
+                posts__group=instance).distinct().values_list(
+                    'username', flat=True))
+    bump_feed_versions(feeds)
+    instance._initial_feed_fields = (instance.title, instance.slug)
+
+
+def search_index_installed(sender, using, **kwargs):
+    """Возвращает триггеры полнотекстового индекса после миграций."""
+    install_search_index(connections[using])
@@ -0,0 +1,38 @@
+from django.utils import timezone
+
+from core.tasks import task
+
+from .cards import invalidate_post_cards
+from .feeds import bump_feed_versions, post_feeds
+from .images import VARIANT_CARD, VARIANT_DETAIL, make_variants
+from .models import Post
+from .timeline import fan_out_post
+
+
+@task
+def fan_out(post_id: int) -> None:
+    '''Раскладывает новый пост по лентам подписчиков автора.'''
+    post = (Post.objects.filter(pk=post_id)
+            .only('author_id', 'pub_date').first())
+    if post is not None:
+        fan_out_post(post)
+
+
+@task
+def make_post_images(post_id: int) -> None:
+    '''Делает варианты загруженной картинки поста для ленты и страницы.'''
+    post = (Post.objects.select_related('author', 'group')
+            .only('image', 'author', 'group', 'author__username',
+                  'group__slug')
+            .filter(pk=post_id).first())
+    if post is None or not post.image:
+        return
+    names = make_variants(post.image)
+    # Пока варианты готовились, картинку могли заменить: тогда
+    # их запишет задача, поставленная для новой картинки.
+    current = Post.objects.filter(pk=post_id, image=post.image.name)
+    if current.update(image_card=names[VARIANT_CARD],
+                      image_detail=names[VARIANT_DETAIL],
+                      updated_at=timezone.now()):
+        invalidate_post_cards(post_id)
+        bump_feed_versions(post_feeds(post))
@@ -0,0 +1,138 @@
+import datetime
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import month_bounds
+from ..bulk import preserve_post_dates
+from ..counters import rebuild_post_counters
+from ..models import Group, MonthlyPostCount, Post
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая тестовая группа',
+            slug='another_test_slug',
+            description='Ещё одна тестовая группа',
+        )
+        cls.may_post = cls.create_post(2024, 5, 31, cls.group)
+        cls.june_post = cls.create_post(2024, 6, 1, cls.group)
+        cls.june_other_post = cls.create_post(2024, 6, 15)
+
+    @classmethod
+    def create_post(cls, year, month, day, group=None):
+        pub_date = timezone.make_aware(
+            datetime.datetime(year, month, day, 23, 30))
+        with preserve_post_dates():
+            return Post.objects.create(
+                author=cls.author, group=group, text=f'Пост {pub_date}',
+                pub_date=pub_date, updated_at=pub_date)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def monthly_counts(self):
+        return set(MonthlyPostCount.objects.values_list(
+            'group__slug', 'month', 'posts_count'))
+
+    def test_month_bounds(self):
+        '''Границы месяца - полуоткрытый диапазон по местному времени.'''
+        start, end = month_bounds(2024, 12)
+
+        self.assertEqual(timezone.localtime(start).date(),
+                         datetime.date(2024, 12, 1))
+        self.assertEqual(timezone.localtime(end).date(),
+                         datetime.date(2025, 1, 1))
+        with self.assertRaises(ValueError):
+            month_bounds(2024, 13)
+
+    def test_counts_kept_in_sync(self):
+        '''Счётчики месяцев меняются при создании, переносе и удалении.'''
+        may, june = datetime.date(2024, 5, 1), datetime.date(2024, 6, 1)
+        self.assertEqual(self.monthly_counts(), {
+            (None, may, 1), (None, june, 2),
+            ('test_slug', may, 1), ('test_slug', june, 1),
+        })
+
+        ArchiveTests.june_post.group = ArchiveTests.another_group
+        ArchiveTests.june_post.save()
+        ArchiveTests.may_post.delete()
+
+        self.assertEqual(self.monthly_counts(), {
+            (None, may, 0), (None, june, 2),
+            ('test_slug', may, 0), ('test_slug', june, 0),
+            ('another_test_slug', june, 1),
+        })
+        rebuild_post_counters()
+        self.assertEqual(self.monthly_counts(), {
+            (None, june, 2), ('another_test_slug', june, 1),
+        })
+
+    def test_archive_pages(self):
+        '''Архив показывает посты только за месяц и только группы.'''
+        pages = {
+            reverse('posts:archive', args=(2024, 6)): {
+                ArchiveTests.june_post, ArchiveTests.june_other_post},
+            reverse('posts:archive', args=(2024, 5)): {
+                ArchiveTests.may_post},
+            reverse('posts:group_archive',
+                    args=(ArchiveTests.group.slug, 2024, 6)): {
+                ArchiveTests.june_post},
+            reverse('posts:group_archive',
+                    args=(ArchiveTests.another_group.slug, 2024, 6)): set(),
+        }
+
+        for url, posts in pages.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(set(response.context['page_obj']), posts)
+                self.assertEqual(response.context['page_obj'].paginator
+                                 .count, len(posts))
+
+    def test_archive_sidebar(self):
+        '''В боковой колонке - месяцы с постами и их количество.'''
+        response = self.guest_client.get(
+            reverse('posts:archive', args=(2024, 6)))
+
+        self.assertEqual(
+            [(row.month, row.posts_count)
+             for row in response.context['months']],
+            [(datetime.date(2024, 6, 1), 2), (datetime.date(2024, 5, 1), 1)])
+        self.assertContains(response,
+                            reverse('posts:archive', args=(2024, 5)))
+
+    def test_wrong_month_not_found(self):
+        '''Несуществующий месяц отдаёт 404.'''
+        response = self.guest_client.get(
+            reverse('posts:archive', args=(2024, 13)))
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_archive_query_uses_index(self):
+        '''Посты месяца выбираются по индексу pub_date.'''
+        start, end = month_bounds(2024, 6)
+        queryset = Post.objects.filter(pub_date__gte=start, pub_date__lt=end)
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn('post_pub_date_idx', plan)
@@ -0,0 +1,255 @@
+import warnings
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..feeds import author_feed, feed_version_key, group_feed
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.post = Post.objects.create(
+            author=cls.author, text='Исходный текст')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_card_is_cached(self):
+        '''Карточка поста берётся из кэша, пока пост не сохранён.'''
+        self.client.get(reverse('posts:index'))
+        Post.objects.filter(pk=PostCardCacheTests.post.pk).update(
+            text='Тихо изменённый текст')
+
+        response = self.client.get(reverse('posts:index'))
+
+        self.assertContains(response, 'Исходный текст')
+
+    def test_card_invalidated_on_save(self):
+        '''Сохранение поста сбрасывает его карточку.'''
+        self.client.get(reverse('posts:index'))
+        post = Post.objects.get(pk=PostCardCacheTests.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+
+        response = self.client.get(reverse('posts:index'))
+
+        self.assertContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Исходный текст')
+
+    def test_profile_variant(self):
+        '''В профиле карточка не ссылается на профиль автора.'''
+        profile_url = reverse(
+            'posts:profile', args=(PostCardCacheTests.author.username,))
+        self.client.get(reverse('posts:index'))
+
+        response = self.client.get(profile_url)
+
+        self.assertNotContains(response, f'href="{profile_url}"')
+        self.assertNotContains(response, 'подробная информация')
+        self.assertContains(self.client.get(reverse('posts:index')),
+                            'подробная информация')
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group)
+        cls.feed_urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.author.username,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(AnonymousPageCacheTests.author)
+
+    def test_anonymous_pages_cached(self):
+        '''Повторный запрос анонима отдаётся из кэша.'''
+        for url in AnonymousPageCacheTests.feed_urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                second = self.guest_client.get(url)
+                self.assertEqual(first['X-Page-Cache'], 'MISS')
+                self.assertEqual(second['X-Page-Cache'], 'HIT')
+                self.assertEqual(first.content, second.content)
+
+    def test_authorized_pages_not_cached(self):
+        '''Страницы авторизованного пользователя не кэшируются.'''
+        url = reverse('posts:index')
+        self.author_client.get(url)
+
+        response = self.author_client.get(url)
+
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_new_post_invalidates_pages(self):
+        '''Новый пост сразу появляется на закэшированных страницах.'''
+        for url in AnonymousPageCacheTests.feed_urls:
+            self.guest_client.get(url)
+
+        self.author_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост',
+                  'group': AnonymousPageCacheTests.group.pk})
+
+        for url in AnonymousPageCacheTests.feed_urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'MISS')
+                self.assertContains(response, 'Свежий пост')
+
+    def test_author_rename_invalidates_pages(self):
+        '''Смена имени автора сбрасывает карточки и страницы лент.'''
+        for url in AnonymousPageCacheTests.feed_urls:
+            self.guest_client.get(url)
+        author = User.objects.get(pk=AnonymousPageCacheTests.author.pk)
+        author.first_name, author.last_name = 'Лев', 'Толстой'
+        author.save()
+
+        for url in AnonymousPageCacheTests.feed_urls[:2]:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Лев Толстой')
+
+    def test_login_keeps_pages(self):
+        '''Вход автора не сбрасывает страницы лент.'''
+        self.guest_client.get(reverse('posts:index'))
+
+        self.author_client.force_login(AnonymousPageCacheTests.author)
+
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+
+    def test_group_slug_change_invalidates_pages(self):
+        '''Смена slug группы сбрасывает все ленты со ссылками на неё.'''
+        for url in AnonymousPageCacheTests.feed_urls:
+            self.guest_client.get(url)
+        group = Group.objects.get(pk=AnonymousPageCacheTests.group.pk)
+        group.slug = 'new_slug'
+        group.save()
+        group_url = reverse('posts:group_list', args=('new_slug',))
+
+        for url in (reverse('posts:index'),
+                    reverse('posts:profile',
+                            args=(AnonymousPageCacheTests.author.username,))):
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url),
+                                    f'href="{group_url}"')
+
+    def test_cache_stats(self):
+        '''Счётчики попаданий и промахов доступны персоналу.'''
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        self.guest_client.get(url)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.author_client.force_login(staff)
+
+        response = self.author_client.get(reverse('posts:cache_stats'))
+
+        self.assertEqual(
+            response.json()['page_cache'], {'hits': 1, 'misses': 1})
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(cls.group.slug,)),
+            reverse('posts:profile', args=(cls.author.username,)),
+            reverse('posts:post_detail', args=(cls.post.pk,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_not_modified_by_etag(self):
+        '''Неизменившаяся страница отдаётся как 304 до запроса постов.'''
+        # Странице поста нужно узнать автора и группу поста.
+        queries = dict.fromkeys(ConditionalGetTests.urls, 0)
+        queries[reverse('posts:post_detail',
+                        args=(ConditionalGetTests.post.pk,))] = 1
+
+        for url, number in queries.items():
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(number):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_not_modified_since(self):
+        '''Аноним с If-Modified-Since получает 304.'''
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                last_modified = self.guest_client.get(url)['Last-Modified']
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 304)
+
+    def test_modified_after_edit(self):
+        '''После правки поста ETag страниц меняется.'''
+        etags = {url: self.guest_client.get(url)['ETag']
+                 for url in ConditionalGetTests.urls}
+        post = Post.objects.get(pk=ConditionalGetTests.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        '''ETag анонима не подходит авторизованному пользователю.'''
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        author_client = Client()
+        author_client.force_login(ConditionalGetTests.author)
+
+        response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+
+class FeedKeyTests(TestCase):
+    def test_feed_keys_valid_for_memcached(self):
+        '''Ключи лент не содержат пробелов и не-ASCII символов.'''
+        feeds = (group_feed('Тестовый слаг'), author_feed('имя автора'))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            for feed in feeds:
+                cache.validate_key(feed_version_key(feed))
+        self.assertNotEqual(group_feed('a'), group_feed('b'))
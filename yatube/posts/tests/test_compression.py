@@ -0,0 +1,106 @@
+import gzip
+import zlib
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template import engines
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core.compression import CompressionMiddleware
+from core.template_loaders import strip_whitespace
+
+PAGE = '<p>Текст страницы</p>\n' * 100
+
+
+class TemplateWhitespaceTests(TestCase):
+    def test_strip_whitespace(self):
+        '''Отступы и пустые строки убираются, текст не склеивается.'''
+        source = (
+            '{% load static %}\n'
+            '<ul>\n'
+            '    {% for item in items %}\n'
+            '        <li>{{ item }}</li>\n'
+            '\n'
+            '    {% endfor %}\n'
+            '    {% url "posts:index" %}\n'
+            '</ul>\n'
+            '  <pre>\n    как есть\n</pre>\n'
+        )
+
+        self.assertEqual(strip_whitespace(source), (
+            '{% load static %}<ul>\n'
+            '{% for item in items %}<li>{{ item }}</li>\n'
+            '{% endfor %}{% url "posts:index" %}\n'
+            '</ul>\n'
+            '<pre>\n    как есть\n</pre>\n'
+        ))
+
+    def test_project_templates_stripped(self):
+        '''Шаблоны проекта сжимаются, шаблоны приложений Django - нет.'''
+        engine = engines['django'].engine
+
+        paginator = engine.get_template('includes/paginator.html')
+        email = engine.get_template('registration/password_reset_email.html')
+
+        self.assertNotIn('\n ', paginator.source)
+        self.assertIn('\n\n', email.source)
+
+    def test_page_renders(self):
+        '''Страница со сжатыми шаблонами отдаётся без отступов.'''
+        cache.clear()
+        response = Client().get(reverse('posts:index'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('\n  ', response.content.decode())
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept_encoding='gzip'):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(self.factory.get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding))
+
+    def test_gzip(self):
+        '''Ответ сжимается gzip, если клиент его принимает.'''
+        response = HttpResponse(PAGE)
+        response['ETag'] = '"page"'
+
+        response = self.process(response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['ETag'], 'W/"page"')
+        self.assertEqual(response['Content-Length'],
+                         str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content).decode(), PAGE)
+
+    def test_not_compressed(self):
+        '''Без подходящей кодировки и для коротких ответов сжатия нет.'''
+        cases = (
+            (HttpResponse(PAGE), ''),
+            (HttpResponse(PAGE), 'gzip;q=0, identity'),
+            (HttpResponse('<p>Коротко</p>'), 'gzip'),
+        )
+        for response, accept_encoding in cases:
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.process(response, accept_encoding)
+
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming(self):
+        '''Потоковый ответ сжимается по порциям.'''
+        lines = [f'{{"id": {number}}}\n'.encode() for number in range(50)]
+
+        response = self.process(StreamingHttpResponse(iter(lines)))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(response.streaming_content)
+        # Первая порция распаковывается, не дожидаясь остальных.
+        self.assertEqual(decompressor.decompress(next(chunks)), lines[0])
+        rest = b''.join(decompressor.decompress(chunk) for chunk in chunks)
+        self.assertEqual(rest, b''.join(lines[1:]))
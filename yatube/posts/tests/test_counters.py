@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models.signals import pre_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..counters import author_posts_count
+from ..models import AuthorStats, Group, MonthlyPostCount, Post
+
+User = get_user_model()
+
+
+class PostCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая тестовая группа',
+            slug='another_test_slug',
+            description='Ещё одна тестовая группа',
+        )
+        cls.author = User.objects.create_user(username='test_author')
+
+    def assertCounters(self, author_count, group_count, another_count):
+        self.author.refresh_from_db()
+        self.group.refresh_from_db()
+        self.another_group.refresh_from_db()
+        self.assertEqual(author_posts_count(self.author), author_count)
+        self.assertEqual(self.group.posts_count, group_count)
+        self.assertEqual(self.another_group.posts_count, another_count)
+
+    def test_create_and_delete(self):
+        '''Создание и удаление поста меняют счётчики.'''
+        post = Post.objects.create(
+            author=PostCountersTests.author, text='Пост',
+            group=PostCountersTests.group)
+        Post.objects.create(author=PostCountersTests.author, text='Пост')
+        self.assertCounters(2, 1, 0)
+
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_group_reassignment(self):
+        '''Перенос поста в другую группу переносит и счёт.'''
+        post = Post.objects.create(
+            author=PostCountersTests.author, text='Пост',
+            group=PostCountersTests.group)
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = PostCountersTests.another_group
+        post.save()
+        self.assertCounters(1, 0, 1)
+
+        post.group = None
+        post.save()
+        self.assertCounters(1, 0, 0)
+
+    def test_author_deletion(self):
+        '''Удаление автора вместе с постами не ломает счётчики.'''
+        user = User.objects.create_user(username='to_delete')
+        Post.objects.create(
+            author=user, text='Пост', group=PostCountersTests.group)
+
+        user.delete()
+
+        self.assertFalse(AuthorStats.objects.filter(user_id=user.pk).exists())
+        self.assertCounters(0, 0, 0)
+
+    def test_author_deletion_queries(self):
+        '''Число запросов при удалении автора не зависит от числа постов.'''
+        def delete_author(username, posts):
+            user = User.objects.create_user(username=username)
+            Post.objects.bulk_create(
+                Post(author=user, text='Пост', group=PostCountersTests.group)
+                for _ in range(posts))
+            call_command('rebuild_post_counters', stdout=StringIO())
+            with CaptureQueriesContext(connection) as queries:
+                user.delete()
+            return len(queries)
+
+        Post.objects.create(
+            author=PostCountersTests.author, text='Пост',
+            group=PostCountersTests.group)
+
+        self.assertEqual(delete_author('few', 2), delete_author('many', 20))
+        self.assertCounters(1, 1, 0)
+        self.assertEqual(
+            [count.posts_count for count in MonthlyPostCount.objects.all()],
+            [1, 1])
+
+    def test_post_deletion_after_failed_author_deletion(self):
+        '''После неудачного удаления автора удаление его поста
+        обновляет счётчики.'''
+        def fail(sender, instance, **kwargs):
+            raise DatabaseError('Удаление не удалось')
+
+        post = Post.objects.create(
+            author=PostCountersTests.author, text='Пост',
+            group=PostCountersTests.group)
+        pre_delete.connect(fail, sender=User)
+        self.addCleanup(pre_delete.disconnect, fail, sender=User)
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                PostCountersTests.author.delete()
+        pre_delete.disconnect(fail, sender=User)
+        self.assertCounters(1, 1, 0)
+
+        post.delete()
+
+        self.assertCounters(0, 0, 0)
+
+    def test_rebuild_command(self):
+        '''Команда rebuild_post_counters восстанавливает счётчики.'''
+        Post.objects.create(
+            author=PostCountersTests.author, text='Пост',
+            group=PostCountersTests.group)
+        AuthorStats.objects.all().delete()
+        Group.objects.update(posts_count=100)
+
+        call_command('rebuild_post_counters', stdout=StringIO())
+
+        self.assertCounters(1, 1, 0)
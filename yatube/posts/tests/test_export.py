@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.staff = User.objects.create_user(
+            username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост, {number}')
+            for number in range(3)
+        ]
+        cls.profile_export_url = reverse(
+            'posts:profile_export', args=(cls.author.username,))
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(PostExportTests.author)
+
+    def test_profile_export_ndjson(self):
+        '''Автор выгружает свои посты построчно в NDJSON.'''
+        response = self.author_client.get(PostExportTests.profile_export_url)
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        rows = [json.loads(line) for line
+                in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['text'] for row in rows],
+                         [post.text for post in PostExportTests.posts])
+        self.assertEqual(rows[0]['author'], 'test_author')
+        self.assertEqual(rows[0]['group'], 'test_slug')
+
+    def test_group_export_csv(self):
+        '''Персонал выгружает посты группы в CSV.'''
+        client = Client()
+        client.force_login(PostExportTests.staff)
+
+        response = client.get(
+            reverse('posts:group_export', args=(PostExportTests.group.slug,)),
+            {'format': 'csv'})
+
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]['text'], 'Пост, 1')
+
+    def test_export_forbidden_for_others(self):
+        '''Чужие посты и посты группы обычному пользователю не выгрузить.'''
+        client = Client()
+        client.force_login(User.objects.create_user(username='other'))
+
+        for url in (PostExportTests.profile_export_url,
+                    reverse('posts:group_export',
+                            args=(PostExportTests.group.slug,))):
+            with self.subTest(url=url):
+                self.assertIn(client.get(url).status_code, (302, 403))
+
+    def test_export_command(self):
+        '''Команда export_posts пишет выгрузку в файл.'''
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.ndjson')
+
+            call_command('export_posts', '--author=test_author',
+                         output=path, chunk_size=2)
+
+            with open(path, encoding='utf-8') as output:
+                rows = [json.loads(line) for line in output]
+        self.assertEqual(len(rows), 3)
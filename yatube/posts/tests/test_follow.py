@@ -0,0 +1,145 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='Пост до подписки')
+        cls.follow_url = reverse(
+            'posts:profile_follow', args=(cls.author.username,))
+        cls.unfollow_url = reverse(
+            'posts:profile_unfollow', args=(cls.author.username,))
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(FollowTests.reader)
+        self.stranger_client = Client()
+        self.stranger_client.force_login(FollowTests.stranger)
+
+    def feed_posts(self, client, **params):
+        response = client.get(reverse('posts:follow_index'), params)
+        return list(response.context['page_obj'])
+
+    def walk_feed(self, client, param):
+        '''Все посты ленты подписок, по номерам страниц или по курсору.'''
+        posts = []
+        params = {param: ''} if param == 'after' else {'page': 1}
+        while True:
+            response = client.get(reverse('posts:follow_index'), params)
+            page_obj = response.context['page_obj']
+            posts.extend(page_obj)
+            if not page_obj.has_next():
+                return posts
+            if param == 'after':
+                params = {'after': page_obj.next_cursor()}
+            else:
+                params = {'page': page_obj.next_page_number()}
+
+    def test_follow_and_unfollow(self):
+        '''Пользователь может подписаться на автора и отписаться.'''
+        self.reader_client.get(FollowTests.follow_url)
+        self.assertTrue(Follow.objects.filter(
+            user=FollowTests.reader, author=FollowTests.author).exists())
+        self.assertEqual(
+            self.feed_posts(self.reader_client), [FollowTests.old_post])
+
+        self.reader_client.get(FollowTests.unfollow_url)
+        self.assertFalse(Follow.objects.filter(
+            user=FollowTests.reader, author=FollowTests.author).exists())
+        self.assertEqual(self.feed_posts(self.reader_client), [])
+
+    def test_self_follow_ignored(self):
+        '''На самого себя подписаться нельзя.'''
+        client = Client()
+        client.force_login(FollowTests.author)
+
+        client.get(FollowTests.follow_url)
+
+        self.assertFalse(Follow.objects.filter(
+            user=FollowTests.author).exists())
+
+    def test_new_post_fanned_out(self):
+        '''Новый пост попадает в ленту подписчика и только его.'''
+        self.reader_client.get(FollowTests.follow_url)
+
+        post = Post.objects.create(
+            author=FollowTests.author, text='Новый пост')
+        # Раскладка идёт фоновой задачей, а on_commit в TestCase
+        # не срабатывает: выполняем очередь сами.
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        call_command('run_worker', once=True, threads=1, stdout=StringIO())
+
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=FollowTests.reader, post=post).exists())
+        self.assertEqual(self.feed_posts(self.reader_client)[0], post)
+        self.assertNotIn(post, self.feed_posts(self.stranger_client))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_read_on_demand(self):
+        '''Посты популярного автора подмешиваются в ленту при чтении.'''
+        self.reader_client.get(FollowTests.follow_url)
+
+        post = Post.objects.create(
+            author=FollowTests.author, text='Новый пост')
+
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(
+            self.feed_posts(self.reader_client),
+            [post, FollowTests.old_post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1, POSTS_PER_PAGE=2)
+    def test_pushed_and_pulled_posts_merged(self):
+        '''Разложенные посты и посты популярного автора сливаются
+        в одну ленту по дате при любой паджинации.'''
+        popular = User.objects.create_user(username='popular')
+        popular_url = reverse('posts:profile_follow', args=('popular',))
+        self.reader_client.get(FollowTests.follow_url)
+        self.reader_client.get(popular_url)
+        self.stranger_client.get(popular_url)
+        posts = []
+        for number in range(5):
+            posts.append(Post.objects.create(
+                author=FollowTests.author, text=f'Пост автора {number}'))
+            posts.append(Post.objects.create(
+                author=popular, text=f'Пост популярного {number}'))
+        call_command('run_worker', once=True, threads=1, stdout=StringIO())
+        expected = [*reversed(posts), FollowTests.old_post]
+
+        self.assertFalse(TimelineEntry.objects.filter(
+            post__author=popular).exists())
+        for param in ('page', 'after'):
+            with self.subTest(param=param):
+                cache.clear()
+                self.assertEqual(
+                    self.walk_feed(self.reader_client, param), expected)
+
+    @override_settings(TIMELINE_MAX_LENGTH=2)
+    def test_timeline_length_capped(self):
+        '''В ленте подписчика хранятся только последние посты.'''
+        self.reader_client.get(FollowTests.follow_url)
+        posts = [
+            Post.objects.create(author=FollowTests.author, text=f'Пост {n}')
+            for n in range(3)
+        ]
+        call_command('run_worker', once=True, threads=1, stdout=StringIO())
+
+        self.assertEqual(
+            self.feed_posts(self.reader_client), [posts[2], posts[1]])
+        self.assertEqual(TimelineEntry.objects.filter(
+            user=FollowTests.reader).count(), 2)
@@ -0,0 +1,160 @@
+import io
+import shutil
+import tempfile
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Task
+from core.tasks import run_task
+
+from ..images import variant_name
+from ..models import Post
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+IMAGE_TASK = 'posts.tasks.make_post_images'
+
+
+def image_bytes(size=(2000, 1500)) -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', size, 'red').save(output, 'PNG')
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_author')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(PostImageTests.user)
+
+    def create_post(self, content=None, name='cat.png'):
+        if content is None:
+            content = image_bytes()
+        return self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content,
+                                        content_type='image/png'),
+        })
+
+    @unittest.skipIf(Image is None, 'Pillow не установлен')
+    def test_upload_queues_variants(self):
+        '''Загрузка картинки сохраняет её и ставит задачу на варианты.'''
+        self.create_post()
+
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.image.name.startswith('posts/cat'))
+        self.assertEqual(post.image_card.name, '')
+        self.assertTrue(Task.objects.filter(name=IMAGE_TASK).exists())
+
+    @unittest.skipIf(Image is None, 'Pillow не установлен')
+    def test_wrong_extension_rejected(self):
+        '''Файлы не с расширением картинки не принимаются.'''
+        response = self.create_post(name='cat.exe')
+
+        self.assertTrue(response.context['image_form'].errors)
+        self.assertFalse(Post.objects.exists())
+
+    @unittest.skipIf(Image is None, 'Pillow не установлен')
+    def test_not_image_rejected(self):
+        '''Файл с расширением картинки, но не картинка, не принимается.'''
+        response = self.create_post(b'<script>alert(1)</script>')
+
+        self.assertTrue(response.context['image_form'].errors)
+        self.assertFalse(Post.objects.exists())
+
+    def test_variant_names_deterministic(self):
+        '''Имя варианта зависит только от картинки и размера.'''
+        self.assertEqual(variant_name('posts/cat_x1.png', 'card'),
+                         'posts/variants/cat_x1_png_card_960x339.jpg')
+        self.assertEqual(variant_name('posts/cat_x1.png', 'detail'),
+                         'posts/variants/cat_x1_png_detail_1280x0.jpg')
+        self.assertNotEqual(variant_name('posts/cat.jpg', 'card'),
+                            variant_name('posts/cat.png', 'card'))
+
+    def test_feed_reads_ready_variant(self):
+        '''Лента показывает готовый вариант с loading="lazy"
+        и не обращается к хранилищу.'''
+        post = Post.objects.create(author=PostImageTests.user, text='Пост')
+        Post.objects.filter(pk=post.pk).update(
+            image_card='posts/variants/cat_card_960x339.jpg')
+
+        with self.assertNumQueries(2):
+            response = Client().get(reverse('posts:index'))
+
+        self.assertContains(
+            response, '<img class="card-img my-2" '
+            'src="/media/posts/variants/cat_card_960x339.jpg" '
+            'loading="lazy" alt="">', html=False)
+
+    def test_save_keeps_variants(self):
+        '''Сохранение поста не затирает варианты, записанные задачей.'''
+        post = Post.objects.create(
+            author=PostImageTests.user, text='Пост', image='posts/cat.png')
+        post = Post.objects.get(pk=post.pk)
+        Post.objects.filter(pk=post.pk).update(
+            image_card='posts/variants/cat_png_card_960x339.jpg')
+
+        post.text = 'Исправленный пост'
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual(post.image_card.name,
+                         'posts/variants/cat_png_card_960x339.jpg')
+
+    @unittest.skipIf(Image is None, 'Pillow не установлен')
+    def test_variants_generated(self):
+        '''Задача делает варианты нужных размеров и сбрасывает карточку.'''
+        self.create_post()
+        post = Post.objects.get(text='Пост с картинкой')
+        self.client.get(reverse('posts:index'))
+
+        run_task(Task.objects.get(name=IMAGE_TASK).pk)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image_card.name,
+                         variant_name(post.image.name, 'card'))
+        with Image.open(post.image_card.path) as card:
+            self.assertEqual(card.size, (960, 339))
+        with Image.open(post.image_detail.path) as detail:
+            self.assertEqual(detail.size, (1280, 960))
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, post.image_card.url)
+
+    @unittest.skipIf(Image is None, 'Pillow не установлен')
+    def test_new_image_resets_variants(self):
+        '''Замена картинки сбрасывает варианты прежней.'''
+        self.create_post()
+        post = Post.objects.get(text='Пост с картинкой')
+        run_task(Task.objects.get(name=IMAGE_TASK).pk)
+
+        self.client.post(reverse('posts:post_edit', args=(post.pk,)), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile('dog.png', image_bytes()),
+        })
+
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.startswith('posts/dog'))
+        self.assertEqual(post.image_card.name, '')
+        self.assertEqual(Task.objects.filter(name=IMAGE_TASK).count(), 1)
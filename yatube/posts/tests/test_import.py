@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from ..importing import PostImporter
+from ..models import Group, ImportCheckpoint, Post
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class PostImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content, mode='w'):
+        path = os.path.join(self.directory, name)
+        with open(path, mode, encoding='utf-8') as source:
+            source.write(content)
+        return path
+
+    def write_jsonl(self, rows):
+        return self.write('posts.jsonl', ''.join(
+            json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+
+    def test_import_jsonl(self):
+        '''Посты загружаются с датами, счётчиками и поиском.'''
+        path = self.write_jsonl([
+            {'author': 'test_author', 'group': 'test_slug',
+             'text': 'Старый пост про сову',
+             'pub_date': '2015-03-01T10:00:00'},
+            {'author': 'test_author', 'text': 'Пост без группы'},
+            {'author': 'nobody', 'text': 'Неизвестный автор'},
+            {'author': 'test_author', 'text': ''},
+        ])
+
+        result = PostImporter(path, chunk_size=3).run()
+
+        self.assertEqual(result['imported'], 2)
+        self.assertEqual(result['skipped'], 2)
+        post = Post.objects.get(text='Старый пост про сову')
+        self.assertEqual(post.group, PostImportTests.group)
+        self.assertEqual(
+            post.pub_date,
+            timezone.make_aware(datetime(2015, 3, 1, 10)))
+        self.assertEqual(list(search_posts('сову')), [post])
+        self.assertEqual(
+            Group.objects.get(pk=PostImportTests.group.pk).posts_count, 1)
+        self.assertEqual(
+            User.objects.get(pk=PostImportTests.author.pk)
+            .stats.posts_count, 2)
+
+    def test_import_csv_creates_missing(self):
+        '''CSV загружается, недостающие авторы и группы создаются.'''
+        path = self.write(
+            'posts.csv',
+            'author,group,text,pub_date\n'
+            'new_author,new_group,"Пост, с запятой",\n')
+
+        PostImporter(path, create_missing=True).run()
+
+        post = Post.objects.get()
+        self.assertEqual(post.text, 'Пост, с запятой')
+        self.assertEqual(post.author.username, 'new_author')
+        self.assertEqual(post.group.slug, 'new_group')
+
+    def test_resume_from_checkpoint(self):
+        '''Повторный запуск продолжает с контрольной точки.'''
+        path = self.write_jsonl([
+            {'author': 'test_author', 'text': f'Пост {number}'}
+            for number in range(5)
+        ])
+        ImportCheckpoint.objects.create(
+            source=os.path.abspath(path), rows=3, imported=3)
+
+        result = PostImporter(path, chunk_size=2).run()
+
+        self.assertEqual(result['imported'], 2)
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Пост 3', 'Пост 4'})
+        self.assertEqual(
+            ImportCheckpoint.objects.get(source=os.path.abspath(path)).rows,
+            5)
+
+        PostImporter(path).run(restart=True)
+
+        self.assertEqual(Post.objects.count(), 7)
+
+    def test_resume_from_offset(self):
+        '''Продолжение читает файл со смещения контрольной точки.'''
+        path = self.write_jsonl([
+            {'author': 'test_author', 'text': 'Первый пост'},
+            {'author': 'test_author', 'text': 'Второй пост'},
+        ])
+        PostImporter(path).run()
+        checkpoint = ImportCheckpoint.objects.get(
+            source=os.path.abspath(path))
+        self.assertEqual(checkpoint.offset, os.path.getsize(path))
+        # Загруженные строки больше не читаются: испорченное начало
+        # файла продолжению не мешает.
+        with open(path, 'r+b') as source:
+            source.write(b'{')
+        self.write('posts.jsonl', json.dumps(
+            {'author': 'test_author', 'text': 'Третий пост'},
+            ensure_ascii=False) + '\n', mode='a')
+
+        result = PostImporter(path).run()
+
+        self.assertEqual(result['rows'], 3)
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(result['skipped'], 0)
+        self.assertEqual(Post.objects.count(), 3)
+
+    def test_resume_csv_from_offset(self):
+        '''CSV продолжается со смещения с заголовком из начала файла.'''
+        path = self.write(
+            'posts.csv',
+            'author,text\n'
+            'test_author,"Пост\nв две строки"\n')
+        PostImporter(path).run()
+        self.write('posts.csv', 'test_author,Пост после перерыва\n',
+                   mode='a')
+
+        result = PostImporter(path).run()
+
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Пост\nв две строки', 'Пост после перерыва'])
@@ -1,5 +1,8 @@
+from unittest import skipUnless
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
 
 from ..models import Group, Post
 
@@ -60,3 +63,87 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     PostModelTest.post._meta.get_field(field).help_text,
                     expected)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class PostFeedQueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    @staticmethod
+    def query_plan(queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_feeds_use_indexes(self):
+        '''Ленты читаются по индексу, без сортировки во временном B-tree.'''
+        post = PostFeedQueryPlanTests.post
+        feeds = {
+            'index': Post.objects.select_related(),
+            'group': PostFeedQueryPlanTests.group.posts.select_related(
+                'author'),
+            'profile': PostFeedQueryPlanTests.user.posts.select_related(),
+        }
+        orderings = {
+            'pages': Post._meta.ordering,
+            'cursor': ('-pub_date', '-pk'),
+        }
+
+        for feed, queryset in feeds.items():
+            for mode, ordering in orderings.items():
+                feed_queryset = queryset.order_by(*ordering)
+                if mode == 'cursor':
+                    feed_queryset = (
+                        feed_queryset
+                        .filter(pub_date__lte=post.pub_date)
+                        .exclude(pub_date=post.pub_date, pk__gte=post.pk))
+                with self.subTest(feed=feed, mode=mode):
+                    plan = self.query_plan(feed_queryset[:10])
+                    self.assertFalse(
+                        any('TEMP B-TREE' in step for step in plan), plan)
+                    self.assertFalse(
+                        any(step == 'SCAN posts_post' for step in plan),
+                        plan)
+
+
+@override_settings(POST_EXCERPT_LENGTH=20)
+class PostExcerptTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_excerpt_on_save(self):
+        '''Начало текста считается при сохранении поста.'''
+        short = Post.objects.create(author=PostExcerptTests.user,
+                                    text='Короткий пост')
+        long = Post.objects.create(author=PostExcerptTests.user,
+                                   text='Длинный пост, который не влезет')
+
+        self.assertEqual(short.excerpt, 'Короткий пост')
+        self.assertFalse(short.excerpt_truncated)
+        self.assertEqual(len(long.excerpt), 20)
+        self.assertTrue(long.excerpt_truncated)
+
+    def test_excerpt_with_update_fields(self):
+        '''save(update_fields=['text']) обновляет и начало текста.'''
+        post = Post.objects.create(author=PostExcerptTests.user,
+                                   text='Короткий пост')
+
+        post.text = 'Длинный пост, который не влезет'
+        post.save(update_fields=['text'])
+
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Длинный пост, котор…')
+        self.assertTrue(post.excerpt_truncated)
@@ -0,0 +1,161 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..feeds import FEED_ALL, group_feed
+from ..models import Group, Post
+from ..utils import (CursorPaginator, FeedPaginator, decode_cursor,
+                     encode_cursor)
+
+POSTS_NUMBER = 25
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        for i in range(POSTS_NUMBER):
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+        cls.ordered_ids = list(
+            Post.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True))
+
+    def setUp(self):
+        self.paginator = CursorPaginator(
+            Post.objects.all(), settings.POSTS_PER_PAGE)
+
+    def test_cursor_roundtrip(self):
+        '''Токен курсора однозначно распаковывается обратно.'''
+        post = Post.objects.first()
+
+        self.assertEqual(
+            decode_cursor(encode_cursor(post.pub_date, post.pk)),
+            (post.pub_date, post.pk))
+
+    def test_broken_cursor_gives_first_page(self):
+        '''Испорченный курсор открывает первую страницу ленты.'''
+        page = self.paginator.get_cursor_page(after='не-курсор')
+
+        self.assertEqual(
+            [post.pk for post in page],
+            CursorPaginatorTests.ordered_ids[:settings.POSTS_PER_PAGE])
+        self.assertFalse(page.has_previous())
+
+    def test_walk_forward_and_back(self):
+        '''Курсоры обходят ленту целиком в обе стороны без пропусков.'''
+        pages = [self.paginator.get_cursor_page()]
+        while pages[-1].has_next():
+            pages.append(self.paginator.get_cursor_page(
+                after=pages[-1].next_cursor()))
+
+        walked = [post.pk for page in pages for post in page]
+        self.assertEqual(walked, CursorPaginatorTests.ordered_ids)
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator.get_cursor_page(
+                before=page.previous_cursor())
+            with self.subTest(first=expected[0].pk):
+                self.assertEqual(list(page), list(expected))
+        self.assertFalse(page.has_previous())
+
+    def test_page_without_count(self):
+        '''Страница по курсору строится одним запросом, без COUNT(*).'''
+        first_page = self.paginator.get_cursor_page()
+
+        with self.assertNumQueries(1):
+            page = self.paginator.get_cursor_page(
+                after=first_page.next_cursor())
+            list(page)
+
+    def test_views_accept_cursor(self):
+        '''Ленты переходят в курсорный режим по параметру after.'''
+        response = Client().get(reverse('posts:index') + '?after=')
+        page_obj = response.context.get('page_obj')
+
+        self.assertTrue(page_obj.is_cursor)
+        self.assertContains(response, f'?after={page_obj.next_cursor()}')
+
+
+class FeedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая тестовая группа',
+            slug='another_test_slug',
+            description='Ещё одна тестовая группа',
+        )
+        for i in range(POSTS_NUMBER):
+            Post.objects.create(
+                author=cls.author, text=f'Пост {i}', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached(self):
+        '''Количество постов ленты считается один раз.'''
+        FeedPaginator(Post.objects.all(), settings.POSTS_PER_PAGE,
+                      feed=FEED_ALL).count
+
+        with self.assertNumQueries(0):
+            count = FeedPaginator(
+                Post.objects.all(), settings.POSTS_PER_PAGE,
+                feed=FEED_ALL).count
+        self.assertEqual(count, POSTS_NUMBER)
+
+    def test_count_invalidated_on_save(self):
+        '''Новый пост сбрасывает закэшированное количество.'''
+        FeedPaginator(Post.objects.all(), settings.POSTS_PER_PAGE,
+                      feed=FEED_ALL).count
+        Post.objects.create(author=FeedPaginatorTests.author, text='Новый')
+
+        count = FeedPaginator(Post.objects.all(), settings.POSTS_PER_PAGE,
+                              feed=FEED_ALL).count
+        self.assertEqual(count, POSTS_NUMBER + 1)
+
+    def test_count_invalidated_on_group_change(self):
+        '''Перенос поста обновляет количество в обеих группах.'''
+        group = FeedPaginatorTests.group
+        another_group = FeedPaginatorTests.another_group
+        FeedPaginator(group.posts.all(), settings.POSTS_PER_PAGE,
+                      feed=group_feed(group.slug)).count
+        FeedPaginator(another_group.posts.all(), settings.POSTS_PER_PAGE,
+                      feed=group_feed(another_group.slug)).count
+
+        post = Post.objects.filter(group=group).first()
+        post.group = another_group
+        post.save()
+
+        counts = {
+            group: POSTS_NUMBER - 1,
+            another_group: 1,
+        }
+        for feed_group, expected in counts.items():
+            with self.subTest(group=feed_group.slug):
+                self.assertEqual(
+                    FeedPaginator(feed_group.posts.all(),
+                                  settings.POSTS_PER_PAGE,
+                                  feed=group_feed(feed_group.slug)).count,
+                    expected)
+
+    def test_elided_page_range_is_bounded(self):
+        '''Список номеров страниц не растёт вместе с лентой.'''
+        paginator = FeedPaginator(Post.objects.all(), 1)
+        page_range = paginator.page(13).elided_page_range
+
+        self.assertEqual(
+            page_range,
+            [1, paginator.ELLIPSIS, 11, 12, 13, 14, 15,
+             paginator.ELLIPSIS, POSTS_NUMBER])
@@ -0,0 +1,159 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.query_budget import QueryReport, get_query_budget
+from core.testing import QueryBudgetTestMixin
+
+from .. import urls
+from ..models import Group, Post
+from ..timeline import follow_author
+
+User = get_user_model()
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.staff = User.objects.create_user(
+            username='staff', is_staff=True)
+        groups = [
+            Group.objects.create(
+                title=f'Группа {number}',
+                slug=f'group_{number}',
+                description='Тестовое описание',
+            )
+            for number in range(3)
+        ]
+        cls.group = groups[0]
+        cls.another_group = groups[1]
+        # В этой группе ещё нет счётчика постов за месяц.
+        cls.empty_group = Group.objects.create(
+            title='Пустая группа',
+            slug='empty_group',
+            description='Тестовое описание',
+        )
+        authors = [cls.author, cls.reader, cls.staff]
+        for number in range(12):
+            Post.objects.create(
+                author=authors[number % len(authors)],
+                group=groups[number % len(groups)],
+                text=f'Тестовый пост {number}',
+            )
+        cls.post = Post.objects.filter(author=cls.author).first()
+        follow_author(cls.reader, cls.author)
+        follow_author(cls.reader, cls.staff)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(QueryBudgetTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(QueryBudgetTests.reader)
+        self.staff_client = Client()
+        self.staff_client.force_login(QueryBudgetTests.staff)
+
+    def test_every_view_has_budget(self):
+        '''У каждого view приложения posts объявлен бюджет запросов.'''
+        for pattern in urls.urlpatterns:
+            with self.subTest(name=pattern.name):
+                self.assertIsNotNone(get_query_budget(pattern.callback))
+
+    def test_views_within_budget(self):
+        '''Страницы укладываются в бюджет и не делают N+1 запросов.'''
+        post = QueryBudgetTests.post
+        username = QueryBudgetTests.author.username
+        group_url = reverse(
+            'posts:group_list', args=(QueryBudgetTests.group.slug,))
+        today = timezone.localdate()
+        archive_url = reverse('posts:archive',
+                              args=(today.year, today.month))
+        group_archive_url = reverse(
+            'posts:group_archive',
+            args=(QueryBudgetTests.group.slug, today.year, today.month))
+        requests = (
+            (self.guest_client, 'get', reverse('posts:index'), None),
+            (self.reader_client, 'get', reverse('posts:index'), None),
+            (self.guest_client, 'get', group_url, None),
+            (self.reader_client, 'get', group_url, None),
+            (self.guest_client, 'get', reverse('posts:popular'), None),
+            (self.reader_client, 'get', reverse('posts:popular'), None),
+            (self.guest_client, 'get', archive_url, None),
+            (self.reader_client, 'get', archive_url, None),
+            (self.guest_client, 'get', group_archive_url, None),
+            (self.reader_client, 'get', group_archive_url, None),
+            (self.reader_client, 'get',
+             reverse('posts:profile', args=(username,)), None),
+            (self.guest_client, 'get', reverse('posts:search'),
+             {'q': 'тестовый'}),
+            (self.guest_client, 'get',
+             reverse('posts:post_detail', args=(post.pk,)), None),
+            (self.reader_client, 'get',
+             reverse('posts:post_detail', args=(post.pk,)), None),
+            (self.author_client, 'get', reverse('posts:post_create'), None),
+            (self.author_client, 'post', reverse('posts:post_create'),
+             {'text': 'Новый пост', 'group': QueryBudgetTests.group.pk}),
+            (self.author_client, 'get',
+             reverse('posts:post_edit', args=(post.pk,)), None),
+            (self.author_client, 'post',
+             reverse('posts:post_edit', args=(post.pk,)),
+             {'text': 'Перенесённый пост',
+              'group': QueryBudgetTests.another_group.pk}),
+            (self.author_client, 'post',
+             reverse('posts:post_edit', args=(post.pk,)),
+             {'text': 'Пост в новой группе',
+              'group': QueryBudgetTests.empty_group.pk}),
+            (self.author_client, 'post',
+             reverse('posts:post_edit', args=(post.pk,)),
+             {'text': 'Исправленный пост'}),
+            (self.reader_client, 'get', reverse('posts:follow_index'), None),
+            (self.reader_client, 'get',
+             reverse('posts:profile_unfollow', args=(username,)), None),
+            (self.reader_client, 'get',
+             reverse('posts:profile_follow', args=(username,)), None),
+            (self.author_client, 'get',
+             reverse('posts:profile_export', args=(username,)), None),
+            (self.staff_client, 'get',
+             reverse('posts:group_export',
+                     args=(QueryBudgetTests.group.slug,)), None),
+            (self.staff_client, 'get', reverse('posts:cache_stats'), None),
+            (self.staff_client, 'get', reverse('posts:query_stats'), None),
+            (self.staff_client, 'get', reverse('posts:view_stats'), None),
+        )
+        for client, method, url, data in requests:
+            with self.subTest(method=method, url=url):
+                cache.clear()
+                response = getattr(client, method)(url, data)
+                self.assertWithinQueryBudget(response)
+
+    def test_admin_changelist_without_n_plus_one(self):
+        '''Список постов в админке не делает запросов на каждую строку.'''
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        self.staff_client.force_login(admin)
+
+        response = self.staff_client.get(
+            reverse('admin:posts_post_changelist'))
+
+        self.assertEqual(response.query_report.repeated_shapes(), {})
+
+    def test_repeated_queries_reported(self):
+        '''Одинаковые запросы с разными параметрами считаются N+1.'''
+        report = QueryReport()
+
+        with report.record():
+            for post in Post.objects.all()[:3]:
+                post.author.username
+
+        self.assertEqual(report.count, 4)
+        self.assertEqual(len(report.repeated_shapes()), 1)
+        self.assertEqual(report.repeated_shapes(threshold=4), {})
+        self.assertIn(connection.ops.quote_name('auth_user'),
+                      next(iter(report.repeated_shapes())))
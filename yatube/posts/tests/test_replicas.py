@@ -0,0 +1,118 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.db_router import (STICKY_COOKIE, PrimaryReplicaRouter,
+                            replica_routing, use_primary)
+
+from ..cards import CARD_DEFAULT, card_key
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.databases['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections.databases['replica']
+        del connections._connections.replica
+        cls.directory.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='test_author')
+        Post.objects.create(author=self.author, text='Пост на реплике')
+        call_command('sync_replicas', stdout=open(os.devnull, 'w'))
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def index_texts(self, client):
+        cache.clear()
+        response = client.get(reverse('posts:index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_router(self):
+        '''Чтения идут на реплику, запись и auth - на основную базу.'''
+        router = PrimaryReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Post), 'default')
+        with replica_routing():
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            self.assertEqual(router.db_for_read(User), 'default')
+            with use_primary():
+                self.assertEqual(router.db_for_read(Post), 'default')
+            self.assertEqual(router.db_for_write(Post), 'default')
+            self.assertEqual(router.db_for_read(Post), 'default')
+        with replica_routing():
+            self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def search_texts(self, client):
+        response = client.get(reverse('posts:search'), {'q': 'пост'})
+        return [post.text for post in response.context['page_obj']]
+
+    def test_replica_pinned_per_request(self):
+        '''Все чтения одного запроса идут с одной реплики.'''
+        router = PrimaryReplicaRouter()
+        replicas = [f'replica_{number}' for number in range(5)]
+
+        with override_settings(DATABASE_REPLICAS=replicas):
+            with replica_routing():
+                aliases = {router.db_for_read(Post) for _ in range(20)}
+
+        self.assertEqual(len(aliases), 1)
+
+    def test_search_read_from_replica(self):
+        '''Поиск читается с реплики, пока её не обновят.'''
+        post = Post.objects.create(
+            author=self.author, text='Пост только в основной')
+
+        self.assertEqual(self.search_texts(self.guest_client),
+                         ['Пост на реплике'])
+
+        call_command('sync_replicas', stdout=open(os.devnull, 'w'))
+        self.assertEqual(
+            sorted(self.search_texts(self.guest_client)),
+            ['Пост на реплике', 'Пост только в основной'])
+        # Карточки с реплики в кэш не попадают: после сброса кэша
+        # по изменению поста они вернули бы туда старую версию.
+        self.assertIsNone(cache.get(card_key(post.pk, CARD_DEFAULT),
+                                    version=settings.POST_CARD_CACHE_VERSION))
+
+    def test_cached_feed_read_from_primary(self):
+        '''Кэшируемая лента с ETag читается с основной базы.'''
+        Post.objects.create(author=self.author, text='Пост только в основной')
+
+        self.assertEqual(self.index_texts(self.guest_client),
+                         ['Пост только в основной', 'Пост на реплике'])
+
+    def test_read_your_writes(self):
+        '''После своей записи автор читает с основной базы.'''
+        response = self.author_client.post(
+            reverse('posts:post_create'), data={'text': 'Свежий пост'})
+
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertIn('Свежий пост', self.search_texts(self.author_client))
+        self.assertNotIn('Свежий пост', self.search_texts(self.guest_client))
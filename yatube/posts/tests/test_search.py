@@ -0,0 +1,92 @@
+from http import HTTPStatus
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import build_match_query, search_posts
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 есть только в SQLite')
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='test_author', is_staff=True, is_superuser=True)
+        cls.cat_post = Post.objects.create(
+            author=cls.author, text='Кошка спит на диване')
+        cls.cats_post = Post.objects.create(
+            author=cls.author, text='Кошка и ещё одна кошка')
+        cls.dog_post = Post.objects.create(
+            author=cls.author, text='Собака гуляет во дворе')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_match_query_is_escaped(self):
+        '''Спецсимволы FTS5 из запроса не попадают в MATCH.'''
+        self.assertEqual(build_match_query('кошка" OR (собака'),
+                         '"кошка" "OR" "собака"*')
+        self.assertEqual(list(search_posts('"(*')), [])
+
+    def test_ranked_search(self):
+        '''Поиск находит посты и ставит выше более релевантные.'''
+        self.assertEqual(
+            list(search_posts('кошка')),
+            [PostSearchTests.cats_post, PostSearchTests.cat_post])
+
+    def test_prefix_search(self):
+        '''Последнее слово запроса ищется по началу.'''
+        self.assertEqual(list(search_posts('соба')),
+                         [PostSearchTests.dog_post])
+
+    def test_index_follows_changes(self):
+        '''Индекс обновляется при изменении и удалении постов.'''
+        post = Post.objects.create(
+            author=PostSearchTests.author, text='Попугай')
+        self.assertEqual(list(search_posts('попугай')), [post])
+
+        post.text = 'Хомяк'
+        post.save()
+        self.assertEqual(list(search_posts('попугай')), [])
+        self.assertEqual(list(search_posts('хомяк')), [post])
+
+        post.delete()
+        self.assertEqual(list(search_posts('хомяк')), [])
+
+    def test_search_page(self):
+        '''Страница поиска показывает найденные посты.'''
+        response = Client().get(reverse('posts:search'), {'q': 'собака'})
+
+        self.assertEqual(list(response.context['page_obj']),
+                         [PostSearchTests.dog_post])
+        self.assertContains(response, 'Собака гуляет во дворе')
+
+    def test_admin_search(self):
+        '''Поиск в админке идёт через полнотекстовый индекс.'''
+        client = Client()
+        client.force_login(PostSearchTests.author)
+
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'диване'})
+
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [PostSearchTests.cat_post])
+
+    def test_admin_search_without_words(self):
+        '''Поиск в админке по одним знакам препинания не падает.'''
+        client = Client()
+        client.force_login(PostSearchTests.author)
+
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': '?!'})
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(list(response.context['cl'].result_list), [])
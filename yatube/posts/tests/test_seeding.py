@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from ..benchmarks.feeds import FeedBenchmark
+from ..models import AuthorStats, Group, Post
+from ..seeding import Seeder
+
+User = get_user_model()
+
+
+class SeederTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_posts(self):
+        '''Seeder создаёт объекты и пересчитывает счётчики.'''
+        started = timezone.now()
+
+        Seeder(processes=1, batch_size=7).run(users=3, groups=2, posts=20)
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertTrue(Post.objects.filter(pub_date__lt=started).exists())
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            20)
+
+    def test_dates_kept_only_while_seeding(self):
+        '''После заполнения даты постов снова ставятся автоматически.'''
+        Seeder(processes=1).run(users=1, posts=1)
+        started = timezone.now()
+
+        post = Post.objects.create(author=User.objects.get(), text='Пост')
+
+        self.assertGreaterEqual(post.pub_date, started)
+
+    def test_benchmark_report(self):
+        '''Замер проходит по всем страницам ленты.'''
+        Seeder(processes=1).run(users=3, groups=2, posts=30)
+
+        report = FeedBenchmark(repeat=1).run()
+
+        self.assertEqual(report['views']['posts:index GET']['status'], 200)
+        self.assertIn('last_page', report['paginate_posts'])
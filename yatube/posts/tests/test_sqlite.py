@@ -0,0 +1,26 @@
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TransactionTestCase, override_settings
+
+from ..benchmarks.database import SQLITE_DEFAULTS
+
+
+class SQLitePragmaTests(TransactionTestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def connect(self, pragmas):
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            connection_created.send(sender=type(connection),
+                                    connection=connection)
+
+    def test_pragmas_on_new_connection(self):
+        '''PRAGMA из SQLITE_PRAGMAS выполняются на новом соединении.'''
+        self.addCleanup(self.connect, SQLITE_DEFAULTS)
+
+        self.connect({'synchronous': 'NORMAL', 'busy_timeout': 1234})
+
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
@@ -0,0 +1,121 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import staticfiles
+from core.encoding import choose_encoding
+from core.staticfiles import StaticFilesMiddleware
+
+CSS = b'body { margin: 0; }\n' * 100
+
+
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.source = tempfile.mkdtemp()
+        cls.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(cls.source, 'css'))
+        with open(os.path.join(cls.source, 'css', 'site.css'), 'wb') as f:
+            f.write(CSS)
+        with open(os.path.join(cls.source, 'logo.png'), 'wb') as f:
+            f.write(b'\x89PNG' + bytes(range(256)))
+        cls.settings = override_settings(
+            STATICFILES_DIRS=[cls.source],
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'core.staticfiles.CompressedManifestStaticFilesStorage'),
+        )
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        shutil.rmtree(cls.source)
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = StaticFilesMiddleware(
+            lambda request: HttpResponse('view'))
+        self.hashed_css = staticfiles_storage.stored_name('css/site.css')
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, **headers))
+
+    def test_hashed_and_compressed_copies(self):
+        '''collectstatic пишет имена с хэшем и сжатые копии.'''
+        self.assertRegex(self.hashed_css, r'^css/site\.[0-9a-f]{12}\.css$')
+        path = os.path.join(StaticFilesTests.root, self.hashed_css)
+        with open(path + '.gz', 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), CSS)
+        # PNG уже сжат: копий нет.
+        hashed_png = staticfiles_storage.stored_name('logo.png')
+        self.assertFalse(os.path.exists(
+            os.path.join(StaticFilesTests.root, hashed_png + '.gz')))
+
+    @unittest.skipIf(staticfiles.brotli is None, 'brotli не установлен')
+    def test_brotli_copy(self):
+        '''При установленном brotli пишется и копия .br.'''
+        path = os.path.join(StaticFilesTests.root, self.hashed_css)
+        with open(path + '.br', 'rb') as compressed:
+            self.assertEqual(
+                staticfiles.brotli.decompress(compressed.read()), CSS)
+
+    def test_serves_gzip_with_immutable_cache(self):
+        '''Файл с хэшем отдаётся сжатым и кэшируется навсегда.'''
+        response = self.get(f'/static/{self.hashed_css}',
+                            HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), CSS)
+
+    def test_identity_and_short_cache(self):
+        '''Без Accept-Encoding файл отдаётся как есть; без хэша в имени
+        кэшируется ненадолго.'''
+        response = self.get('/static/css/site.css')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+    def test_not_modified(self):
+        '''Повторный запрос с If-Modified-Since получает 304.'''
+        response = self.get(f'/static/{self.hashed_css}')
+
+        response = self.get(f'/static/{self.hashed_css}',
+                            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_paths_pass_through(self):
+        '''Неизвестные файлы и пути вне статики уходят дальше.'''
+        for path in ('/static/missing.css', '/static/../manage.py', '/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).content, b'view')
+
+    def test_choose_encoding(self):
+        '''Кодировка выбирается по весам q из Accept-Encoding.'''
+        available = ('br', 'gzip')
+
+        self.assertEqual(choose_encoding('gzip, br', available), 'br')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip', available),
+                         'gzip')
+        self.assertEqual(choose_encoding('*', available), 'br')
+        self.assertIsNone(choose_encoding('gzip;q=0, identity', available))
+        self.assertIsNone(choose_encoding('', available))
@@ -0,0 +1,166 @@
+import datetime
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mail import QueuedEmailBackend
+from core.models import Task
+from core.tasks import run_task, task
+
+calls = []
+
+
+@task
+def remember(value, flag=False):
+    calls.append((value, flag))
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError('Не получилось')
+
+
+@task(max_attempts=1, summary=lambda secret: 'Секрет скрыт')
+def explode_with_secret(secret):
+    raise RuntimeError('Не получилось')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_stores_task(self):
+        '''delay() сохраняет задачу, а выполнение удаляет её.'''
+        queued = remember.delay('значение', flag=True)
+
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(calls, [])
+        self.assertIs(run_task(queued.pk), True)
+        self.assertEqual(calls, [('значение', True)])
+        self.assertFalse(Task.objects.filter(pk=queued.pk).exists())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager(self):
+        '''С TASKS_EAGER задача выполняется сразу и не сохраняется.'''
+        remember.delay(1)
+
+        self.assertEqual(calls, [(1, False)])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_RETRY_DELAY=10)
+    def test_retry_then_fail(self):
+        '''Упавшая задача откладывается, а после всех попыток падает.'''
+        queued = explode.delay()
+
+        self.assertIs(run_task(queued.pk), False)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('Не получилось', queued.last_error)
+        self.assertGreater(
+            queued.run_at, timezone.now() + datetime.timedelta(seconds=5))
+        # Срок повтора не наступил: задачу не забрать.
+        self.assertIsNone(run_task(queued.pk))
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        self.assertIs(run_task(queued.pk), False)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_failed_task_payload_scrubbed(self):
+        '''У окончательно упавшей задачи с summary аргументы стираются.'''
+        queued = explode_with_secret.delay('токен-сброса')
+
+        self.assertIs(run_task(queued.pk), False)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertNotIn('токен-сброса', queued.payload)
+        self.assertEqual(json.loads(queued.payload),
+                         {'summary': 'Секрет скрыт'})
+
+    def test_mail_payload_hidden_in_admin(self):
+        '''Админка показывает о письмах только сводку.'''
+        message = mail.EmailMessage(
+            'Сброс пароля', 'Ссылка: /reset/секретный-токен/',
+            'from@example.com', ['to@example.com', 'other@example.com'])
+        QueuedEmailBackend().send_messages([message])
+        admin = get_user_model().objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        client = Client()
+        client.force_login(admin)
+
+        response = client.get(reverse(
+            'admin:core_task_change', args=(Task.objects.get().pk,)))
+
+        self.assertNotContains(response, 'секретный-токен')
+        self.assertNotContains(response, 'to@example.com')
+        self.assertContains(
+            response, 'Писем: 1, получателей: 2, темы: Сброс пароля')
+
+    def test_expired_lease_reclaimed(self):
+        '''Задачу упавшего исполнителя забирают после конца аренды.'''
+        queued = remember.delay(2)
+        Task.objects.filter(pk=queued.pk).update(
+            status=Task.RUNNING,
+            locked_until=timezone.now() + datetime.timedelta(minutes=1))
+
+        self.assertIsNone(run_task(queued.pk))
+
+        Task.objects.filter(pk=queued.pk).update(
+            locked_until=timezone.now() - datetime.timedelta(minutes=1))
+        self.assertIs(run_task(queued.pk), True)
+        self.assertEqual(calls, [(2, False)])
+
+    def test_run_worker_once(self):
+        '''run_worker --once выполняет задачи, которые пора выполнить.'''
+        remember.delay(1)
+        later = remember.delay(2)
+        Task.objects.filter(pk=later.pk).update(
+            run_at=timezone.now() + datetime.timedelta(hours=1))
+        out = StringIO()
+
+        call_command('run_worker', once=True, threads=1, stdout=out)
+
+        self.assertEqual(calls, [(1, False)])
+        self.assertEqual(list(Task.objects.values_list('pk', flat=True)),
+                         [later.pk])
+        self.assertIn('Выполнено: 1', out.getvalue())
+
+    @override_settings(
+        TASKS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_queued_email(self):
+        '''Письма отправляются фоновой задачей.'''
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            cc=['cc@example.com'], reply_to=['reply@example.com'],
+            headers={'X-Yatube': '1'})
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('posts.csv', 'id,text\n', 'text/csv')
+
+        sent = QueuedEmailBackend().send_messages([message])
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(mail.outbox, [])
+        queued = Task.objects.get()
+        self.assertEqual(
+            json.loads(queued.payload)['args'][0][0]['subject'], 'Тема')
+        run_task(queued.pk)
+        self.assertEqual(len(mail.outbox), 1)
+        delivered = mail.outbox[0]
+        self.assertEqual(
+            (delivered.subject, delivered.body, delivered.to, delivered.cc,
+             delivered.reply_to, delivered.extra_headers),
+            ('Тема', 'Текст', ['to@example.com'], ['cc@example.com'],
+             ['reply@example.com'], {'X-Yatube': '1'}))
+        self.assertEqual(delivered.alternatives,
+                         [('<p>Текст</p>', 'text/html')])
+        self.assertEqual(delivered.attachments,
+                         [('posts.csv', 'id,text\n', 'text/csv')])
@@ -0,0 +1,149 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..viewcounts import ViewCounter
+
+User = get_user_model()
+
+
+@override_settings(POST_VIEWS_FLUSH_INTERVAL=3600, POST_VIEWS_FLUSH_SIZE=5)
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.another_post = Post.objects.create(
+            author=cls.author, text='Другой пост')
+
+    def setUp(self):
+        cache.clear()
+        self.counter = ViewCounter()
+        patcher = mock.patch('posts.views.view_counter', self.counter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.guest_client = Client()
+
+    def views(self, post):
+        return Post.objects.values_list('views', flat=True).get(pk=post.pk)
+
+    def test_views_buffered(self):
+        '''Просмотры копятся в буфере и пишутся одной транзакцией.'''
+        for _ in range(3):
+            self.counter.add(ViewCounterTests.post.pk)
+        self.counter.add(ViewCounterTests.another_post.pk)
+
+        self.assertEqual(self.views(ViewCounterTests.post), 0)
+        self.assertEqual(self.counter.backlog()['posts'], 2)
+        self.assertEqual(self.counter.backlog()['views'], 4)
+        with self.assertNumQueries(4):
+            self.assertEqual(self.counter.flush(), 4)
+        self.assertEqual(self.views(ViewCounterTests.post), 3)
+        self.assertEqual(self.views(ViewCounterTests.another_post), 1)
+        self.assertEqual(self.counter.backlog()['views'], 0)
+
+    def test_reset(self):
+        '''reset отбрасывает накопленные просмотры.'''
+        self.counter.add(ViewCounterTests.post.pk)
+
+        self.counter.reset()
+
+        self.assertEqual(self.counter.backlog()['views'], 0)
+        self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.views(ViewCounterTests.post), 0)
+
+    def test_flush_by_size(self):
+        '''Буфер записывается, когда накопилось POST_VIEWS_FLUSH_SIZE.'''
+        for _ in range(4):
+            self.counter.add(ViewCounterTests.post.pk)
+        self.assertEqual(self.counter.flush_if_due(), 0)
+
+        self.counter.add(ViewCounterTests.post.pk)
+
+        self.assertEqual(self.counter.flush_if_due(), 5)
+        self.assertEqual(self.views(ViewCounterTests.post), 5)
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=0)
+    def test_flush_after_request(self):
+        '''Просмотр поста записывается после запроса, если пора.'''
+        request_finished.connect(self.counter.flush_if_due)
+        self.addCleanup(request_finished.disconnect,
+                        self.counter.flush_if_due)
+
+        self.guest_client.get(
+            reverse('posts:post_detail', args=(ViewCounterTests.post.pk,)))
+
+        self.assertEqual(self.views(ViewCounterTests.post), 1)
+
+    def test_not_modified_counted(self):
+        '''Ответ 304 на повторный запрос тоже засчитывается.'''
+        url = reverse('posts:post_detail', args=(ViewCounterTests.post.pk,))
+        etag = self.guest_client.get(url)['ETag']
+
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.views(ViewCounterTests.post), 2)
+
+    def test_save_keeps_views(self):
+        '''Сохранение поста не затирает записанные просмотры.'''
+        post = Post.objects.get(pk=ViewCounterTests.post.pk)
+        self.counter.add(post.pk)
+        self.counter.flush()
+
+        post.text = 'Исправленный пост'
+        post.save()
+
+        self.assertEqual(self.views(post), 1)
+
+    def test_popular(self):
+        '''На странице популярного посты идут по числу просмотров.'''
+        self.counter.add(ViewCounterTests.post.pk)
+        self.counter.flush()
+
+        response = self.guest_client.get(reverse('posts:popular'))
+
+        self.assertEqual(list(response.context['page_obj']),
+                         [ViewCounterTests.post,
+                          ViewCounterTests.another_post])
+
+    def test_popular_ignores_cursor(self):
+        '''Курсор не переключает популярное на порядок по дате.'''
+        self.counter.add(ViewCounterTests.post.pk)
+        self.counter.flush()
+
+        response = self.guest_client.get(
+            reverse('posts:popular'), {'after': ''})
+
+        self.assertEqual(list(response.context['page_obj']),
+                         [ViewCounterTests.post,
+                          ViewCounterTests.another_post])
+
+    def test_written_views_change_etag(self):
+        '''Записанные просмотры меняют ETag страницы поста.'''
+        url = reverse('posts:post_detail', args=(ViewCounterTests.post.pk,))
+        etag = self.guest_client.get(url)['ETag']
+        self.counter.flush()
+
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Просмотров: 1')
+
+    def test_backlog_for_staff(self):
+        '''Незаписанные просмотры доступны персоналу.'''
+        self.counter.add(ViewCounterTests.post.pk)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.guest_client.force_login(staff)
+
+        response = self.guest_client.get(reverse('posts:view_stats'))
+
+        self.assertEqual(response.json()['backlog']['views'], 1)
@@ -1,7 +1,8 @@
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..models import Group, Post
@@ -61,6 +62,7 @@ class PostsPagesTests(TestCase):
         }
 
     def setUp(self):
+        cache.clear()
         self.author_client = Client()
         self.author_client.force_login(PostsPagesTests.author)
 
@@ -217,3 +219,39 @@ class PostsPagesTests(TestCase):
 
         for post in response.context.get('page_obj'):
             self.assertNotEqual(post.text, new_post.text)
+
+
+@override_settings(POST_EXCERPT_LENGTH=20)
+class PostExcerptPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.post = Post.objects.create(
+            author=cls.author, text='Длинный пост, который не влезет')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feed_shows_excerpt(self):
+        '''Лента показывает начало текста и ссылку «читать дальше».'''
+        response = self.guest_client.get(reverse('posts:index'))
+
+        self.assertContains(response, PostExcerptPagesTests.post.excerpt)
+        self.assertContains(response, 'читать дальше')
+        self.assertNotContains(response, PostExcerptPagesTests.post.text)
+
+    def test_feed_does_not_load_text(self):
+        '''Ленты не загружают полный текст постов.'''
+        reverse_names = [
+            reverse('posts:index'),
+            reverse('posts:profile',
+                    args=(PostExcerptPagesTests.author.username,)),
+        ]
+
+        for reverse_name in reverse_names:
+            with self.subTest(reverse_name=reverse_name):
+                response = self.guest_client.get(reverse_name)
+                post = response.context['page_obj'][0]
+                self.assertIn('text', post.get_deferred_fields())
@@ -0,0 +1,211 @@
+from django.conf import settings
+from django.core.paginator import Page
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from .cards import card_posts
+from .counters import change_author_followers_count
+from .feeds import author_feed, bump_feed_versions, invalidate_feed_counts
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .utils import CursorPaginator, FeedPaginator, is_cursor_request
+
+# Для скольких пользователей за раз обрезать ленты.
+TRIM_BATCH_SIZE = 500
+
+
+def timeline_feed(user_id: int) -> str:
+    '''Имя ленты подписок пользователя.'''
+    return f'timeline:{user_id}'
+
+
+def is_fanout_author(author_id: int) -> bool:
+    '''Раскладывать ли посты автора по лентам подписчиков при записи.
+
+    У авторов с числом подписчиков больше TIMELINE_FANOUT_LIMIT
+    посты не копируются в ленты, а подмешиваются при чтении.
+
+    '''
+    return not AuthorStats.objects.filter(
+        user_id=author_id,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT).exists()
+
+
+def trim_timelines(user_ids) -> None:
+    '''Оставляет в лентах пользователей user_ids не больше
+    TIMELINE_MAX_LENGTH последних записей.
+
+    Номер записи в ленте считает оконная функция по индексу
+    (user, -pub_date): каждая лента читается один раз, без сортировки.
+
+    '''
+    user_ids = list(user_ids)
+    table = TimelineEntry._meta.db_table
+    with connection.cursor() as cursor:
+        for start in range(0, len(user_ids), TRIM_BATCH_SIZE):
+            batch = user_ids[start:start + TRIM_BATCH_SIZE]
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(
+                f'DELETE FROM {table} WHERE id IN ('
+                f'SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+                f'PARTITION BY user_id ORDER BY pub_date DESC, '
+                f'post_id DESC) AS position FROM {table} '
+                f'WHERE user_id IN ({placeholders})) '
+                f'WHERE position > %s)',
+                [*batch, settings.TIMELINE_MAX_LENGTH])
+
+
+def fan_out_post(post) -> None:
+    '''Добавляет новый пост в ленты подписчиков автора.'''
+    if not is_fanout_author(post.author_id):
+        return
+    follower_ids = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    # Раскладка идёт фоновой задачей и может повториться или
+    # встретиться с переносом постов при подписке.
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+         for user_id in follower_ids), ignore_conflicts=True)
+    trim_timelines(follower_ids)
+    invalidate_feed_counts(timeline_feed(user_id) for user_id in follower_ids)
+
+
+def follow_author(user, author) -> None:
+    '''Подписывает user на author и переносит посты автора в ленту.
+
+    В ленту попадают последние TIMELINE_BACKFILL_LIMIT постов.
+
+    '''
+    with transaction.atomic():
+        follow, created = Follow.objects.get_or_create(
+            user=user, author=author)
+        if not created:
+            return
+        change_author_followers_count(author.pk, 1)
+    if is_fanout_author(author.pk):
+        posts = (author.posts.order_by('-pub_date')
+                 .values_list('pk', 'pub_date')
+                 [:settings.TIMELINE_BACKFILL_LIMIT])
+        TimelineEntry.objects.bulk_create(
+            (TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+             for post_id, pub_date in posts), ignore_conflicts=True)
+        trim_timelines([user.pk])
+    invalidate_feed_counts([timeline_feed(user.pk)])
+    bump_feed_versions([author_feed(author.username)])
+
+
+def unfollow_author(user, author) -> None:
+    '''Отписывает user от author и убирает посты автора из ленты.'''
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        if deleted:
+            change_author_followers_count(author.pk, -1)
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+    invalidate_feed_counts([timeline_feed(user.pk)])
+    bump_feed_versions([author_feed(author.username)])
+
+
+class Timeline:
+    '''Посты ленты подписок пользователя для паджинаторов.
+
+    Посты обычных авторов читаются из заранее разложенной ленты
+    по индексу (user, -pub_date), посты авторов с большим числом
+    подписчиков - напрямую из Post. Каждая выборка ограничена
+    числом нужных постов, затем они сливаются по ключу (pub_date, id).
+
+    '''
+
+    def __init__(self, user):
+        self.user = user
+
+    def entries(self):
+        return TimelineEntry.objects.filter(user=self.user)
+
+    def pulled_posts(self):
+        '''Посты авторов, которые не раскладываются по лентам.
+
+        Посты, разложенные, пока подписчиков у автора было меньше,
+        уже есть в ленте и отсюда исключаются.
+
+        '''
+        pull_authors = Follow.objects.filter(
+            user=self.user,
+            author__stats__followers_count__gt=(
+                settings.TIMELINE_FANOUT_LIMIT),
+        ).values('author')
+        return (Post.objects.filter(author__in=pull_authors)
+                .annotate(in_timeline=Exists(self.entries().filter(
+                    post=OuterRef('pk'))))
+                .filter(in_timeline=False))
+
+    def count(self) -> int:
+        return self.entries().count() + self.pulled_posts().count()
+
+    def keys(self, limit: int, cursor: tuple = None,
+             newer: bool = False) -> list:
+        '''Ключи (pub_date, id) первых limit постов ленты.
+
+        Порядок и курсор - как у CursorPaginator.fetch.
+
+        '''
+        # onward - сравнение «дальше по ленте», back - обратное.
+        if newer:
+            sign, onward, back = '', 'gte', 'lte'
+        else:
+            sign, onward, back = '-', 'lte', 'gte'
+        entries = self.entries()
+        posts = self.pulled_posts()
+        if cursor is not None:
+            pub_date, pk = cursor
+            entries = (entries.filter(**{f'pub_date__{onward}': pub_date})
+                       .exclude(**{'pub_date': pub_date,
+                                   f'post_id__{back}': pk}))
+            posts = (posts.filter(**{f'pub_date__{onward}': pub_date})
+                     .exclude(**{'pub_date': pub_date, f'pk__{back}': pk}))
+        pushed = list(
+            entries.order_by(f'{sign}pub_date', f'{sign}post_id')
+            .values_list('pub_date', 'post_id')[:limit])
+        if len(pushed) == limit:
+            # Посты дальше limit-го поста ленты на эти limit мест
+            # уже не попадут.
+            posts = posts.filter(**{f'pub_date__{back}': pushed[-1][0]})
+        pulled = list(
+            posts.order_by(f'{sign}pub_date', f'{sign}pk')
+            .values_list('pub_date', 'pk')[:limit])
+        return sorted(pushed + pulled, reverse=not newer)[:limit]
+
+    def load(self, keys) -> list:
+        '''Посты с полями карточки в порядке ключей keys.'''
+        posts = card_posts(Post.objects.all()).in_bulk(
+            [pk for _, pk in keys])
+        return [posts[pk] for _, pk in keys if pk in posts]
+
+    def fetch(self, limit: int, cursor: tuple = None,
+              newer: bool = False) -> list:
+        return self.load(self.keys(limit, cursor, newer))
+
+    def __getitem__(self, index: slice) -> list:
+        # FeedPaginator берёт страницу срезом [bottom:top].
+        return self.load(self.keys(index.stop)[index.start:])
+
+
+class TimelineCursorPaginator(CursorPaginator):
+    '''Курсорный паджинатор ленты подписок (Timeline).'''
+
+    def fetch(self, limit: int, cursor: tuple = None,
+              newer: bool = False) -> list:
+        return self.object_list.fetch(limit, cursor, newer)
+
+
+def paginate_timeline(request, user) -> Page:
+    '''Страница ленты подписок user, по номеру или по курсору,
+    как в paginate_posts.'''
+    timeline = Timeline(user)
+    if is_cursor_request(request):
+        paginator = TimelineCursorPaginator(
+            timeline, settings.POSTS_PER_PAGE)
+        return paginator.get_cursor_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'))
+    paginator = FeedPaginator(timeline, settings.POSTS_PER_PAGE,
+                              feed=timeline_feed(user.pk))
+    return paginator.get_page(request.GET.get('page'))
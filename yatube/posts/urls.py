@@ -7,8 +7,26 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/archive/<int:year>/<int:month>/',
+         views.group_archive, name='group_archive'),
+    path('archive/<int:year>/<int:month>/',
+         views.archive, name='archive'),
+    path('group/<slug:slug>/export/',
+         views.group_export, name='group_export'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/export/',
+         views.profile_export, name='profile_export'),
+    path('popular/', views.popular, name='popular'),
+    path('search/', views.search, name='search'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('profile/<str:username>/follow/',
+         views.profile_follow, name='profile_follow'),
+    path('profile/<str:username>/unfollow/',
+         views.profile_unfollow, name='profile_unfollow'),
+    path('stats/cache/', views.cache_stats, name='cache_stats'),
+    path('stats/queries/', views.query_stats, name='query_stats'),
+    path('stats/views/', views.view_stats, name='view_stats'),
 ]
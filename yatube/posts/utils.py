@@ -1,21 +1,270 @@
+import base64
+import binascii
+
 from django.conf import settings
 from django.core.handlers.wsgi import WSGIRequest
 from django.core.paginator import Page, Paginator
 from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .feeds import get_feed_count
+
+
+def encode_cursor(pub_date, pk) -> str:
+    '''Упаковывает ключ (pub_date, id) в непрозрачный токен для URL.'''
+    raw = f'{pub_date.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> tuple:
+    '''Распаковывает токен курсора в пару (pub_date, id).
+
+    Для испорченного токена выбрасывает ValueError.
+
+    '''
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, pk_part = raw.rsplit('|', 1)
+        pub_date = parse_datetime(date_part)
+        pk = int(pk_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError(f'Некорректный курсор: {token!r}') from error
+    if pub_date is None:
+        raise ValueError(f'Некорректный курсор: {token!r}')
+    return pub_date, pk
+
+
+def _cursor_key(row) -> tuple:
+    '''Ключ (pub_date, id) поста - модели или словаря из values().'''
+    if isinstance(row, dict):
+        return row['pub_date'], row['id']
+    return row.pub_date, row.pk
+
+
+class CursorPage(Page):
+    '''Страница курсорного паджинатора.
+
+    Номера страницы и общего количества страниц у неё нет: известно
+    только, есть ли посты новее и старше текущей выборки.
+
+    '''
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} posts>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_cursor(self):
+        '''Токен для перехода к более старым постам.'''
+        if not self.object_list:
+            return None
+        return encode_cursor(*_cursor_key(self.object_list[-1]))
+
+    def previous_cursor(self):
+        '''Токен для перехода к более новым постам.'''
+        if not self.object_list:
+            return None
+        return encode_cursor(*_cursor_key(self.object_list[0]))
+
+
+class CursorPaginator(Paginator):
+    '''Паджинатор по ключу (pub_date, id) без OFFSET и COUNT(*).
+
+    Посты упорядочены от новых к старым. Страница выбирается
+    условием по ключу последнего (after) или первого (before) поста
+    соседней страницы, поэтому стоимость запроса не зависит от того,
+    насколько далеко пользователь ушёл по ленте.
+
+    '''
+    ordering = ('-pub_date', '-pk')
+
+    def get_cursor_page(self, after=None, before=None) -> CursorPage:
+        '''Возвращает страницу после курсора after или перед before.
+
+        Некорректный курсор приводит к первой странице ленты.
+
+        '''
+        try:
+            if after:
+                return self._page_after(*decode_cursor(after))
+            if before:
+                return self._page_before(*decode_cursor(before))
+        except ValueError:
+            pass
+        return self._page_after(None, None)
+
+    def fetch(self, limit: int, cursor: tuple = None,
+              newer: bool = False) -> list:
+        '''Первые limit постов по ключу (pub_date, id).
+
+        По умолчанию посты идут от новых к старым и берутся старше
+        ключа cursor, с newer - от старых к новым и новее него.
+
+        '''
+        if newer:
+            queryset = self.object_list.order_by('pub_date', 'pk')
+        else:
+            queryset = self.object_list.order_by(*self.ordering)
+        if cursor is not None:
+            pub_date, pk = cursor
+            if newer:
+                queryset = (queryset
+                            .filter(pub_date__gte=pub_date)
+                            .exclude(pub_date=pub_date, pk__lte=pk))
+            else:
+                queryset = (queryset
+                            .filter(pub_date__lte=pub_date)
+                            .exclude(pub_date=pub_date, pk__gte=pk))
+        return list(queryset[:limit])
+
+    def _page_after(self, pub_date, pk) -> CursorPage:
+        cursor = None if pub_date is None else (pub_date, pk)
+        posts = self.fetch(self.per_page + 1, cursor)
+        return CursorPage(
+            posts[:self.per_page], self,
+            has_next=len(posts) > self.per_page,
+            has_previous=cursor is not None)
+
+    def _page_before(self, pub_date, pk) -> CursorPage:
+        posts = self.fetch(self.per_page + 1, (pub_date, pk), newer=True)
+        has_previous = len(posts) > self.per_page
+        posts = posts[:self.per_page][::-1]
+        if not has_previous and len(posts) < self.per_page:
+            # У начала ленты отдаём полную первую страницу,
+            # а не её хвост.
+            return self._page_after(None, None)
+        return CursorPage(posts, self, has_next=True,
+                          has_previous=has_previous)
+
+
+class FeedPage(Page):
+    '''Страница ленты с укороченным списком номеров страниц.'''
+
+    @cached_property
+    def elided_page_range(self):
+        return list(self.paginator.get_elided_page_range(self.number))
+
+
+class FeedPaginator(Paginator):
+    '''Паджинатор ленты с кэшированным количеством постов.
+
+    Количество постов ленты feed берётся из кэша и пересчитывается
+    только после сохранения или удаления поста этой ленты, так что
+    COUNT(*) не выполняется на каждый запрос. Если количество уже
+    известно (например, из счётчика постов за месяц), его можно
+    передать в known_count.
+
+    '''
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, feed=None, known_count=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+        self.known_count = known_count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.feed is None:
+            return self.object_list.count()
+        return get_feed_count(self.feed, self.object_list.count)
+
+    def page(self, number):
+        '''Возвращает страницу number.
+
+        В отличие от базового класса, срез не обрезается по count:
+        если закэшированное количество отстало от базы, страница всё
+        равно получит все свои посты.
+
+        '''
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1, *, on_each_side=2,
+                              on_ends=1):
+        '''Номера страниц вокруг текущей и по краям, с пропусками.
+
+        Длина списка ограничена и не зависит от длины ленты.
+        На месте пропусков стоит ELLIPSIS.
+
+        '''
+        number = self.validate_number(number)
+
+        if self.num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+
+        if number > (1 + on_each_side + on_ends) + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+
+        if number < (self.num_pages - on_each_side - on_ends) - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(self.num_pages - on_ends + 1,
+                             self.num_pages + 1)
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+
+def is_cursor_request(request: WSGIRequest) -> bool:
+    '''Нужно ли отдавать ленту в курсорном режиме.'''
+    return (settings.POSTS_CURSOR_PAGINATION
+            or 'after' in request.GET
+            or 'before' in request.GET)
 
 
 def paginate_posts(
     request: WSGIRequest,
-    posts_queryset: QuerySet
+    posts_queryset: QuerySet,
+    feed: str = None,
+    count: int = None
 ) -> Page:
     '''Возвращает объект страницы для страницы с постами и паджинатором.
 
+    Если в запросе есть параметр after или before (или курсорный
+    режим включён в настройках), лента листается по курсору,
+    иначе - по номеру страницы.
+
     Параметры:
     request - объект http-запроса
     posts_queryset - набор постов из базы данных
+    feed - имя ленты (см. posts.feeds), под которым кэшируется
+    количество постов
+    count - количество постов, если оно уже известно
 
     '''
-    paginator = Paginator(posts_queryset, settings.POSTS_PER_PAGE)
+    if is_cursor_request(request):
+        paginator = CursorPaginator(posts_queryset, settings.POSTS_PER_PAGE)
+        return paginator.get_cursor_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'))
+
+    paginator = FeedPaginator(
+        posts_queryset, settings.POSTS_PER_PAGE, feed=feed,
+        known_count=count)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
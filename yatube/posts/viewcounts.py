@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, connections,
+                       transaction)
+from django.db.models import F
+
+from .models import Post
+
+logger = logging.getLogger('yatube.post_views')
+
+# Сколько id передавать в один UPDATE ... WHERE id IN (...).
+UPDATE_BATCH_SIZE = 500
+
+
+def _database_name() -> str:
+    return connections[DEFAULT_DB_ALIAS].settings_dict['NAME']
+
+
+class ViewCounter:
+    '''Буфер просмотров постов в памяти процесса.
+
+    Просмотры копятся по id поста и записываются одной транзакцией:
+    UPDATE на каждый просмотр выстраивал бы запросы в очередь
+    за блокировкой записи SQLite. Запись происходит после запроса,
+    если с прошлой записи прошло POST_VIEWS_FLUSH_INTERVAL секунд
+    или накопилось POST_VIEWS_FLUSH_SIZE просмотров, и при завершении
+    процесса (кроме тестов). Обработчики подключает PostsConfig.
+
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.total = 0
+        self.last_flush = time.monotonic()
+        self.database = None
+
+    def add(self, post_id: int) -> None:
+        with self.lock:
+            if not self.pending:
+                self.database = _database_name()
+            self.pending[post_id] += 1
+            self.total += 1
+
+    def flush_if_due(self, **kwargs) -> int:
+        '''Записывает просмотры, если пора по времени или размеру.
+
+        Подключается к request_finished: запись идёт после отправки
+        ответа и не добавляет запросов к странице поста.
+
+        '''
+        with self.lock:
+            due = (self.total >= settings.POST_VIEWS_FLUSH_SIZE
+                   or (self.total and time.monotonic() - self.last_flush
+                       >= settings.POST_VIEWS_FLUSH_INTERVAL))
+        return self.flush() if due else 0
+
+    def flush(self) -> int:
+        '''Записывает накопленные просмотры, возвращает их количество.
+
+        Если запись не удалась, просмотры возвращаются в буфер
+        и попадут в базу при следующей записи.
+
+        '''
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            database = self.database
+            self.total = 0
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+        if database != _database_name():
+            # Так бывает после тестов: тестовую базу уже удалили,
+            # и те же id постов относятся к другой базе.
+            logger.warning('Просмотры накоплены для базы %s, не пишем их',
+                           database)
+            return 0
+        # Посты с одинаковым приростом обновляются одним запросом.
+        by_increment = defaultdict(list)
+        for post_id, views in pending.items():
+            by_increment[views].append(post_id)
+        try:
+            with transaction.atomic():
+                for views, post_ids in by_increment.items():
+                    for start in range(0, len(post_ids), UPDATE_BATCH_SIZE):
+                        Post.objects.filter(
+                            pk__in=post_ids[start:start + UPDATE_BATCH_SIZE],
+                        ).update(views=F('views') + views)
+        except DatabaseError:
+            logger.exception('Не удалось записать просмотры постов')
+            with self.lock:
+                self.pending.update(pending)
+                self.total += sum(pending.values())
+            return 0
+        return sum(pending.values())
+
+    def reset(self) -> None:
+        '''Отбрасывает накопленные просмотры, не записывая их.'''
+        with self.lock:
+            self.pending = Counter()
+            self.total = 0
+            self.last_flush = time.monotonic()
+
+    def backlog(self) -> dict:
+        '''Незаписанные просмотры: сколько постов и сколько просмотров.'''
+        with self.lock:
+            return {
+                'posts': len(self.pending),
+                'views': self.total,
+                'seconds_since_flush': round(
+                    time.monotonic() - self.last_flush, 1),
+            }
+
+
+view_counter = ViewCounter()
@@ -1,29 +1,61 @@
+from functools import wraps
+from http import HTTPStatus
+
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
 from django.utils.text import Truncator
+from django.views.decorators.http import condition
+
+from core.db_router import primary_db
+from core.query_budget import query_budget, view_query_stats
 
-from .forms import PostForm
-from .models import Group, Post
-from .utils import paginate_posts
+from .archive import archive_months, month_bounds
+from .cards import CARD_PROFILE, attach_post_cards, card_posts
+from .counters import author_posts_count
+from .exporting import CONTENT_TYPES, FORMATS, export_lines
+from .feeds import (FEED_ALL, author_feed, cache_anonymous_page,
+                    conditional_feed_page, feed_etag, feed_last_modified,
+                    group_feed, page_cache_stats)
+from .forms import PostForm, PostImageForm
+from .models import Follow, Group, Post
+from .search import search_posts
+from .timeline import follow_author, paginate_timeline, unfollow_author
+from .utils import FeedPaginator, paginate_posts
+from .viewcounts import view_counter
 
 User = get_user_model()
 
 
+@query_budget(4)
+@conditional_feed_page(lambda: FEED_ALL, lambda: Post.objects.all())
+@cache_anonymous_page(lambda: FEED_ALL)
 def index(request):
     """Главная страница."""
-    page_obj = paginate_posts(request, Post.objects.select_related())
+    page_obj = paginate_posts(
+        request, card_posts(Post.objects.all()), feed=FEED_ALL)
+    attach_post_cards(page_obj)
     context = {'page_obj': page_obj, }
     return render(request, 'posts/index.html', context)
 
 
+@query_budget(5)
+@conditional_feed_page(group_feed,
+                       lambda slug: Post.objects.filter(group__slug=slug))
+@cache_anonymous_page(group_feed)
 def group_posts(request, slug):
     """Страница группы."""
     group = get_object_or_404(Group, slug=slug)
     page_obj = paginate_posts(
         request,
-        group.posts.select_related('author'))
+        card_posts(group.posts.all(), related=('author',)),
+        feed=group_feed(group.slug))
+    attach_post_cards(page_obj)
     context = {
         'page_obj': page_obj,
         'group': group,
@@ -31,21 +63,180 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@query_budget(6)
+@conditional_feed_page(
+    author_feed,
+    lambda username: Post.objects.filter(author__username=username))
+@cache_anonymous_page(author_feed)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    page_obj = paginate_posts(request, author.posts.select_related())
-    num_posts = author.posts.count()
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    page_obj = paginate_posts(
+        request, card_posts(author.posts.all(), related=('group',)),
+        feed=author_feed(author.username))
+    attach_post_cards(page_obj, CARD_PROFILE)
+    num_posts = author_posts_count(author)
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(user=request.user, author=author).exists())
     context = {
         'page_obj': page_obj,
         'author': author,
         'num_posts': num_posts,
+        'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def _archive_page(request, posts, year, month, group=None):
+    """Посты группы или всех групп за месяц и список месяцев архива."""
+    try:
+        start, end = month_bounds(year, month)
+    except ValueError:
+        raise Http404
+    # Список месяцев нужен для боковой колонки, из него же берётся
+    # количество постов для паджинатора.
+    months = list(archive_months(group))
+    count = next((archive_month.posts_count for archive_month in months
+                  if archive_month.month == start.date()), 0)
+    page_obj = paginate_posts(
+        request,
+        card_posts(posts.filter(pub_date__gte=start, pub_date__lt=end),
+                   related=('author',) if group else ('author', 'group')),
+        count=count)
+    attach_post_cards(page_obj)
+    context = {
+        'page_obj': page_obj,
+        'group': group,
+        'month': start,
+        'months': months,
+    }
+    return render(request, 'posts/archive.html', context)
+
+
+@query_budget(4)
+@conditional_feed_page(lambda year, month: FEED_ALL,
+                       lambda year, month: Post.objects.all())
+@cache_anonymous_page(lambda year, month: FEED_ALL)
+def archive(request, year, month):
+    """Посты за месяц."""
+    return _archive_page(request, Post.objects.all(), year, month)
+
+
+@query_budget(5)
+@conditional_feed_page(
+    lambda slug, year, month: group_feed(slug),
+    lambda slug, year, month: Post.objects.filter(group__slug=slug))
+@cache_anonymous_page(lambda slug, year, month: group_feed(slug))
+def group_archive(request, slug, year, month):
+    """Посты группы за месяц."""
+    group = get_object_or_404(Group, slug=slug)
+    return _archive_page(request, group.posts.all(), year, month, group)
+
+
+@query_budget(4)
+@cache_anonymous_page(lambda: FEED_ALL, key_prefix='popular',
+                      timeout=settings.POPULAR_PAGE_CACHE_TIMEOUT)
+def popular(request):
+    """Самые читаемые посты.
+
+    Листается только по номерам страниц: курсор по дате потерял бы
+    порядок по просмотрам. Записанные просмотры не меняют версию
+    ленты, поэтому страница хранится в кэше недолго.
+
+    """
+    paginator = FeedPaginator(
+        card_posts(Post.objects.order_by('-views', '-pub_date')),
+        settings.POSTS_PER_PAGE, feed=FEED_ALL)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    attach_post_cards(page_obj)
+    context = {'page_obj': page_obj, }
+    return render(request, 'posts/popular.html', context)
+
+
+@query_budget(2)
+def search(request):
+    """Полнотекстовый поиск по постам."""
+    query = request.GET.get('q', '').strip()
+    # Результаты упорядочены по релевантности, а не по дате,
+    # поэтому листаются только по номерам страниц.
+    paginator = FeedPaginator(
+        card_posts(search_posts(query)),
+        settings.POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    attach_post_cards(page_obj)
+    context = {
+        'page_obj': page_obj,
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def _post_detail_feeds(request, post_id):
+    """Ленты, изменение которых меняет страницу поста.
+
+    Заодно запоминает в request.post_detail_views число просмотров
+    поста: оно тоже показывается на странице.
+
+    """
+    if not hasattr(request, 'post_detail_feeds'):
+        row = (Post.objects.filter(pk=post_id)
+               .values_list('author__username', 'group__slug', 'views')
+               .first())
+        request.post_detail_feeds = {}
+        request.post_detail_views = None
+        if row is not None:
+            username, slug, request.post_detail_views = row
+            request.post_detail_feeds[author_feed(username)] = (
+                Post.objects.filter(author__username=username))
+            if slug is not None:
+                request.post_detail_feeds[group_feed(slug)] = (
+                    Post.objects.filter(group__slug=slug))
+    return request.post_detail_feeds
+
+
+def post_detail_etag(request, post_id):
+    feeds = _post_detail_feeds(request, post_id)
+    if not feeds:
+        return None
+    return feed_etag(request, feeds, extra=request.post_detail_views)
+
+
+def post_detail_last_modified(request, post_id):
+    if request.user.is_authenticated:
+        return None
+    feeds = _post_detail_feeds(request, post_id)
+    dates = [feed_last_modified(feed, queryset)
+             for feed, queryset in feeds.items()]
+    return max(filter(None, dates), default=None)
+
+
+def _count_view(view_func):
+    """Засчитывает просмотр поста, в том числе ответом 304.
+
+    Ставится поверх condition: при совпавшем ETag тот отвечает 304,
+    не вызывая view.
+
+    """
+    @wraps(view_func)
+    def wrapper(request, post_id):
+        response = view_func(request, post_id)
+        if response.status_code in (HTTPStatus.OK, HTTPStatus.NOT_MODIFIED):
+            view_counter.add(post_id)
+        return response
+    return wrapper
+
+
+@query_budget(4)
+@_count_view
+@primary_db
+@condition(etag_func=post_detail_etag,
+           last_modified_func=post_detail_last_modified)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    num_posts = post.author.posts.count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id)
+    num_posts = author_posts_count(post.author)
     text_for_title = Truncator(post.text).chars(settings.SYMB_FOR_TITLE)
     is_author = bool(post.author == request.user)
     context = {
@@ -58,11 +249,15 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(16)
+@primary_db
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
+    image_form = PostImageForm(request.POST or None, request.FILES or None,
+                               instance=form.instance)
 
-    if form.is_valid():
+    if all([form.is_valid(), image_form.is_valid()]):
         form_data = form.save(commit=False)
         form_data.author = request.user
         form_data.save()
@@ -71,29 +266,120 @@ def post_create(request):
 
     context = {
         'form': form,
+        'image_form': image_form,
     }
     return render(request, 'posts/create_post.html', context)
 
 
+@query_budget(17)
+@primary_db
 @login_required
 def post_edit(request, post_id):
-    post = Post.objects.get(pk=post_id)
+    # Автор нужен и для проверки, и для сброса кэша его ленты.
+    post = Post.objects.select_related('author').get(pk=post_id)
 
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
 
     if request.method == 'POST':
         form = PostForm(request.POST, instance=post)
-        if form.is_valid():
+        image_form = PostImageForm(request.POST, request.FILES,
+                                   instance=post)
+        if all([form.is_valid(), image_form.is_valid()]):
             form.save()
             return redirect('posts:post_detail', post_id)
     else:
         form = PostForm(instance=post)
+        image_form = PostImageForm(instance=post)
 
     context = {
         'is_edit': True,
         'form': form,
+        'image_form': image_form,
         'post_id': post_id,
     }
 
     return render(request, 'posts/create_post.html', context)
+
+
+@query_budget(7)
+@login_required
+def follow_index(request):
+    """Лента постов авторов, на которых подписан пользователь."""
+    page_obj = paginate_timeline(request, request.user)
+    attach_post_cards(page_obj)
+    context = {'page_obj': page_obj, }
+    return render(request, 'posts/follow.html', context)
+
+
+@query_budget(15)
+@primary_db
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        follow_author(request.user, author)
+    return redirect('posts:profile', username)
+
+
+@query_budget(8)
+@primary_db
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    unfollow_author(request.user, author)
+    return redirect('posts:profile', username)
+
+
+def _export_response(request, queryset, name):
+    """Потоковая выгрузка постов в NDJSON или CSV (?format=csv)."""
+    file_format = request.GET.get('format')
+    if file_format not in FORMATS:
+        file_format = FORMATS[0]
+    response = StreamingHttpResponse(
+        export_lines(queryset, file_format),
+        content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{file_format}"')
+    return response
+
+
+@query_budget(4)
+@login_required
+def profile_export(request, username):
+    """Выгрузка всех постов автора - для него самого и персонала."""
+    author = get_object_or_404(User, username=username)
+    if author != request.user and not request.user.is_staff:
+        raise PermissionDenied
+    return _export_response(
+        request, Post.objects.filter(author=author), author.username)
+
+
+@query_budget(4)
+@staff_member_required
+def group_export(request, slug):
+    """Выгрузка всех постов группы для персонала."""
+    group = get_object_or_404(Group, slug=slug)
+    return _export_response(
+        request, Post.objects.filter(group=group), group.slug)
+
+
+@query_budget(2)
+@staff_member_required
+def cache_stats(request):
+    """Счётчики попаданий и промахов страничного кэша."""
+    return JsonResponse({'page_cache': page_cache_stats()})
+
+
+@query_budget(2)
+@staff_member_required
+def view_stats(request):
+    """Просмотры постов, ещё не записанные в базу этим процессом."""
+    return JsonResponse({'backlog': view_counter.backlog()})
+
+
+@query_budget(2)
+@staff_member_required
+def query_stats(request):
+    """Счётчики SQL-запросов по view с момента запуска процесса."""
+    return JsonResponse({'queries': view_query_stats()})
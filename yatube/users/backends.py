@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id) -> str:
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id) -> None:
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    '''ModelBackend, который держит пользователя сессии в кэше.
+
+    AuthenticationMiddleware загружает пользователя на каждом запросе;
+    с этим бэкендом запрос к auth_user выполняется раз
+    в USER_CACHE_TIMEOUT секунд. Запись сбрасывается при сохранении
+    и удалении пользователя и при выходе (users.signals).
+
+    '''
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Сбрасывает кэш пользователя: смена пароля тоже сохраняет его."""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def user_logged_out_cache(sender, request, user, **kwargs):
+    """Сбрасывает кэш пользователя при выходе."""
+    if user is not None:
+        invalidate_cached_user(user.pk)
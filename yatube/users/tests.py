@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .backends import CachedModelBackend, user_cache_key
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='test_user', password='old-Password-42')
+
+    def setUp(self):
+        cache.clear()
+        self.user_client = Client()
+        self.user_client.login(username='test_user',
+                               password='old-Password-42')
+
+    def auth_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.user_client.get(url)
+        return [query['sql'] for query in queries.captured_queries
+                if 'auth_user' in query['sql']
+                or 'django_session' in query['sql']]
+
+    def test_session_and_user_read_from_cache(self):
+        '''Повторный запрос не читает сессию и пользователя из базы.'''
+        url = reverse('about:author')
+        self.assertNotEqual(self.auth_queries(url), [])
+
+        self.assertEqual(self.auth_queries(url), [])
+
+    def test_user_update_invalidates_cache(self):
+        '''Изменённый пользователь не берётся из кэша.'''
+        backend = CachedModelBackend()
+        backend.get_user(CachedUserTests.user.pk)
+
+        user = User.objects.get(pk=CachedUserTests.user.pk)
+        user.first_name = 'Новое имя'
+        user.save()
+
+        self.assertEqual(
+            backend.get_user(CachedUserTests.user.pk).first_name,
+            'Новое имя')
+
+    def test_logout_invalidates_cache(self):
+        '''Выход удаляет пользователя из кэша.'''
+        self.auth_queries(reverse('about:author'))
+        self.assertIsNotNone(cache.get(user_cache_key(
+            CachedUserTests.user.pk)))
+
+        self.user_client.get(reverse('users:logout'))
+
+        self.assertIsNone(cache.get(user_cache_key(
+            CachedUserTests.user.pk)))
+
+    def test_password_change_invalidates_cache(self):
+        '''После смены пароля сессия продолжается с новым пользователем.'''
+        self.auth_queries(reverse('about:author'))
+
+        self.user_client.post(reverse('users:password_change'), {
+            'old_password': 'old-Password-42',
+            'new_password1': 'new-Password-42',
+            'new_password2': 'new-Password-42',
+        })
+
+        cached = CachedModelBackend().get_user(CachedUserTests.user.pk)
+        self.assertTrue(cached.check_password('new-Password-42'))
+        response = self.user_client.get(reverse('about:author'))
+        self.assertEqual(response.wsgi_request.user, CachedUserTests.user)
+
+    def test_model_backend_session_kept(self):
+        '''Сессия, начатая через ModelBackend, не обрывается.'''
+        client = Client()
+        client.force_login(
+            CachedUserTests.user,
+            backend='django.contrib.auth.backends.ModelBackend')
+
+        response = client.get(reverse('about:author'))
+
+        self.assertEqual(response.wsgi_request.user, CachedUserTests.user)
@@ -18,6 +18,7 @@ INSTALLED_APPS = [
     'core',
     'users',
     'posts',
+    'api',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -29,10 +30,16 @@ INSTALLED_APPS = [
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма отправляются фоновой задачей через TASKS_EMAIL_BACKEND.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 MIDDLEWARE = [
+    'core.staticfiles.StaticFilesMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.query_budget.QueryBudgetMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,8 +56,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Отступы шаблонов проекта убираются при компиляции.
+            'loaders': [
+                ('core.template_loaders.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -63,6 +76,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# Сбрасывает накопленные тестами просмотры перед удалением тестовой базы.
+TEST_RUNNER = 'core.testing.TestRunner'
 
 DATABASES = {
     'default': {
@@ -70,6 +85,37 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
+# Алиасы из DATABASES, с которых читают страницы без кэша и ETag:
+# поиск, ленту подписок, выгрузки. Запрос читает с одной реплики.
+# Пример с копией SQLite-файла - yatube/settings_replica.py.
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# Сколько секунд после своей записи пользователь читает с основной базы.
+REPLICA_STICKY_SECONDS = 10
+# PRAGMA для каждого нового соединения с SQLite (core.sqlite).
+# Настройки для продакшена - yatube/settings_production.py.
+SQLITE_PRAGMAS = {}
+
+# Версии лент, карточки постов и пользователи сессий сбрасываются
+# через этот кэш. Кэш в памяти у каждого процесса свой: сброс
+# из одного процесса (или из manage.py run_worker) не виден другим.
+# Если процессов несколько, нужен общий кэш - как в
+# yatube/settings_production.py.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+# Сессии читаются из кэша и пишутся и в кэш, и в базу.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# ModelBackend остаётся в списке для сессий, начатых до появления
+# CachedModelBackend: без него их пользователей разлогинит.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+# Сколько секунд хранить в кэше пользователя сессии.
+USER_CACHE_TIMEOUT = 60 * 5
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -97,8 +143,76 @@ USE_L10N = True
 USE_TZ = True
 
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 STATIC_URL = '/static/'
+# Куда collectstatic собирает статику; оттуда её отдаёт
+# core.staticfiles.StaticFilesMiddleware.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Сколько секунд кэшировать статику без хэша в имени.
+STATIC_MAX_AGE = 60
 
 POSTS_PER_PAGE = 10
+# Листать ленты по курсору (?after=/?before=) вместо номеров страниц.
+POSTS_CURSOR_PAGINATION = False
+# Сколько секунд хранить в кэше количество постов ленты.
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 60
+# Сколько секунд хранить страницы лент для анонимных пользователей.
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 15
+# Сколько секунд хранить страницу популярного: её порядок меняют
+# просмотры, которые версию ленты не меняют.
+POPULAR_PAGE_CACHE_TIMEOUT = 60
 SYMB_FOR_TITLE = 30
+# Кэш отрендеренных карточек постов. Версию нужно менять
+# при каждом изменении шаблона includes/post.html.
+POST_CARD_CACHE_VERSION = 5
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Сколько символов текста поста показывать в лентах.
+POST_EXCERPT_LENGTH = 300
+# Варианты картинки поста (ширина, высота): card обрезается
+# до точного размера, detail уменьшается по ширине (высота None).
+POST_IMAGE_VARIANTS = {
+    'card': (960, 339),
+    'detail': (1280, None),
+}
+# Качество JPEG вариантов картинки.
+POST_IMAGE_QUALITY = 85
+# Просмотры постов копятся в памяти процесса и записываются в базу,
+# когда с прошлой записи прошло столько секунд
+POST_VIEWS_FLUSH_INTERVAL = 10
+# или накопилось столько просмотров.
+POST_VIEWS_FLUSH_SIZE = 500
+# Посты авторов, у которых подписчиков больше этого числа,
+# не раскладываются по лентам подписок, а подмешиваются при чтении.
+TIMELINE_FANOUT_LIMIT = 1000
+# Сколько последних постов автора добавить в ленту при подписке.
+TIMELINE_BACKFILL_LIMIT = 100
+# Сколько последних постов хранить в ленте подписок пользователя.
+TIMELINE_MAX_LENGTH = 1000
+# Сколько постов читать из базы за раз при выгрузке.
+POSTS_EXPORT_CHUNK_SIZE = 2000
+# Сколько секунд клиенты и прокси могут хранить ответы API.
+POSTS_API_MAX_AGE = 60
+# Наибольший размер страницы API (?limit=).
+POSTS_API_MAX_LIMIT = 100
+# Фоновые задачи (core.tasks) выполняются пулом из стольких потоков
+# в каждом процессе; отложенные повторы подбирает run_worker.
+TASKS_THREADS = 4
+# Сколько раз запускать задачу, прежде чем пометить её упавшей.
+TASKS_MAX_ATTEMPTS = 3
+# Пауза перед первым повтором в секундах, дальше она удваивается.
+TASKS_RETRY_DELAY = 30
+# Через сколько секунд задачу упавшего процесса может забрать другой.
+TASKS_LEASE_SECONDS = 60 * 5
+# Выполнять задачи сразу при постановке в очередь, без пула.
+TASKS_EAGER = False
+# Ответы короче этого числа байт не сжимаются.
+COMPRESS_MIN_LENGTH = 200
+# Уровни сжатия ответов на лету: выше - меньше байт, но больше CPU.
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 4
+# Сколько раз должен повториться запрос одной формы,
+# чтобы QueryBudgetMiddleware счёл его признаком N+1.
+QUERY_REPEAT_THRESHOLD = 3
@@ -0,0 +1,37 @@
+# Профиль базы для продакшена на SQLite: журнал WAL, чтобы читатели
+# не ждали писателей, ожидание блокировки вместо ошибки "database is
+# locked" и постоянные соединения. Замеры - manage.py benchmark_sqlite.
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DATABASES = {
+    **DATABASES,
+    'default': {
+        **DATABASES['default'],
+        # Соединение живёт между запросами, PRAGMA не выполняются
+        # на каждый запрос заново.
+        'CONN_MAX_AGE': 600,
+    },
+}
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # С WAL фиксация не ждёт fsync, база при сбое остаётся целой.
+    'synchronous': 'NORMAL',
+    # Миллисекунды ожидания занятой базы.
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+# Общий для всех процессов сайта и run_worker кэш: без него сброс
+# лент и карточек из одного процесса не доходит до остальных.
+# Для нескольких серверов - memcached
+# (django.core.cache.backends.memcached.MemcachedCache).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/var/tmp/yatube_cache',
+    },
+}
+# Имена статики с хэшем содержимого (при DEBUG = False) и сжатые
+# копии .gz и .br: соберите их manage.py collectstatic перед запуском.
+STATICFILES_STORAGE = (
+    'core.staticfiles.CompressedManifestStaticFilesStorage')
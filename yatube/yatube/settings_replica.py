@@ -0,0 +1,13 @@
+# Локальная проверка чтения с реплики: вторая база - копия db.sqlite3,
+# которую обновляет manage.py sync_replicas.
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_REPLICAS = ['replica']